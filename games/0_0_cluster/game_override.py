@@ -12,6 +12,7 @@ class GameStateOverride(GameExecutables):
         super().reset_book()
         # Reset parameters relevant to local game only
         self.tumble_win = 0
+        self.reset_grid_mults()
 
     def reset_fs_spin(self):
         super().reset_fs_spin()
@@ -22,13 +23,15 @@ class GameStateOverride(GameExecutables):
 
     def check_repeat(self) -> None:
         """Checks if the spin failed a criteria constraint at any point."""
-        if self.repeat is False:
+        game_specific = self.repeat
+        if not game_specific:
             win_criteria = self.get_current_betmode_distributions().get_win_criteria()
             if win_criteria is not None and self.final_win != win_criteria:
-                self.repeat = True
+                self.reject_spin("win_criteria", target=win_criteria, final=self.final_win)
 
             if self.get_current_distribution_conditions()["force_freegame"] and not (self.triggered_freegame):
-                self.repeat = True
+                self.reject_spin("force_freegame")
 
             if self.win_manager.running_bet_win == 0 and self.criteria != "0":
-                self.repeat = True
+                self.reject_spin("zero_win")
+        self.record_attempt(game_specific)
@@ -1,7 +1,5 @@
 """Executables related to updating expanding wilds and collecting prize values."""
 
-import random
-from copy import deepcopy
 from game_calculations import GameCalculations
 from src.calculations.statistics import get_random_outcome
 
@@ -14,7 +12,7 @@ class GameExecutables(GameCalculations):
         updated_exp_wild = []
         for expwild in self.expanding_wilds:
             new_mult_on_reveal = get_random_outcome(
-                self.get_current_distribution_conditions()["mult_values"][self.gametype]
+                self.get_current_distribution_conditions()["mult_values"][self.gametype], rng=self.rng
             )
             expwild["mult"] = new_mult_on_reveal
             updated_exp_wild.append({"reel": expwild["reel"], "row": 0, "mult": new_mult_on_reveal})
@@ -27,12 +25,12 @@ class GameExecutables(GameCalculations):
         self.new_exp_wilds = []
         for _ in range(max_num_new_wilds):
             if len(self.avaliable_reels) > 0:
-                chosen_reel = random.choice(self.avaliable_reels)
-                chosen_row = random.choice([i for i in range(self.config.num_rows[chosen_reel])])
+                chosen_reel = self.rng.choice(self.avaliable_reels)
+                chosen_row = self.rng.choice([i for i in range(self.config.num_rows[chosen_reel])])
                 self.avaliable_reels.remove(chosen_reel)
 
                 wr_mult = get_random_outcome(
-                    self.get_current_distribution_conditions()["mult_values"][self.gametype]
+                    self.get_current_distribution_conditions()["mult_values"][self.gametype], rng=self.rng
                 )
                 expwild_details = {"reel": chosen_reel, "row": chosen_row, "mult": wr_mult}
                 self.board[expwild_details["reel"]][expwild_details["row"]] = self.create_symbol("W")
@@ -45,28 +43,18 @@ class GameExecutables(GameCalculations):
     def check_for_new_prize(self) -> list:
         """Check for prizes landing on most recent reveal."""
         new_sticky_symbols = []
-        for reel, _ in enumerate(self.board):
-            for row, _ in enumerate(self.board[reel]):
-                if (
-                    self.board[reel][row].check_attribute("prize")
-                    and (reel, row) not in self.existing_sticky_symbols
-                ):
-                    sym_details = {
-                        "reel": reel,
-                        "row": row,
-                        "prize": self.board[reel][row].get_attribute("prize"),
-                    }
-                    new_sticky_symbols.append(sym_details)
-                    self.sticky_symbols.append(deepcopy(sym_details))
-                    self.existing_sticky_symbols.append((sym_details["reel"], sym_details["row"]))
+        for reel, row in self.sticky_symbols.new_positions(self.board, lambda symbol: symbol.check_attribute("prize")):
+            prize = self.board[reel][row].get_attribute("prize")
+            self.sticky_symbols.add(reel, row, prize=prize)
+            new_sticky_symbols.append({"reel": reel, "row": row, "prize": prize})
 
         return new_sticky_symbols
 
     def replace_board_with_stickys(self) -> None:
         """replace with stickys and update special array."""
-        for sym in self.sticky_symbols:
-            self.board[sym["reel"]][sym["row"]] = self.create_symbol("P")
-            self.board[sym["reel"]][sym["row"]].assign_attribute({"prize": sym["prize"]})
+        for reel, row, prize in self.sticky_symbols.items("prize"):
+            self.board[reel][row] = self.create_symbol("P")
+            self.board[reel][row].assign_attribute({"prize": prize})
 
     def get_final_board_prize(self) -> dict:
         """Get final board win."""
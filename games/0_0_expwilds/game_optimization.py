@@ -58,7 +58,6 @@ class OptimizationSetup:
                     min_m2m=4,
                     max_m2m=8,
                     pmb_rtp=1.0,
-                    sim_trials=5000,
                     test_spins=[50, 100, 200],
                     test_weights=[0.3, 0.4, 0.3],
                     score_type="rtp",
@@ -102,7 +101,6 @@ class OptimizationSetup:
                     min_m2m=4,
                     max_m2m=8,
                     pmb_rtp=1.0,
-                    sim_trials=5000,
                     test_spins=[10, 20, 50],
                     test_weights=[0.6, 0.2, 0.2],
                     score_type="rtp",
@@ -130,7 +128,6 @@ class OptimizationSetup:
                     min_m2m=4,
                     max_m2m=8,
                     pmb_rtp=1.0,
-                    sim_trials=5000,
                     test_spins=[10, 20, 50],
                     test_weights=[0.6, 0.2, 0.2],
                     score_type="rtp",
@@ -1,5 +1,6 @@
 from game_executables import GameExecutables
 from src.calculations.statistics import get_random_outcome
+from src.calculations.sticky import StickyPositions
 
 
 class GameStateOverride(GameExecutables):
@@ -21,31 +22,32 @@ class GameStateOverride(GameExecutables):
         """Only assign multiplier values in freegame"""
         if self.gametype != self.config.basegame_type:
             multiplier_value = get_random_outcome(
-                self.get_current_distribution_conditions()["mult_values"][self.gametype]
+                self.get_current_distribution_conditions()["mult_values"][self.gametype], rng=self.rng
             )
             symbol.assign_attribute({"multiplier": multiplier_value})
 
     def assign_prize_value(self, symbol):
         """Only assign multiplier values in freegame"""
         # if self.gametype != self.config.basegame_type:
-        multiplier_value = get_random_outcome(self.get_current_distribution_conditions()["prize_values"])
+        multiplier_value = get_random_outcome(self.get_current_distribution_conditions()["prize_values"], rng=self.rng)
         symbol.assign_attribute({"prize": multiplier_value})
 
     def check_repeat(self) -> None:
         """Checks if the spin failed a criteria constraint at any point."""
-        if self.repeat is False:
+        game_specific = self.repeat
+        if not game_specific:
             win_criteria = self.get_current_betmode_distributions().get_win_criteria()
             if win_criteria is not None and self.final_win != win_criteria:
-                self.repeat = True
+                self.reject_spin("win_criteria", target=win_criteria, final=self.final_win)
 
             if self.get_current_distribution_conditions()["force_freegame"] and not (self.triggered_freegame):
-                self.repeat = True
+                self.reject_spin("force_freegame")
 
             if self.win_manager.running_bet_win == 0.0 and self.criteria != "0":
-                self.repeat = True
+                self.reject_spin("zero_win")
+        self.record_attempt(game_specific)
 
     def reset_superspin(self):
         self.tot_fs = 3
         self.fs = 0
-        self.sticky_symbols = []
-        self.existing_sticky_symbols = []
+        self.sticky_symbols = StickyPositions(self.config.num_rows, ("prize",))
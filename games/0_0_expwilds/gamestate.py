@@ -45,7 +45,9 @@ class GameState(GameStateOverride):
             self.update_freespin()
             self.draw_board(emit_event=False)
 
-            wild_on_reveal = get_random_outcome(self.get_current_distribution_conditions()["landing_wilds"])
+            wild_on_reveal = get_random_outcome(
+                self.get_current_distribution_conditions()["landing_wilds"], rng=self.rng
+            )
             self.assign_new_wilds(wild_on_reveal)
             self.update_with_existing_wilds()  # Override board with expanding wilds, update mults on each
 
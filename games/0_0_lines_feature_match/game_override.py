@@ -21,7 +21,7 @@ class GameStateOverride(GameExecutables):
         multiplier_value = 1
         if self.gametype == self.config.freegame_type:
             multiplier_value = get_random_outcome(
-                self.get_current_distribution_conditions()["mult_values"][self.gametype]
+                self.get_current_distribution_conditions()["mult_values"][self.gametype], rng=self.rng
             )
         symbol.assign_attribute({"multiplier": multiplier_value})
 
@@ -30,8 +30,8 @@ class GameStateOverride(GameExecutables):
         if self.repeat is False:
             win_criteria = self.get_current_betmode_distributions().get_win_criteria()
             if win_criteria is not None and self.final_win != win_criteria:
-                self.repeat = True
+                self.reject_spin("win_criteria", target=win_criteria, final=self.final_win)
                 return
             if win_criteria is None and self.final_win == 0:
-                self.repeat = True
+                self.reject_spin("zero_win")
                 return
@@ -0,0 +1,136 @@
+"""Integer-coded bonus reelstrips shared between sessions, with symbol removal applied copy-on-write."""
+
+
+class BonusReelLibrary:
+    """Symbol codes and coded reelstrips, built once per gamestate the first time each strip is used."""
+
+    def __init__(self, reels: dict):
+        self.reels = reels
+        self.names = []
+        self.codes = {}
+        self.coded = {}
+
+    def code(self, name: str) -> int:
+        if name not in self.codes:
+            self.codes[name] = len(self.names)
+            self.names.append(name)
+        return self.codes[name]
+
+    def get(self, reel_id: str) -> tuple:
+        """(coded reels, per-reel {code: stops}) of a reelstrip, neither is ever modified."""
+        if reel_id not in self.coded:
+            reels = tuple(tuple(self.code(name) for name in strip) for strip in self.reels[reel_id])
+            stops = []
+            for strip in reels:
+                reel_stops = {}
+                for stop, code in enumerate(strip):
+                    reel_stops.setdefault(code, []).append(stop)
+                stops.append({code: tuple(positions) for code, positions in reel_stops.items()})
+            self.coded[reel_id] = (reels, tuple(stops))
+        return self.coded[reel_id]
+
+    def session(self, reel_id: str, legacy_shuffle: bool) -> "BonusReelstrip":
+        return BonusReelstrip(self, reel_id, legacy_shuffle)
+
+
+class BonusReelstrip:
+    """
+    One bonus session's reelstrip. Reels point at the shared coded strip until a removal first changes them.
+
+    With legacy_shuffle the affected reels are rebuilt exactly as the original list-of-names strips were (filter,
+    backfill from the remaining stops, shuffle), consuming the rng identically. Otherwise removed stops are
+    substituted in place from the remaining stops, touching only the stops which held the removed symbol.
+    """
+
+    def __init__(self, library: BonusReelLibrary, reel_id: str, legacy_shuffle: bool):
+        self.library = library
+        self.reel_id = reel_id
+        self.legacy_shuffle = legacy_shuffle
+        base_reels, base_stops = library.get(reel_id)
+        self.reels = list(base_reels)
+        self.stops = list(base_stops)
+        self.owned = [False] * len(base_reels)
+
+    def __len__(self) -> int:
+        return len(self.reels)
+
+    def __getitem__(self, reel: int) -> list:
+        """Symbol names of a reel (a copy), for code which expects plain reelstrips."""
+        return [self.library.names[code] for code in self.reels[reel]]
+
+    def reel_length(self, reel: int) -> int:
+        return len(self.reels[reel])
+
+    def symbol(self, reel: int, stop: int) -> str:
+        return self.library.names[self.reels[reel][stop]]
+
+    def _own(self, reel: int) -> list:
+        if not self.owned[reel]:
+            self.reels[reel] = list(self.reels[reel])
+            self.stops[reel] = dict(self.stops[reel])
+            self.owned[reel] = True
+        return self.reels[reel]
+
+    def remove_symbol(self, name: str, rng, fallback: list = None) -> bool:
+        """
+        Replace every stop of a symbol, returns True if any reel changed.
+        A reel holding nothing else is refilled from fallback symbol names, or raises if none are given.
+        """
+        code = self.library.codes.get(name)
+        if code is None:
+            return False
+        fallback_codes = None if fallback is None else [self.library.code(sym) for sym in fallback]
+        if self.legacy_shuffle:
+            return self._rebuild_without(code, rng, fallback_codes)
+        return self._substitute(code, rng, fallback_codes)
+
+    def _exhausted(self, name: str, reel: int, fallback_codes: list, rng) -> list:
+        if not fallback_codes:
+            raise RuntimeError(f"Symbol removal '{name}' exhausted reel {reel} in {self.reel_id}.")
+        return [rng.choice(fallback_codes) for _ in range(len(self.reels[reel]))]
+
+    def _rebuild_without(self, code: int, rng, fallback_codes: list) -> bool:
+        changed = False
+        for reel, strip in enumerate(self.reels):
+            if code not in strip:
+                continue
+            filtered = [sym for sym in strip if sym != code]
+            if not filtered:
+                new_strip = self._exhausted(self.library.names[code], reel, fallback_codes, rng)
+            else:
+                new_strip = filtered + [rng.choice(filtered) for _ in range(len(strip) - len(filtered))]
+                rng.shuffle(new_strip)
+            self.reels[reel] = new_strip
+            self.owned[reel] = True
+            changed = True
+        return changed
+
+    def _substitute(self, code: int, rng, fallback_codes: list) -> bool:
+        changed = False
+        for reel in range(len(self.reels)):
+            removed_stops = self.stops[reel].get(code)
+            if not removed_stops:
+                continue
+            strip = self.reels[reel]
+            if len(removed_stops) == len(strip):
+                replacements = self._exhausted(self.library.names[code], reel, fallback_codes, rng)
+            else:
+                # uniform over the stops which keep their symbol, by rejection against the removed symbol
+                replacements = []
+                for _ in removed_stops:
+                    candidate = strip[rng.randrange(len(strip))]
+                    while candidate == code:
+                        candidate = strip[rng.randrange(len(strip))]
+                    replacements.append(candidate)
+
+            strip = self._own(reel)
+            reel_stops = self.stops[reel]
+            del reel_stops[code]
+            added = {}
+            for stop, replacement in zip(removed_stops, replacements):
+                strip[stop] = replacement
+                added.setdefault(replacement, []).append(stop)
+            for replacement, positions in added.items():
+                reel_stops[replacement] = reel_stops.get(replacement, ()) + tuple(positions)
+            changed = True
+        return changed
@@ -113,6 +113,10 @@ class GameConfig(Config):
         self.reels = {}
         for r, f in reels.items():
             self.reels[r] = self.read_reels_csv(os.path.join(self.reels_path, f))
+        # Symbol removal rebuilds and shuffles affected bonus reels exactly as published books were generated.
+        # Set False to substitute only the removed stops in place (changes the bonus math, re-optimize if so).
+        self.symbol_removal_compat = True
+        self.rng_settings.append("symbol_removal_compat")
 
         self.padding_reels[self.basegame_type] = self.reels["BR0"]
         self.padding_reels[self.freegame_type] = self.reels["FR0"]
@@ -1,10 +1,9 @@
-import os
-import random
-from copy import deepcopy
 from typing import Optional
 
+from bonus_reels import BonusReelLibrary
 from game_executables import GameExecutables
 from src.calculations.statistics import get_random_outcome
+from src.calculations.sticky import StickyPositions
 from src.events.events import (
     fs_trigger_event,
     reveal_event,
@@ -21,13 +20,17 @@ class GameStateOverride(GameExecutables):
     - Dual bonus modes with symbol removal handling
     """
 
+    def __init__(self, config):
+        self.bonus_reel_library = BonusReelLibrary(config.reels)
+        super().__init__(config)
+
     def reset_book(self):
         super().reset_book()
         self.pending_bonus_mode = None
         self.active_bonus_mode = None
         self.bonus_reel_maps = {}
         self.active_reel_weights = None
-        self.sticky_wild_positions = {}
+        self.sticky_wild_positions = StickyPositions(self.config.num_rows, ("multiplier",))
         self.removed_symbols = set()
         self.next_symbol_removal_index = 0
         self.scatter_disabled = False
@@ -42,25 +45,27 @@ class GameStateOverride(GameExecutables):
         multiplier_value = 1
         mult_config = self.get_current_distribution_conditions().get("mult_values", {})
         if self.gametype in mult_config:
-            multiplier_value = get_random_outcome(mult_config[self.gametype])
+            multiplier_value = get_random_outcome(mult_config[self.gametype], rng=self.rng)
         symbol.assign_attribute({"multiplier": multiplier_value})
 
     # --- Bonus session helpers -------------------------------------------------
 
     def initialize_bonus_session(self):
-        """Create local reel copies, removal state, and sticky storage."""
+        """Create copy-on-write bonus reels, removal state, and sticky storage."""
         if self.pending_bonus_mode is None:
             raise RuntimeError("Bonus mode not set before initializing free spins.")
         self.active_bonus_mode = self.pending_bonus_mode
         self.pending_bonus_mode = None
-        self.sticky_wild_positions = {}
+        self.sticky_wild_positions.clear()
         self.removed_symbols = set()
         self.next_symbol_removal_index = 0
 
         base_reel_weights = self.get_current_distribution_conditions()["reel_weights"][self.config.freegame_type]
         self.active_reel_weights = self._select_bonus_reel_weights(base_reel_weights)
+        legacy_shuffle = getattr(self.config, "symbol_removal_compat", True)
         self.bonus_reel_maps = {
-            reel_id: deepcopy(self.config.reels[reel_id]) for reel_id in self.active_reel_weights.keys()
+            reel_id: self.bonus_reel_library.session(reel_id, legacy_shuffle)
+            for reel_id in self.active_reel_weights.keys()
         }
 
         if self.active_bonus_mode == "hyper":
@@ -84,41 +89,17 @@ class GameStateOverride(GameExecutables):
     def clear_bonus_session(self):
         self.active_bonus_mode = None
         self.bonus_reel_maps = {}
-        self.sticky_wild_positions = {}
+        self.sticky_wild_positions.clear()
         self.removed_symbols = set()
         self.next_symbol_removal_index = 0
         self.active_reel_weights = None
         self.scatter_disabled = False
 
-    def _replicate_symbols(self, strip: list[str], count: int) -> list[str]:
-        """Return `count` replacement symbols sampled from the current strip."""
-        if not strip:
-            return []
-        return [random.choice(strip) for _ in range(count)]
-
     def _remove_symbol_from_bonus_reels(self, symbol_name: str) -> bool:
-        """Remove a symbol from all bonus reel copies; returns True if anything changed."""
+        """Remove a symbol from all bonus reels; returns True if anything changed."""
         removed_any = False
         for reel_id in self.bonus_reel_maps:
-            for reel_index, reel_strip in enumerate(self.bonus_reel_maps[reel_id]):
-                if symbol_name not in reel_strip:
-                    continue
-
-                filtered_strip = [sym for sym in reel_strip if sym != symbol_name]
-                removed_count = len(reel_strip) - len(filtered_strip)
-                if removed_count == 0:
-                    continue
-
-                if len(filtered_strip) == 0:
-                    raise RuntimeError(f"Symbol removal '{symbol_name}' exhausted reel {reel_index} in {reel_id}.")
-
-                replacements = self._replicate_symbols(filtered_strip, removed_count)
-                if len(replacements) < removed_count:
-                    raise RuntimeError(f"Unable to backfill removed symbols for reel {reel_index} in {reel_id}.")
-
-                new_strip = filtered_strip + replacements
-                random.shuffle(new_strip)
-                self.bonus_reel_maps[reel_id][reel_index] = new_strip
+            if self.bonus_reel_maps[reel_id].remove_symbol(symbol_name, self.rng):
                 removed_any = True
 
         if removed_any:
@@ -126,22 +107,10 @@ class GameStateOverride(GameExecutables):
         return removed_any
 
     def _purge_symbol_from_bonus_reels(self, symbol_name: str) -> None:
-        """Completely remove a symbol (e.g., scatter) from all bonus reel strips."""
+        """Completely remove a symbol (e.g., scatter) from all bonus reels."""
         for reel_id in self.bonus_reel_maps:
-            for reel_index, reel_strip in enumerate(self.bonus_reel_maps[reel_id]):
-                if symbol_name not in reel_strip:
-                    continue
-                filtered_strip = [sym for sym in reel_strip if sym != symbol_name]
-                if not filtered_strip:
-                    # Removing this symbol would empty the strip; instead, replace scatters with lows.
-                    fallback_symbols = self.config.symbol_ids["low"] or [sym for sym in reel_strip if sym != symbol_name]
-                    replacements = [random.choice(fallback_symbols) for _ in reel_strip]
-                    self.bonus_reel_maps[reel_id][reel_index] = replacements
-                    continue
-                replacements = self._replicate_symbols(filtered_strip, len(reel_strip) - len(filtered_strip))
-                new_strip = filtered_strip + replacements
-                random.shuffle(new_strip)
-                self.bonus_reel_maps[reel_id][reel_index] = new_strip
+            # Removing this symbol would empty a reel; instead, replace scatters with lows.
+            self.bonus_reel_maps[reel_id].remove_symbol(symbol_name, self.rng, fallback=self.config.symbol_ids["low"])
 
     def _disable_future_scatter_triggers(self) -> None:
         """Prevent additional scatter retriggers once all removals are complete."""
@@ -165,7 +134,7 @@ class GameStateOverride(GameExecutables):
         return None
 
     def draw_bonus_board(self, emit_event: bool = True):
-        """Create a board using the mutable bonus reelstrips."""
+        """Create a board reading through the session's bonus reels."""
         if not self.bonus_reel_maps:
             raise RuntimeError("Bonus reel strips not initialized.")
 
@@ -173,7 +142,7 @@ class GameStateOverride(GameExecutables):
             freegame_reel_weights = self.active_reel_weights
         else:
             freegame_reel_weights = self.get_current_distribution_conditions()["reel_weights"][self.gametype]
-        reelstrip_id = get_random_outcome(freegame_reel_weights)
+        reelstrip_id = get_random_outcome(freegame_reel_weights, rng=self.rng)
         reelstrip = self.bonus_reel_maps[reelstrip_id]
 
         self.refresh_special_syms()
@@ -187,18 +156,19 @@ class GameStateOverride(GameExecutables):
         first_scatter_reel = -1
 
         for reel in range(self.config.num_reels):
-            if len(reelstrip[reel]) == 0:
+            reel_length = reelstrip.reel_length(reel)
+            if reel_length == 0:
                 raise RuntimeError(f"Reel {reel} for strip {reelstrip_id} is empty after symbol removal.")
             board[reel] = [None] * self.config.num_rows[reel]
-            reel_pos = random.randrange(0, len(reelstrip[reel]))
+            reel_pos = self.rng.randrange(0, reel_length)
             reel_positions[reel] = reel_pos
             if self.config.include_padding:
-                top_symbols.append(self.create_symbol(reelstrip[reel][(reel_pos - 1) % len(reelstrip[reel])]))
+                top_symbols.append(self.create_symbol(reelstrip.symbol(reel, (reel_pos - 1) % reel_length)))
                 bottom_symbols.append(
-                    self.create_symbol(reelstrip[reel][(reel_pos + len(board[reel])) % len(reelstrip[reel])])
+                    self.create_symbol(reelstrip.symbol(reel, (reel_pos + len(board[reel])) % reel_length))
                 )
             for row in range(self.config.num_rows[reel]):
-                sym_id = reelstrip[reel][(reel_pos + row) % len(reelstrip[reel])]
+                sym_id = reelstrip.symbol(reel, (reel_pos + row) % reel_length)
                 symbol = self.create_symbol(sym_id)
                 board[reel][row] = symbol
                 if symbol.special:
@@ -213,7 +183,7 @@ class GameStateOverride(GameExecutables):
                                     and first_scatter_reel == -1
                                 ):
                                     first_scatter_reel = reel + 1
-            padding_positions[reel] = (reel_positions[reel] + len(board[reel]) + 1) % len(reelstrip[reel])
+            padding_positions[reel] = (reel_positions[reel] + len(board[reel]) + 1) % reel_length
 
         if first_scatter_reel > -1 and first_scatter_reel != self.config.num_reels:
             count = 1
@@ -240,7 +210,7 @@ class GameStateOverride(GameExecutables):
             self.get_special_symbols_on_board()
             return
 
-        for (reel, row), multiplier in self.sticky_wild_positions.items():
+        for reel, row, multiplier in self.sticky_wild_positions.items("multiplier"):
             sticky_symbol = self.create_symbol("wild")
             sticky_symbol.assign_attribute({"multiplier": multiplier})
             self.board[reel][row] = sticky_symbol
@@ -249,24 +219,18 @@ class GameStateOverride(GameExecutables):
     def capture_new_sticky_wilds(self) -> list:
         """Record any new wilds that landed this spin so they persist."""
         new_wilds = []
-        for reel in range(self.config.num_reels):
-            for row in range(self.config.num_rows[reel]):
-                symbol = self.board[reel][row]
-                if symbol.name != "wild":
-                    continue
-                key = (reel, row)
-                if key in self.sticky_wild_positions:
-                    continue
-                multiplier = symbol.get_attribute("multiplier") if symbol.check_attribute("multiplier") else 1
-                self.sticky_wild_positions[key] = multiplier
-                new_wilds.append({"reel": reel, "row": row, "multiplier": multiplier})
+        for reel, row in self.sticky_wild_positions.new_positions(self.board, lambda symbol: symbol.name == "wild"):
+            symbol = self.board[reel][row]
+            multiplier = symbol.get_attribute("multiplier") if symbol.check_attribute("multiplier") else 1
+            self.sticky_wild_positions.add(reel, row, multiplier=multiplier)
+            new_wilds.append({"reel": reel, "row": row, "multiplier": multiplier})
         return new_wilds
 
     def seed_initial_sticky_wilds(self, min_new: int, max_new: int) -> None:
         """Seed sticky wilds before the first bonus spin begins."""
         if max_new <= 0:
             return
-        count = random.randint(max(min_new, 0), max_new)
+        count = self.rng.randint(max(min_new, 0), max_new)
         if count <= 0:
             return
 
@@ -276,15 +240,15 @@ class GameStateOverride(GameExecutables):
             for reel in allowed_reels
             for row in range(self.config.num_rows[reel])
         ]
-        random.shuffle(positions)
+        self.rng.shuffle(positions)
         for reel, row in positions[:count]:
-            self.sticky_wild_positions[(reel, row)] = self._get_seed_multiplier()
+            self.sticky_wild_positions.add(reel, row, multiplier=self._get_seed_multiplier())
 
     def _get_seed_multiplier(self) -> int:
         dist = self.get_current_distribution_conditions().get("mult_values", {})
         weights = dist.get(self.config.freegame_type) or {2: 40, 3: 35, 5: 20, 10: 5}
         total = sum(weights.values()) or 1
-        target = random.random() * total
+        target = self.rng.random() * total
         upto = 0
         for mult, weight in weights.items():
             upto += weight
@@ -333,23 +297,3 @@ class GameStateOverride(GameExecutables):
                 total_removed=len(self.removed_symbols),
                 bonus_mode=self.active_bonus_mode,
             )
-
-    def check_repeat(self):
-        super().check_repeat()
-        if self.repeat:
-            return
-
-        win_criteria = self.get_current_betmode_distributions().get_win_criteria()
-        if win_criteria is not None and self.final_win != win_criteria:
-            self.repeat = True
-            if os.getenv("SIM_DEBUG_PROGRESS", "0") != "0":
-                print(
-                    "[sim-debug] repeat_override mode={mode} criteria={criteria} "
-                    "target={target} final={final}".format(
-                        mode=self.betmode,
-                        criteria=self.criteria,
-                        target=win_criteria,
-                        final=self.final_win,
-                    ),
-                    flush=True,
-                )
@@ -1,5 +1,3 @@
-import os
-
 from game_override import GameStateOverride
 from src.events.events import reveal_event
 
@@ -8,25 +6,12 @@ class GameState(GameStateOverride):
     """Handles game logic and events for a single simulation number/game-round."""
 
     def run_spin(self, sim, simulation_seed=None):
-        debug_spin = os.getenv("SIM_DEBUG_PROGRESS", "0") != "0"
-        attempt_interval = max(int(os.getenv("SIM_DEBUG_SPIN_INTERVAL", "100")), 1)
         attempt = 0
         self.reset_seed(sim)
         self.repeat = True
         while self.repeat:
             attempt += 1
-            if debug_spin and (attempt == 1 or attempt % attempt_interval == 0):
-                print(
-                    "[sim-debug] spin_attempt mode={mode} criteria={criteria} attempt={attempt_count} "
-                    "betmode={betmode} seed={seed}".format(
-                        mode=self.betmode,
-                        criteria=self.criteria,
-                        attempt_count=attempt,
-                        betmode=self.betmode,
-                        seed=simulation_seed,
-                    ),
-                    flush=True,
-                )
+            self.tracer.spin_attempt(attempt, criteria=self.criteria, sim=self.sim, seed=simulation_seed)
             self.reset_book()
             self.draw_board()
 
@@ -41,34 +26,20 @@ class GameState(GameStateOverride):
 
             self.evaluate_finalwin()
             self.check_repeat()
-            if debug_spin and not self.repeat:
-                print(
-                    "[sim-debug] spin_resolved mode={mode} criteria={criteria} attempts={attempt_count} "
-                    "final_win={win:.4f} triggered_fg={fg}".format(
-                        mode=self.betmode,
-                        criteria=self.criteria,
-                        attempt_count=attempt,
-                        win=self.final_win,
-                        fg=self.triggered_freegame,
-                    ),
-                    flush=True,
+            if not self.repeat:
+                self.tracer.spin_resolved(
+                    attempt,
+                    criteria=self.criteria,
+                    sim=self.sim,
+                    final_win=self.final_win,
+                    triggered_fg=self.triggered_freegame,
                 )
         self.imprint_wins()
 
     def run_freespin(self):
-        debug_fs = os.getenv("SIM_DEBUG_PROGRESS", "0") != "0"
-        fs_interval = max(int(os.getenv("SIM_DEBUG_FS_INTERVAL", "5")), 1)
         self.reset_fs_spin()
         self.initialize_bonus_session()
-        if debug_fs:
-            print(
-                "[sim-debug] fs_start mode={mode} criteria={criteria} total_fs={tot}".format(
-                    mode=self.betmode,
-                    criteria=self.criteria,
-                    tot=self.tot_fs,
-                ),
-                flush=True,
-            )
+        self.tracer.freespin("start", total=self.tot_fs, criteria=self.criteria, sim=self.sim)
         while self.fs < self.tot_fs and not self.wincap_triggered:
             self.update_freespin()
             current_fs = self.fs
@@ -84,34 +55,24 @@ class GameState(GameStateOverride):
 
             self.win_manager.update_gametype_wins(self.gametype)
 
-            if debug_fs and (
-                current_fs == 1 or current_fs == self.tot_fs or current_fs % fs_interval == 0
-            ):
-                print(
-                    "[sim-debug] fs_progress mode={mode} criteria={criteria} spin={current}/{total} "
-                    "session_win={win:.4f} removed={removed} retriggers={tot_fs}".format(
-                        mode=self.betmode,
-                        criteria=self.criteria,
-                        current=current_fs,
-                        total=self.tot_fs,
-                        win=self.win_manager.freegame_wins,
-                        removed=len(self.removed_symbols),
-                        tot_fs=self.tot_fs,
-                    ),
-                    flush=True,
-                )
+            self.tracer.freespin(
+                "progress",
+                spin=current_fs,
+                total=self.tot_fs,
+                criteria=self.criteria,
+                sim=self.sim,
+                session_win=self.win_manager.freegame_wins,
+                removed=len(self.removed_symbols),
+            )
 
         self.clear_bonus_session()
         self.end_freespin()
-        if debug_fs:
-            print(
-                "[sim-debug] fs_end mode={mode} criteria={criteria} final_fs={tot} session_win={win:.4f} "
-                "wincap_triggered={cap}".format(
-                    mode=self.betmode,
-                    criteria=self.criteria,
-                    tot=self.tot_fs,
-                    win=self.win_manager.freegame_wins,
-                    cap=self.wincap_triggered,
-                ),
-                flush=True,
-            )
+        self.tracer.freespin(
+            "end",
+            spin=self.fs,
+            total=self.tot_fs,
+            criteria=self.criteria,
+            sim=self.sim,
+            session_win=self.win_manager.freegame_wins,
+            wincap_triggered=self.wincap_triggered,
+        )
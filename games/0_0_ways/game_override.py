@@ -18,7 +18,7 @@ class GameStateOverride(GameExecutables):
 
     def assign_mult_property(self, symbol):
         """Assign symbol multiplier using probabilities defined in config distributions."""
-        multiplier_value = get_random_outcome(self.get_current_distribution_conditions()["mult_values"])
+        multiplier_value = get_random_outcome(self.get_current_distribution_conditions()["mult_values"], rng=self.rng)
         symbol.assign_attribute({"multiplier": multiplier_value})
 
     def check_game_repeat(self):
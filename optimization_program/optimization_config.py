@@ -61,11 +61,14 @@ class ConstructParameters:
         min_m2m: float,
         max_m2m: float,
         pmb_rtp: float,
-        sim_trials: int,
         test_spins: list,
         test_weights: list,
         score_type: str = "rtp",
+        warm_start: bool = False,
+        sim_trials: int = None,
     ):
+        if sim_trials is not None:
+            warn("sim_trials is deprecated and ignored, sessions are scored from the win distribution directly.")
 
         self.parameters = {
             "num_show_pigs": num_show,
@@ -73,10 +76,10 @@ class ConstructParameters:
             "min_mean_to_median": min_m2m,
             "max_mean_to_median": max_m2m,
             "pmb_rtp": pmb_rtp,
-            "simulation_trials": sim_trials,
             "test_spins": test_spins,
             "test_spins_weights": test_weights,
             "score_type": score_type,
+            "warm_start": warm_start,
         }
 
     def return_dict(self):
@@ -2,12 +2,17 @@ import json
 import toml
 import subprocess
 import os
-from src.config.paths import PATH_TO_GAMES, SETUP_PATH, OPTIMIZATION_PATH, PROJECT_PATH
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from src.config.paths import PATH_TO_GAMES, OPTIMIZATION_PATH
+from src.write_data.optimizer_bundle import ensure_optimizer_bundle
 
 
 class OptimizationExecution:
     """Handles execution of Rust optimization algorithm from python."""
 
+    binary_path = None
+
     @staticmethod
     def load_math_config(filename: str) -> dict:
         """Load optimization parameter config file."""
@@ -16,17 +21,32 @@ class OptimizationExecution:
         return data
 
     @staticmethod
-    def run_opt_single_mode(game_config, mode, threads):
-        """Create setup txt file for a single mode and run Rust executable binary."""
-        os.chdir(PROJECT_PATH)
-        filename = os.path.join(PATH_TO_GAMES, game_config.game_id, "library", "configs", "math_config.json")
-        opt_config = OptimizationExecution.load_math_config(filename)
+    def get_rust_env() -> dict:
+        cargo_bin_path = os.path.join(os.path.expanduser("~"), ".cargo", "bin")
+        return {**os.environ, "PATH": cargo_bin_path + os.pathsep + os.environ.get("PATH", "")}
 
+    @staticmethod
+    def build_optimizer() -> str:
+        """Compile the optimizer once per session and return the release binary path."""
+        if OptimizationExecution.binary_path is None:
+            print("Building optimization program...")
+            OptimizationExecution.stream_process(
+                ["cargo", "build", "--release"], OptimizationExecution.get_rust_env()
+            )
+            binary = "PigFarmRust.exe" if sys.platform == "win32" else "PigFarmRust"
+            OptimizationExecution.binary_path = os.path.join(OPTIMIZATION_PATH, "target", "release", binary)
+        return OptimizationExecution.binary_path
+
+    @staticmethod
+    def write_setup_file(game_config, mode, threads) -> str:
+        """Write a mode's optimization parameters to its own setup file, so modes can run concurrently."""
         opt_config = game_config.opt_params
         params = None
         for idx, obj in opt_config.items():
             if idx == mode:
                 params = obj["parameters"]
+        assert params is not None, "Could not load optimization parameters."
+
         params["game_name"] = game_config.game_id
         params["path_to_games"] = "../games/"
         params["run_1000_batch"] = False
@@ -34,35 +54,74 @@ class OptimizationExecution:
         params["threads_for_fence_construction"] = threads
         params["threads_for_show_construction"] = threads
 
-        assert params is not None, "Could not load optimization parameters."
-
-        with open(SETUP_PATH, "w", encoding="UTF-8") as f:
+        setup_path = os.path.join(
+            PATH_TO_GAMES, game_config.game_id, "library", "optimization_files", f"setup_{mode}.toml"
+        )
+        os.makedirs(os.path.dirname(setup_path), exist_ok=True)
+        with open(setup_path, "w", encoding="UTF-8") as f:
             toml.dump(params, f)
-        print(f"Running optimization for mode: {mode}")
-        OptimizationExecution.run_rust_script()
+        return setup_path
 
     @staticmethod
-    def run_all_modes(game_config, modes_to_run, rust_threads):
-        """Loop through all game modes to run"""
-        for mode in modes_to_run:
-            OptimizationExecution.run_opt_single_mode(game_config, mode, rust_threads)
+    def run_opt_single_mode(game_config, mode, threads, prefix=""):
+        """Create the mode's setup file and run the compiled Rust binary."""
+        filename = os.path.join(PATH_TO_GAMES, game_config.game_id, "library", "configs", "math_config.json")
+        OptimizationExecution.load_math_config(filename)
+
+        setup_path = OptimizationExecution.write_setup_file(game_config, mode, threads)
+        ensure_optimizer_bundle(os.path.join(PATH_TO_GAMES, game_config.game_id, "library"), mode)
+        print(f"{prefix}Running optimization for mode: {mode} ({threads} threads)", flush=True)
+        OptimizationExecution.run_rust_script(setup_path, prefix)
 
     @staticmethod
-    def run_rust_script():
-        """Run compiled binary and pip results to terminal."""
-        cargo_bin_path = os.path.join(os.path.expanduser("~"), ".cargo", "bin")
-        updated_path = cargo_bin_path + os.pathsep + os.environ.get("PATH", "")
-        result = subprocess.run(
-            ["cargo", "run", "--release"],
+    def run_all_modes(game_config, modes_to_run, rust_threads, max_parallel_modes=None):
+        """
+        Build once, then optimize modes concurrently. rust_threads is the total core budget, split evenly
+        between the modes running at the same time.
+        """
+        OptimizationExecution.build_optimizer()
+        if max_parallel_modes is None:
+            max_parallel_modes = len(modes_to_run)
+        parallel_modes = max(min(max_parallel_modes, len(modes_to_run), rust_threads), 1)
+        threads_per_mode = max(rust_threads // parallel_modes, 1)
+
+        if parallel_modes == 1:
+            for mode in modes_to_run:
+                OptimizationExecution.run_opt_single_mode(game_config, mode, threads_per_mode)
+            return
+
+        with ThreadPoolExecutor(max_workers=parallel_modes) as executor:
+            futures = [
+                executor.submit(
+                    OptimizationExecution.run_opt_single_mode, game_config, mode, threads_per_mode, f"[{mode}] "
+                )
+                for mode in modes_to_run
+            ]
+            for future in futures:
+                future.result()
+
+    @staticmethod
+    def run_rust_script(setup_path, prefix=""):
+        """Run the compiled binary on a setup file, streaming its output to the terminal."""
+        binary_path = OptimizationExecution.build_optimizer()
+        OptimizationExecution.stream_process(
+            [binary_path, os.path.abspath(setup_path)], OptimizationExecution.get_rust_env(), prefix
+        )
+
+    @staticmethod
+    def stream_process(command, env, prefix=""):
+        """Print process output line by line as it is produced, raise if the process fails."""
+        with subprocess.Popen(
+            command,
             stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
             text=True,
+            bufsize=1,
             cwd=OPTIMIZATION_PATH,
-            check=True,
-            env={**os.environ, "PATH": updated_path},
-        )
-        if result.returncode == 0:
-            print(result.stdout)
-        else:
-            print("Error in optimization program.")
-            print(result.stderr)
+            env=env,
+        ) as process:
+            for line in process.stdout:
+                print(prefix + line, end="", flush=True)
+        if process.returncode != 0:
+            print(f"{prefix}Error in optimization program.")
+            raise subprocess.CalledProcessError(process.returncode, command)
@@ -1,4 +1,5 @@
 use csv::ReaderBuilder;
+use memmap2::Mmap;
 use serde::{Deserialize, Serialize};
 use serde_json;
 use std::error::Error;
@@ -16,6 +17,7 @@ pub struct SearchKey {
     pub value: String,
 }
 // FORCE RESULT STRUCTS
+#[allow(non_snake_case)] // field names match the force record JSON
 #[derive(Debug, Serialize, Deserialize, Clone)]
 pub struct SearchResult {
     // Each key maps to a vector of serde_json::Value to accommodate different types.
@@ -176,4 +178,151 @@ pub(crate) fn read_look_up_table(
     }
 
     Ok(lookup_table)
-}
\ No newline at end of file
+}
+
+////////////////////////////////////
+/// BINARY BUNDLE WRITTEN BY src/write_data/optimizer_bundle.py
+////////////////////////////////////
+
+const BUNDLE_MAGIC: &[u8; 8] = b"OPTBNDL2";
+
+pub(crate) struct OptimizerBundle {
+    pub ids: Vec<u32>,
+    pub weights: Vec<u64>,
+    pub payouts: Vec<u64>,
+    pub force_options: Vec<SearchResult>,
+}
+
+struct BundleReader<'a> {
+    data: &'a [u8],
+    pos: usize,
+}
+
+impl<'a> BundleReader<'a> {
+    fn take(&mut self, len: usize) -> Result<&'a [u8], Box<dyn Error>> {
+        if self.pos + len > self.data.len() {
+            return Err("optimizer bundle is truncated".into());
+        }
+        let bytes = &self.data[self.pos..self.pos + len];
+        self.pos += len;
+        Ok(bytes)
+    }
+
+    fn u32_array(&mut self, count: usize) -> Result<Vec<u32>, Box<dyn Error>> {
+        Ok(self
+            .take(count * 4)?
+            .chunks_exact(4)
+            .map(|b| u32::from_le_bytes([b[0], b[1], b[2], b[3]]))
+            .collect())
+    }
+
+    fn u64_array(&mut self, count: usize) -> Result<Vec<u64>, Box<dyn Error>> {
+        Ok(self
+            .take(count * 8)?
+            .chunks_exact(8)
+            .map(|b| u64::from_le_bytes([b[0], b[1], b[2], b[3], b[4], b[5], b[6], b[7]]))
+            .collect())
+    }
+
+    fn strings(&mut self, count: usize) -> Result<Vec<String>, Box<dyn Error>> {
+        let offsets = self.u64_array(count + 1)?;
+        let bytes = self.take(offsets[count] as usize)?;
+        let mut strings = Vec::with_capacity(count);
+        for i in 0..count {
+            let s = std::str::from_utf8(&bytes[offsets[i] as usize..offsets[i + 1] as usize])?;
+            strings.push(s.to_string());
+        }
+        Ok(strings)
+    }
+}
+
+pub(crate) fn read_optimizer_bundle(
+    game_name: &str,
+    bet_type: &str,
+    path_to_games: String,
+) -> Result<OptimizerBundle, Box<dyn Error>> {
+    let file_path = Path::new(&path_to_games)
+        .join(game_name)
+        .join("library")
+        .join("lookup_tables")
+        .join(format!("optimizer_bundle_{}.bin", bet_type));
+    let file = File::open(&file_path)?;
+    // The file is only read while mapped, Python rewrites bundles by replacing the whole file
+    let mmap = unsafe { Mmap::map(&file)? };
+    let mut reader = BundleReader { data: &mmap[..], pos: 0 };
+    if reader.take(8)? != &BUNDLE_MAGIC[..] {
+        return Err(format!("{} is not an optimizer bundle", file_path.display()).into());
+    }
+    let counts = reader.u64_array(5)?;
+    let (num_books, num_entries, num_pairs, num_refs, num_strings) = (
+        counts[0] as usize,
+        counts[1] as usize,
+        counts[2] as usize,
+        counts[3] as usize,
+        counts[4] as usize,
+    );
+
+    let weights = reader.u64_array(num_books)?;
+    let payouts = reader.u64_array(num_books)?;
+    let ids = reader.u32_array(num_books)?;
+    let strings = reader.strings(num_strings)?;
+    let times_triggered = reader.u32_array(num_entries)?;
+    let pair_offsets = reader.u64_array(num_entries + 1)?;
+    let pair_names = reader.u32_array(num_pairs)?;
+    let pair_values = reader.u32_array(num_pairs)?;
+    let book_offsets = reader.u64_array(num_entries + 1)?;
+    let book_ids = reader.u32_array(num_refs)?;
+
+    let mut force_options: Vec<SearchResult> = Vec::with_capacity(num_entries);
+    for entry in 0..num_entries {
+        let pairs = pair_offsets[entry] as usize..pair_offsets[entry + 1] as usize;
+        let books = book_offsets[entry] as usize..book_offsets[entry + 1] as usize;
+        force_options.push(SearchResult {
+            search: pairs
+                .map(|p| SearchKey {
+                    name: strings[pair_names[p] as usize].clone(),
+                    value: strings[pair_values[p] as usize].clone(),
+                })
+                .collect(),
+            timesTriggered: times_triggered[entry],
+            bookIds: book_ids[books].to_vec(),
+        });
+    }
+
+    Ok(OptimizerBundle {
+        ids,
+        weights,
+        payouts,
+        force_options,
+    })
+}
+
+// Load the lookup table and force options once, from the binary bundle when present, otherwise from CSV/JSON
+pub(crate) fn load_lookup_and_force_options(
+    game_name: &str,
+    bet_type: &str,
+    path_to_games: String,
+) -> Result<(HashMap<u32, LookUpTableEntry>, Vec<SearchResult>), Box<dyn Error>> {
+    match read_optimizer_bundle(game_name, bet_type, path_to_games.clone()) {
+        Ok(bundle) => {
+            println!("Loaded optimizer bundle: {} books", bundle.ids.len());
+            let mut lookup_table: HashMap<u32, LookUpTableEntry> = HashMap::with_capacity(bundle.ids.len());
+            for i in 0..bundle.ids.len() {
+                lookup_table.insert(
+                    bundle.ids[i],
+                    LookUpTableEntry {
+                        id: bundle.ids[i],
+                        weight: bundle.weights[i],
+                        win: bundle.payouts[i] as f64 / 100.0,
+                    },
+                );
+            }
+            Ok((lookup_table, bundle.force_options))
+        }
+        Err(err) => {
+            println!("Optimizer bundle unavailable ({}), reading CSV and JSON files", err);
+            let lookup_table = read_look_up_table(game_name, bet_type, path_to_games.clone())?;
+            Ok((lookup_table, load_force_options(game_name, bet_type, path_to_games)))
+        }
+    }
+}
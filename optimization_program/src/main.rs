@@ -1,9 +1,9 @@
 use exes::IdentityCondition;
-use ndarray::{s, Array1};
+use ndarray::Array1;
 use rand::prelude::*;
 use rand::Rng;
-use rand_distr::{Distribution, WeightedIndex};
 use rayon::prelude::*;
+use serde::{Deserialize, Serialize};
 use core::panic;
 use std::hash::{Hash, Hasher};
 use std::mem;
@@ -16,9 +16,15 @@ use std::{
 mod setup;
 use setup::SetupConfig;
 
+mod scoring;
+use scoring::{session_success_curve, session_success_probabilities};
+
+mod warm_start;
+use warm_start::{load_pig_pen, load_show_seeds, pig_pen_key, save_pig_pen, save_show_seeds};
+
 mod exes;
 use exes::{
-    load_config_data, load_force_options, read_look_up_table, DressJson, FenceJson,
+    load_config_data, load_lookup_and_force_options, DressJson, FenceJson,
     LookUpTableEntry, SearchResult
 };
 
@@ -26,9 +32,11 @@ use crate::exes::BiasJson;
 // use flame;
 
 fn main() {
-    // Read the contents of the file
+    // Read the contents of the file, a per-mode setup path may be passed as the first argument
     let now = Instant::now();
-    let cont = fs::read_to_string("src/setup.toml").expect("cannot find setup file in src/");
+    let setup_path = std::env::args().nth(1).unwrap_or_else(|| "src/setup.toml".to_string());
+    let cont = fs::read_to_string(&setup_path)
+        .unwrap_or_else(|_| panic!("cannot find setup file {}", setup_path));
     let config: SetupConfig = toml::from_str(&cont).expect("failed to parse setup file");
     
     run_farm(
@@ -40,12 +48,12 @@ fn main() {
         config.threads_for_show_construction,
         &config.test_spins,
         &config.test_spins_weights,
-        config.simulation_trials,
         config.run_1000_batch,
         &config.path_to_games,
         config.min_mean_to_median,
         config.max_mean_to_median,
         config.pmb_rtp,
+        config.warm_start,
     );
     println!("time taken {}ms", now.elapsed().as_secs());
 }
@@ -59,18 +67,25 @@ fn run_farm(
     threads_for_show_construction: u32,
     test_spins: &Vec<u32>,
     test_spins_weights: &Vec<f64>,
-    simulation_trials: u32,
-    run_1000_batch: bool,
+    _run_1000_batch: bool,
     path_to_games: &str,
     min_mean_to_median: f64,
     max_mean_to_median: f64,
     pmb_rtp: f64,
+    warm_start: bool,
 ) {
     println!("Running Simulations: {} - Mode: {}", game_name, bet_type);
 
-    // LOAD IN FORCE OPTIONS AND CONFIG FILE
-    let force_options = load_force_options(game_name, bet_type, path_to_games.to_string());
-    
+    // LOAD IN LOOKUP TABLE, FORCE OPTIONS AND CONFIG FILE
+    let (mut lookup_table, force_options) =
+        match load_lookup_and_force_options(game_name, bet_type, path_to_games.to_string()) {
+            Ok(loaded) => loaded,
+            Err(err) => {
+                eprintln!("Error reading the lookup table: {}", err);
+                return;
+            }
+        };
+
     let config_file: exes::ConfigData;
     config_file = load_config_data(game_name, path_to_games.to_string());
     let bet_mode_index = config_file.bet_modes.iter().position(|bm| bm.bet_mode == bet_type).expect("betmode index not found in betmode summary array");
@@ -78,15 +93,11 @@ fn run_farm(
     let dress_index = config_file.dresses.iter().position(|di|di.bet_mode == bet_type).expect("betmode not found in dress array");
     let bias_index = config_file.bias.iter().position(|bi| bi.bet_mode == bet_type).expect("betmode not found in bias array");
 
-    let mut lookup_table = match read_look_up_table(game_name, bet_type, path_to_games.to_string())
-    {
-        Ok(table) => table,
-        Err(err) => {
-            eprintln!("Error reading the CSV file: {}", err);
-            return;
-        }
-    };
     let init_lookup = lookup_table.clone();
+    let optimization_path = Path::new(path_to_games)
+        .join(game_name)
+        .join("library")
+        .join("optimization_files");
     // NOW WE WANT TO GET A VECTOR CONTAINING ALL THE SORTED WINS
     let mut sorted_wins: Vec<f64> = Vec::new();
     let bet_amount = config_file.bet_modes[bet_mode_index].cost;
@@ -105,6 +116,7 @@ fn run_farm(
     }
     // NOW NEED TO APPLY THE HR TO "x" and generate Pigs for Fence
     let mut pig_pens: Vec<Vec<Pig>> = Vec::with_capacity(fences.len());
+    let mut pen_keys: Vec<(String, String)> = Vec::with_capacity(fences.len());
     for mut fence in &mut fences {
         if fence.hr == -1.0 {
             fence.hr = 1.0 / (1.0 - total_prob);
@@ -124,6 +136,30 @@ fn run_farm(
 
 
         if !fence.win_type {
+            let pen_key = pig_pen_key(
+                &fence,
+                &bias_fence,
+                bet_amount,
+                (num_pigs_per_fence / threads_for_fence_construction) * threads_for_fence_construction,
+            );
+            pen_keys.push((fence.name.clone(), pen_key.clone()));
+            let cached_pigs = if warm_start {
+                load_pig_pen(&optimization_path, bet_type, &fence.name, &pen_key)
+            } else {
+                None
+            };
+            if let Some(fence_pigs) = cached_pigs {
+                println!("Reusing {} distributions, fence is unchanged since the last run", fence_pigs.len());
+                for win in fence.win_dist.keys() {
+                    if !sorted_wins.contains(&win.0) {
+                        sorted_wins.push(win.0);
+                    }
+                }
+                pig_pens.push(fence_pigs);
+                sorted_wins.push(fence.avg_win);
+                continue;
+            }
+
             let mut win_range_params: Vec<&mut Dress> = Vec::new();
             for dress in &mut fence.dresses {
                 win_range_params.push(dress);
@@ -173,6 +209,9 @@ fn run_farm(
                     })
                     .collect()
             });
+            if warm_start {
+                save_pig_pen(&optimization_path, bet_type, &fence.name, &pen_key, &fence_pigs);
+            }
             pig_pens.push(fence_pigs);
         } else {
             const EPSILON: f64 = 1e-9;
@@ -194,16 +233,27 @@ fn run_farm(
         .num_threads(threads_for_show_construction as usize)
         .build()
         .unwrap();
+    // best show pigs of the last run, re-scored first so the search starts from them
+    let seeds: Vec<Vec<Option<usize>>> = if warm_start {
+        let pen_sizes: Vec<usize> = pig_pens.iter().map(|pen| pen.len()).collect();
+        load_show_seeds(&optimization_path, bet_type, &pen_keys, &pen_sizes)
+    } else {
+        Vec::new()
+    };
+    if !seeds.is_empty() {
+        println!("Seeding with {} distributions from the last run", seeds.len());
+    }
     let mut show_pigs: Vec<ShowPig> = thread_pool_show_pigs.install(|| {
         (0..threads_for_show_construction)
             .into_par_iter()
-            .flat_map(|_| {
+            .flat_map(|thread| {
+                let thread_seeds: &[Vec<Option<usize>>] = if thread == 0 { &seeds } else { &[] };
                 create_show_pigs(
                     &fences,
                     num_show_pigs / threads_for_show_construction,
+                    thread_seeds,
                     test_spins,
                     test_spins_weights,
-                    simulation_trials,
                     bet_amount,
                     1,
                     &sorted_wins_array,
@@ -217,15 +267,18 @@ fn run_farm(
             .collect()
     });
     show_pigs.sort_by(|a, b| b.success_score.partial_cmp(&a.success_score).unwrap());
+    if warm_start {
+        save_show_seeds(&optimization_path, bet_type, &pen_keys, &show_pigs[..show_pigs.len().min(10)]);
+    }
 
     print_information(
         &show_pigs,
         &fences,
-        simulation_trials,
         &sorted_wins_array,
         bet_amount,
         test_spins,
         &pig_pens,
+        &init_lookup,
         game_name.to_string(),
         bet_type.to_string(),
         path_to_games.to_string(),
@@ -236,11 +289,11 @@ fn run_farm(
 fn print_information(
     show_pigs: &Vec<ShowPig>,
     fences: &Vec<Fence>,
-    trials: u32,
     sorted_wins: &Array1<f64>,
     bet_amount: f64,
     test_spins: &Vec<u32>,
     pig_pens: &Vec<Vec<Pig>>,
+    init_lookup: &HashMap<u32, LookUpTableEntry>,
     game_name: String,
     bet_type: String,
     path_to_games: String,
@@ -258,18 +311,11 @@ fn print_information(
 
     (0..num_pigs).into_par_iter().for_each(|pig_index| {
         println!("Printing info for Distribution {}", pig_index + 1);
-        let mut lookup_table: HashMap<u32, LookUpTableEntry> =
-            match read_look_up_table(&game_name, &bet_type, path_to_games.to_string()) {
-                Ok(table) => table,
-                Err(err) => {
-                    eprintln!("Error reading the CSV file: {}", err);
-                    return;
-                }
-            };
+        // each distribution reweights its own copy of the table loaded once in run_farm
+        let mut lookup_table: HashMap<u32, LookUpTableEntry> = init_lookup.clone();
         let (succuss_vals, weights, wins_for_fences, weights_from_pigs) = recreate_show_pig(
             &show_pigs[pig_index],
             fences,
-            trials,
             sorted_wins,
             bet_amount,
             test_spins,
@@ -295,7 +341,7 @@ fn print_information(
         let mut non_win_fence_count: usize = 0;
         for fence in fences {
             if fence.win_type {
-                for (index, book_id_list) in &fence.win_dist {
+                for (_win, book_id_list) in &fence.win_dist {
                     for book_id in book_id_list {
                         lookup_table.entry(*book_id).and_modify(|value| {
                             value.weight = ((1.0 / fence.hr / (book_id_list.len() as f64))
@@ -423,7 +469,6 @@ fn get_win_ranges<T: std::io::Write>(
 fn recreate_show_pig(
     show_pig: &ShowPig,
     fences: &Vec<Fence>,
-    trials: u32,
     sorted_wins: &Array1<f64>,
     bet_amount: f64,
     test_spins: &Vec<u32>,
@@ -496,17 +541,11 @@ fn recreate_show_pig(
             non_win_type_count += 1;
         }
     }
-    let mut rtp = 0.0;
-    for index in 0..sorted_wins.len() {
-        rtp += sorted_wins[index] * weights[index]
-    }
-    let success = run_enhanced_simulation(
+    let success = session_success_curve(
         &sorted_wins,
         &weights,
-        test_spins[test_spins.len() - 1usize] as usize,
-        trials as usize,
         bet_amount,
-        test_spins,
+        test_spins[test_spins.len() - 1usize] as usize,
         pmb_rtp,
     );
 
@@ -516,16 +555,16 @@ fn recreate_show_pig(
 fn create_show_pigs(
     fences: &Vec<Fence>,
     num_pigs: u32,
+    seeds: &[Vec<Option<usize>>],
     test_spins: &Vec<u32>,
     test_spins_weights: &Vec<f64>,
-    trials: u32,
     bet_amount: f64,
     process_id: u32,
     sorted_wins: &Array1<f64>,
     pig_pens: &Vec<Vec<Pig>>,
-    rtp: f64,
-    min_mean_to_median: f64,
-    max_mean_to_median: f64,
+    _rtp: f64,
+    _min_mean_to_median: f64,
+    _max_mean_to_median: f64,
     pmb_rtp: f64,
 ) -> Vec<ShowPig> {
     println!("Creating Initial Distributions");
@@ -545,8 +584,6 @@ fn create_show_pigs(
     let mut wins_for_fences: Vec<Vec<f64>> = Vec::new();
     let mut weights_from_pigs: Vec<Vec<f64>> = Vec::new();
     let mut random_weights_to_apply: Vec<Vec<Vec<f64>>> = Vec::new();
-    let mut banks: Array1<f64> =
-        Array1::zeros((test_spins[test_spins.len() - 1] * trials) as usize);
     for fence in fences {
         if !fence.win_type {
             let mut _win_vec: Vec<f64> = Vec::with_capacity(fence.win_dist.len());
@@ -560,19 +597,18 @@ fn create_show_pigs(
         }
     }
 
-    for p in 0..num_pigs {
-        let mut score = 0.0;
+    let num_seeds = seeds.len() as u32;
+    for p in 0..num_seeds + num_pigs {
         let mut pig_indexes: Vec<usize> = Vec::new();
         for w_index in 0..weights.len() {
             weights[w_index] = 0.0;
         }
 
-        pig_indexes = Vec::new();
-        if (p + 1) % (num_pigs / 2) == 0 {
+        if (p + 1) % ((num_seeds + num_pigs) / 2) == 0 {
             println!(
                 "Thread {}: {}% done",
                 process_id,
-                100f32 * ((p + 1) as f32) / (num_pigs as f32)
+                100f32 * ((p + 1) as f32) / ((num_seeds + num_pigs) as f32)
             );
         }
         let mut non_win_type_count: usize = 0;
@@ -596,7 +632,9 @@ fn create_show_pigs(
                             .len()
                     ]);
                 }
-                let pig_index = rng.gen_range(0..=pig_pens[non_win_type_count].len() - 1) as usize;
+                let seed_index = if p < num_seeds { seeds[p as usize][non_win_type_count] } else { None };
+                let pig_index = seed_index
+                    .unwrap_or_else(|| rng.gen_range(0..=pig_pens[non_win_type_count].len() - 1) as usize);
                 pig_indexes.push(pig_index);
                 let random_pig = &pig_pens[non_win_type_count][pig_index];
                 get_weights(
@@ -627,17 +665,11 @@ fn create_show_pigs(
             }
         }
 
-        score = run_simulation(
-            &sorted_wins,
-            &weights,
-            test_spins[test_spins.len() - 1],
-            trials,
-            bet_amount,
-            test_spins,
-            &mut banks,
-            test_spins_weights,
-            pmb_rtp,
-        );
+        let success = session_success_probabilities(&sorted_wins, &weights, bet_amount, test_spins, pmb_rtp);
+        let mut score = 0.0;
+        for i in 0..success.len() {
+            score += success[i] * test_spins_weights[i];
+        }
 
         // RESET THE VALUES
         if score != 0.0 && score >= best_score {
@@ -686,7 +718,7 @@ fn sort_wins_by_parameter(
         let i_c = &mut fence.identity_condition;
 
         if i_c.search.is_empty() && i_c.win_range_start == -1.0 && i_c.opposite == false {
-            for (book_id, entry) in lookup_table {
+            for (_book_id, entry) in lookup_table {
                 fence
                     .win_dist
                     .entry(F64Wrapper(entry.win))
@@ -870,7 +902,7 @@ pub struct PigHeaven<'a> {
     pub min_win: f64,
     pub avg_win: f64,
 }
-#[derive(Clone)]
+#[derive(Clone, Serialize, Deserialize)]
 pub struct Pig {
     pub amps: Vec<f64>,
     pub mus: Vec<f64>,
@@ -1426,115 +1458,9 @@ fn parse_scale_factor(scale_factor: &str) -> ScaleFactor {
     }
 }
 
-fn run_simulation(
-    wins: &Array1<f64>,
-    weights: &Array1<f64>,
-    spins: u32,
-    trials: u32,
-    bet: f64,
-    test_spins: &Vec<u32>,
-    banks: &mut Array1<f64>,
-    test_spins_weights: &Vec<f64>,
-    pmb_rtp: f64,
-) -> f64 {
-    let num_test_spins = test_spins.len();
-    let mut success: Vec<f64> = vec![0.0; num_test_spins];
-
-    let mut rng = thread_rng();
-    let banks_slice = banks.as_slice_mut().unwrap();
-    let weighted_index = WeightedIndex::new(weights).expect("Invalid weights");
-
-    for trial in 0..trials {
-        let chosen_wins_indices = (0..spins)
-            .map(|_| weighted_index.sample(&mut rng))
-            .collect::<Vec<usize>>();
-
-        for (i, &index) in chosen_wins_indices.iter().enumerate() {
-            banks_slice[(trial * spins + i as u32) as usize] = wins[index];
-        }
-    }
-    for trial in 0..trials {
-        for (spin_index, &test_spin) in test_spins.iter().enumerate() {
-            let bank_slice = &banks.slice(s![
-                (trial as usize) * (spins as usize)..(trial * spins + test_spin) as usize
-            ]);
-            let total_bank: f64 = bank_slice.iter().sum();
-            if (total_bank / (test_spin as f64 * bet)) >= pmb_rtp {
-                success[spin_index] += 1.0;
-            }
-        }
-    }
-
-    let mut final_score = 0.0;
-    for i in 0..success.len() {
-        final_score += success[i] / (trials as f64) * test_spins_weights[i];
-    }
-
-    final_score
-}
-
-fn run_enhanced_simulation(
-    wins: &Array1<f64>,
-    weights: &Array1<f64>,
-    spins: usize,
-    trials: usize,
-    bet: f64,
-    test_spins: &Vec<u32>,
-    pmb_rtp: f64,
-) -> Vec<f64> {
-    let num_spins = test_spins[test_spins.len() - 1usize] as usize;
-    let total_spin_trials = num_spins * trials;
-
-    let success: Vec<f64> = (0..num_spins)
-        .into_par_iter()
-        .map(|spin_index| {
-            let mut spin_success = 0.0;
-
-            for _ in 0..trials {
-                let mut rng = thread_rng();
-                let mut banks: Array1<f64> = Array1::zeros(spins);
-                let banks_slice = banks.as_slice_mut().unwrap();
-                let weighted_index = WeightedIndex::new(weights).expect("Invalid weights");
-
-                for i in 0..spins {
-                    banks_slice[i] = wins[weighted_index.sample(&mut rng)];
-                }
-
-                let bank_slice = &banks.slice(s![..(spin_index + 1) as usize]);
-                let total_bank: f64 = bank_slice.iter().sum();
-                if (total_bank / ((spin_index + 1) as f64 * bet)) >= pmb_rtp {
-                    spin_success += 1.0;
-                }
-            }
-
-            spin_success
-        })
-        .collect();
-
-    let total_trials = trials as f64;
-    success.iter().map(|s| s / total_trials).collect()
-}
-
 #[derive(Copy)]
 pub struct F64Wrapper(f64);
 
-impl F64Wrapper {
-    // Method to convert bits to an f64 value
-    fn from_bits(bits: u64) -> f64 {
-        f64::from_bits(bits)
-    }
-    fn new(val: f64) -> Self {
-        F64Wrapper(val)
-    }
-
-    fn value(&self) -> f64 {
-        self.0
-    }
-    fn copy(&self) -> F64Wrapper {
-        F64Wrapper(self.0)
-    }
-}
-
 impl PartialEq for F64Wrapper {
     fn eq(&self, other: &Self) -> bool {
         let diff = (self.0 - other.0).abs() < 0.00000000001;
@@ -1570,7 +1496,7 @@ impl Hash for F64Wrapper {
     }
 }
 
-struct ShowPig {
+pub struct ShowPig {
     pub pig_indexes: Vec<usize>,
     pub success_score: f64
 }
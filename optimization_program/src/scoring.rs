@@ -0,0 +1,184 @@
+use ndarray::Array1;
+use std::f64::consts::PI;
+
+// Session totals are tracked on a grid of GRID_SIZE payout bins up to the largest success threshold. Wins are
+// never negative and thresholds grow with the spin count, so mass pushed past the grid is a success at every
+// later checkpoint and can be dropped. Probabilities are exact for the discretised distribution only: each win
+// is rounded to the nearest bin, pmb_rtp * max_spins * bet / (GRID_SIZE - 1) wide, which moves its mean.
+const GRID_SIZE: usize = 4096;
+const FFT_SIZE: usize = 2 * GRID_SIZE;
+
+#[derive(Clone, Copy)]
+struct Complex {
+    re: f64,
+    im: f64,
+}
+
+impl Complex {
+    fn mul(self, other: Complex) -> Complex {
+        Complex {
+            re: self.re * other.re - self.im * other.im,
+            im: self.re * other.im + self.im * other.re,
+        }
+    }
+}
+
+fn fft(buf: &mut Vec<Complex>, invert: bool) {
+    let n = buf.len();
+    let mut j = 0;
+    for i in 1..n {
+        let mut bit = n >> 1;
+        while j & bit != 0 {
+            j ^= bit;
+            bit >>= 1;
+        }
+        j ^= bit;
+        if i < j {
+            buf.swap(i, j);
+        }
+    }
+
+    let mut len = 2;
+    while len <= n {
+        let angle = if invert { 2.0 * PI / len as f64 } else { -2.0 * PI / len as f64 };
+        let half = len / 2;
+        let twiddles: Vec<Complex> = (0..half)
+            .map(|k| Complex {
+                re: (angle * k as f64).cos(),
+                im: (angle * k as f64).sin(),
+            })
+            .collect();
+        for start in (0..n).step_by(len) {
+            for k in 0..half {
+                let u = buf[start + k];
+                let v = buf[start + k + half].mul(twiddles[k]);
+                buf[start + k] = Complex { re: u.re + v.re, im: u.im + v.im };
+                buf[start + k + half] = Complex { re: u.re - v.re, im: u.im - v.im };
+            }
+        }
+        len <<= 1;
+    }
+
+    if invert {
+        for value in buf.iter_mut() {
+            value.re /= n as f64;
+            value.im /= n as f64;
+        }
+    }
+}
+
+fn spectrum(grid: &[f64]) -> Vec<Complex> {
+    let mut buf = vec![Complex { re: 0.0, im: 0.0 }; FFT_SIZE];
+    for (index, &probability) in grid.iter().enumerate() {
+        buf[index].re = probability;
+    }
+    fft(&mut buf, false);
+    buf
+}
+
+fn multiply_spectra(a: &[Complex], b: &[Complex]) -> Vec<f64> {
+    let mut buf: Vec<Complex> = a.iter().zip(b.iter()).map(|(x, y)| x.mul(*y)).collect();
+    fft(&mut buf, true);
+    // clamp rounding noise, the true values are probabilities
+    buf[..GRID_SIZE].iter().map(|value| value.re.max(0.0)).collect()
+}
+
+fn point_mass_at_zero() -> Vec<f64> {
+    let mut grid = vec![0.0; GRID_SIZE];
+    grid[0] = 1.0;
+    grid
+}
+
+fn discretise(wins: &Array1<f64>, weights: &Array1<f64>, step: f64) -> Vec<f64> {
+    let total_weight: f64 = weights.iter().sum();
+    let mut grid = vec![0.0; GRID_SIZE];
+    for (win, weight) in wins.iter().zip(weights.iter()) {
+        let index = (win / step).round() as usize;
+        if index < GRID_SIZE {
+            grid[index] += weight / total_weight;
+        }
+    }
+    grid
+}
+
+fn success_probability(grid: &[f64], threshold: f64, step: f64) -> f64 {
+    let first_success = ((threshold / step - 1e-9).ceil() as usize).min(GRID_SIZE);
+    let below: f64 = grid[..first_success].iter().sum();
+    (1.0 - below).max(0.0)
+}
+
+fn grid_step(bet: f64, max_spins: u32, pmb_rtp: f64) -> f64 {
+    pmb_rtp * max_spins as f64 * bet / (GRID_SIZE - 1) as f64
+}
+
+/// Probability that the total win after each of test_spins spins is at least pmb_rtp * spins * bet, with wins
+/// rounded to the payout grid.
+pub fn session_success_probabilities(
+    wins: &Array1<f64>,
+    weights: &Array1<f64>,
+    bet: f64,
+    test_spins: &Vec<u32>,
+    pmb_rtp: f64,
+) -> Vec<f64> {
+    let max_spins = *test_spins.iter().max().unwrap();
+    let step = grid_step(bet, max_spins, pmb_rtp);
+    if step <= 0.0 {
+        return vec![1.0; test_spins.len()];
+    }
+    let base = discretise(wins, weights, step);
+
+    // spectra of the 1, 2, 4, ... spin distributions, every checkpoint advances the session by the difference in
+    // spins using one convolution per set bit
+    let mut square_spectra = vec![spectrum(&base)];
+    while (1u32 << square_spectra.len()) <= max_spins {
+        let last = square_spectra.last().unwrap();
+        let squared = multiply_spectra(last, last);
+        square_spectra.push(spectrum(&squared));
+    }
+
+    let mut order: Vec<usize> = (0..test_spins.len()).collect();
+    order.sort_by_key(|&i| test_spins[i]);
+    let mut probabilities = vec![0.0; test_spins.len()];
+    let mut session = point_mass_at_zero();
+    let mut spins_done = 0;
+    for i in order {
+        let mut remaining = test_spins[i] - spins_done;
+        let mut bit = 0;
+        while remaining > 0 {
+            if remaining & 1 == 1 {
+                session = multiply_spectra(&spectrum(&session), &square_spectra[bit]);
+            }
+            remaining >>= 1;
+            bit += 1;
+        }
+        spins_done = test_spins[i];
+        probabilities[i] = success_probability(&session, pmb_rtp * test_spins[i] as f64 * bet, step);
+    }
+    probabilities
+}
+
+/// Success probability after every spin count from 1 to num_spins.
+pub fn session_success_curve(
+    wins: &Array1<f64>,
+    weights: &Array1<f64>,
+    bet: f64,
+    num_spins: usize,
+    pmb_rtp: f64,
+) -> Vec<f64> {
+    let step = grid_step(bet, num_spins as u32, pmb_rtp);
+    if step <= 0.0 {
+        return vec![1.0; num_spins];
+    }
+    let base = discretise(wins, weights, step);
+    let base_spectrum = spectrum(&base);
+
+    let mut curve = Vec::with_capacity(num_spins);
+    let mut session = base;
+    for spins in 1..=num_spins {
+        curve.push(success_probability(&session, pmb_rtp * spins as f64 * bet, step));
+        if spins < num_spins {
+            session = multiply_spectra(&spectrum(&session), &base_spectrum);
+        }
+    }
+    curve
+}
@@ -8,13 +8,19 @@ pub struct SetupConfig {
    pub num_pigs_per_fence:u32,
    pub threads_for_fence_construction:u32,
    pub threads_for_show_construction:u32,
+   #[allow(dead_code)] // only rtp scoring is implemented
    pub score_type:String,
    pub test_spins:Vec<u32>,
    pub test_spins_weights:Vec<f64>,
-   pub simulation_trials:u32,
    pub run_1000_batch:bool,
    pub path_to_games: String,
    pub min_mean_to_median: f64,
    pub max_mean_to_median:f64,
    pub pmb_rtp:f64,
+   #[serde(default = "default_warm_start")]
+   pub warm_start:bool,
+}
+
+fn default_warm_start() -> bool {
+   false
 }
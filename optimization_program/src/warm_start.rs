@@ -0,0 +1,196 @@
+use serde::{Deserialize, Serialize};
+use std::fs::{self, File};
+use std::io::{BufReader, BufWriter};
+use std::path::{Path, PathBuf};
+
+use crate::exes::BiasJson;
+use crate::{Fence, Pig, ScaleFactor, ShowPig};
+
+// Pig pens are cached per fence, keyed by everything create_ancestors reads. A pen is reused when its fence's
+// conditions and book set are unchanged, and the best show pigs of the last run are kept as seeds that point
+// into those pens by key.
+
+#[derive(Serialize, Deserialize)]
+struct PigPenCache {
+    key: String,
+    pigs: Vec<Pig>,
+}
+
+#[derive(Serialize, Deserialize)]
+struct SeedPen {
+    fence: String,
+    key: String,
+    index: usize,
+}
+
+#[derive(Serialize, Deserialize)]
+struct SeedShowPig {
+    score: f64,
+    pens: Vec<SeedPen>,
+}
+
+// FNV-1a, stable between runs and compiler versions unlike std's DefaultHasher
+struct StableHasher(u64);
+
+impl StableHasher {
+    fn new() -> Self {
+        StableHasher(0xcbf29ce484222325)
+    }
+
+    fn write(&mut self, bytes: &[u8]) {
+        for byte in bytes {
+            self.0 ^= *byte as u64;
+            self.0 = self.0.wrapping_mul(0x100000001b3);
+        }
+    }
+
+    fn write_f64(&mut self, value: f64) {
+        self.write(&value.to_le_bytes());
+    }
+
+    fn write_str(&mut self, value: &str) {
+        self.write(&(value.len() as u64).to_le_bytes());
+        self.write(value.as_bytes());
+    }
+}
+
+pub fn pig_pen_key(
+    fence: &Fence,
+    bias: &Option<BiasJson>,
+    bet_amount: f64,
+    num_pigs: u32,
+) -> String {
+    let mut hasher = StableHasher::new();
+    hasher.write_str(&fence.name);
+    for value in [bet_amount, fence.rtp, fence.avg_win, fence.min_mean_to_median, fence.max_mean_to_median] {
+        hasher.write_f64(value);
+    }
+    hasher.write(&num_pigs.to_le_bytes());
+    for dress in &fence.dresses {
+        hasher.write_str(&dress.fence);
+        match dress.scale_factor {
+            ScaleFactor::Factor(factor) => {
+                hasher.write_str("factor");
+                hasher.write_f64(factor);
+            }
+            ScaleFactor::FactorR(factor) => {
+                hasher.write_str("factor_r");
+                hasher.write_f64(factor);
+            }
+        }
+        hasher.write_f64(dress.identity_condition_win_range[0]);
+        hasher.write_f64(dress.identity_condition_win_range[1]);
+        hasher.write_f64(dress.prob);
+    }
+    if let Some(bias) = bias {
+        hasher.write_f64(bias.range[0]);
+        hasher.write_f64(bias.range[1]);
+        hasher.write_f64(bias.prob);
+    }
+
+    let mut win_dist: Vec<(f64, Vec<u32>)> = fence
+        .win_dist
+        .iter()
+        .map(|(win, book_ids)| {
+            let mut book_ids = book_ids.clone();
+            book_ids.sort();
+            (win.0, book_ids)
+        })
+        .collect();
+    win_dist.sort_by(|a, b| a.0.partial_cmp(&b.0).unwrap());
+    for (win, book_ids) in &win_dist {
+        hasher.write_f64(*win);
+        hasher.write(&(book_ids.len() as u64).to_le_bytes());
+        for book_id in book_ids {
+            hasher.write(&book_id.to_le_bytes());
+        }
+    }
+    format!("{:016x}", hasher.0)
+}
+
+fn pig_pen_path(optimization_path: &Path, bet_type: &str, fence_name: &str) -> PathBuf {
+    optimization_path
+        .join("pig_pens")
+        .join(format!("{}_{}.json", bet_type, fence_name))
+}
+
+fn show_seeds_path(optimization_path: &Path, bet_type: &str) -> PathBuf {
+    optimization_path.join("pig_pens").join(format!("{}_show_pigs.json", bet_type))
+}
+
+pub fn load_pig_pen(optimization_path: &Path, bet_type: &str, fence_name: &str, key: &str) -> Option<Vec<Pig>> {
+    let file = File::open(pig_pen_path(optimization_path, bet_type, fence_name)).ok()?;
+    let cache: PigPenCache = serde_json::from_reader(BufReader::new(file)).ok()?;
+    if cache.key == key && !cache.pigs.is_empty() {
+        Some(cache.pigs)
+    } else {
+        None
+    }
+}
+
+pub fn save_pig_pen(optimization_path: &Path, bet_type: &str, fence_name: &str, key: &str, pigs: &Vec<Pig>) {
+    let file_path = pig_pen_path(optimization_path, bet_type, fence_name);
+    fs::create_dir_all(file_path.parent().unwrap()).expect("Failed to create pig pen directory");
+    let cache = PigPenCache {
+        key: key.to_string(),
+        pigs: pigs.clone(),
+    };
+    let file = BufWriter::new(File::create(file_path).unwrap());
+    serde_json::to_writer(file, &cache).expect("Failed to write pig pen");
+}
+
+/// Previous show pigs as per-fence pig indexes, None where the fence's pen has changed since they were saved.
+pub fn load_show_seeds(
+    optimization_path: &Path,
+    bet_type: &str,
+    pen_keys: &Vec<(String, String)>,
+    pen_sizes: &Vec<usize>,
+) -> Vec<Vec<Option<usize>>> {
+    let seeds: Vec<SeedShowPig> = match File::open(show_seeds_path(optimization_path, bet_type)) {
+        Ok(file) => serde_json::from_reader(BufReader::new(file)).unwrap_or_default(),
+        Err(_) => Vec::new(),
+    };
+    seeds
+        .iter()
+        .map(|seed| {
+            pen_keys
+                .iter()
+                .zip(pen_sizes.iter())
+                .map(|((fence, key), &size)| {
+                    seed.pens
+                        .iter()
+                        .find(|pen| &pen.fence == fence && &pen.key == key && pen.index < size)
+                        .map(|pen| pen.index)
+                })
+                .collect::<Vec<Option<usize>>>()
+        })
+        .filter(|indexes| indexes.iter().any(|index| index.is_some()))
+        .collect()
+}
+
+pub fn save_show_seeds(
+    optimization_path: &Path,
+    bet_type: &str,
+    pen_keys: &Vec<(String, String)>,
+    show_pigs: &[ShowPig],
+) {
+    let seeds: Vec<SeedShowPig> = show_pigs
+        .iter()
+        .map(|show_pig| SeedShowPig {
+            score: show_pig.success_score,
+            pens: pen_keys
+                .iter()
+                .zip(show_pig.pig_indexes.iter())
+                .map(|((fence, key), &index)| SeedPen {
+                    fence: fence.clone(),
+                    key: key.clone(),
+                    index: index,
+                })
+                .collect(),
+        })
+        .collect();
+    let file_path = show_seeds_path(optimization_path, bet_type);
+    fs::create_dir_all(file_path.parent().unwrap()).expect("Failed to create pig pen directory");
+    let file = BufWriter::new(File::create(file_path).unwrap());
+    serde_json::to_writer(file, &seeds).expect("Failed to write show pigs");
+}
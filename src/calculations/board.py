@@ -1,30 +1,33 @@
 """Handles generating game-boards from reelstrips"""
 
-import random
 from typing import List
 from src.state.state import GeneralGameState
 from src.calculations.statistics import get_random_outcome
+from src.calculations.board_sampler import TriggerCountSampler
 from src.events.events import reveal_event
 
 
 class Board(GeneralGameState):
     """Handles generation of a game board and symbols"""
 
-    def create_board_reelstrips(self) -> None:
-        """Randomly selects stopping positions from a reelstrip."""
+    def create_board_reelstrips(self, reelstrip_id: str = None, reel_positions: List[int] = None) -> None:
+        """Randomly selects stopping positions from a reelstrip, unless the reelstrip and stops are given."""
         if self.config.include_padding:
             top_symbols = []
             bottom_symbols = []
         self.refresh_special_syms()
-        self.reelstrip_id = get_random_outcome(
-            self.get_current_distribution_conditions()["reel_weights"][self.gametype]
-        )
+        if reelstrip_id is None:
+            reelstrip_id = get_random_outcome(
+                self.get_current_distribution_conditions()["reel_weights"][self.gametype], rng=self.rng
+            )
+        self.reelstrip_id = reelstrip_id
         self.reelstrip = self.config.reels[self.reelstrip_id]
         anticipation = [0] * self.config.num_reels
         board = [[]] * self.config.num_reels
         for i in range(self.config.num_reels):
             board[i] = [0] * self.config.num_rows[i]
-        reel_positions = [random.randrange(0, len(self.reelstrip[reel])) for reel in range(self.config.num_reels)]
+        if reel_positions is None:
+            reel_positions = self.rng.reel_stops([len(self.reelstrip[reel]) for reel in range(self.config.num_reels)])
         padding_positions = [0] * self.config.num_reels
         first_scatter_reel = -1
         for reel in range(self.config.num_reels):
@@ -90,10 +93,10 @@ class Board(GeneralGameState):
 
         reel_positions = [None] * self.config.num_reels
         for r, s in force_stop_positions.items():
-            reel_positions[r] = s - random.randint(0, self.config.num_rows[r] - 1)
+            reel_positions[r] = s - self.rng.randint(0, self.config.num_rows[r] - 1)
         for r, _ in enumerate(reel_positions):
             if reel_positions[r] is None:
-                reel_positions[r] = random.randrange(0, len(self.reelstrip[r]))
+                reel_positions[r] = self.rng.randrange(0, len(self.reelstrip[r]))
 
         padding_positions = [0] * self.config.num_reels
         first_scatter_reel = -1
@@ -199,22 +202,55 @@ class Board(GeneralGameState):
             self.get_current_distribution_conditions()["force_freegame"]
             and self.gametype == self.config.basegame_type
         ):
-            num_scatters = get_random_outcome(self.get_current_distribution_conditions()["scatter_triggers"])
+            num_scatters = get_random_outcome(
+                self.get_current_distribution_conditions()["scatter_triggers"], rng=self.rng
+            )
             self.force_special_board(trigger_symbol, num_scatters)
         elif (
             not (self.get_current_distribution_conditions()["force_freegame"])
             and self.gametype == self.config.basegame_type
         ):
-            self.create_board_reelstrips()
-            while self.count_special_symbols(trigger_symbol) >= min(
-                self.config.freespin_triggers[self.gametype].keys()
-            ):
+            if getattr(self.config, "sample_non_trigger_boards", False):
+                self.create_non_trigger_board(trigger_symbol)
+            else:
                 self.create_board_reelstrips()
+                while self.count_special_symbols(trigger_symbol) >= min(
+                    self.config.freespin_triggers[self.gametype].keys()
+                ):
+                    self.create_board_reelstrips()
         else:
             self.create_board_reelstrips()
         if emit_event:
             reveal_event(self)
 
+    def create_non_trigger_board(self, trigger_symbol: str = "scatter") -> None:
+        """
+        Draw a board showing fewer trigger symbols than the smallest freespin trigger, without retries.
+        The reelstrip is chosen in proportion to its weight times its chance of not triggering, and stops are drawn
+        from that strip's non-triggering boards, matching the distribution of redrawing until no trigger lands.
+        """
+        max_count = min(self.config.freespin_triggers[self.gametype].keys()) - 1
+        reel_weights = self.get_current_distribution_conditions()["reel_weights"][self.gametype]
+        key = (tuple(reel_weights.items()), trigger_symbol, max_count)
+        if key not in self.board_samplers:
+            samplers, weights = {}, {}
+            for reelstrip_id, weight in reel_weights.items():
+                samplers[reelstrip_id] = TriggerCountSampler(
+                    self.config.reels[reelstrip_id],
+                    set(self.config.special_symbols[trigger_symbol]),
+                    self.config.num_rows,
+                    max_count,
+                )
+                if weight * samplers[reelstrip_id].acceptance > 0:
+                    weights[reelstrip_id] = weight * samplers[reelstrip_id].acceptance
+            if not weights:
+                raise RuntimeError(f"Every {self.gametype} reelstrip shows at least {max_count + 1} {trigger_symbol}s.")
+            self.board_samplers[key] = (samplers, weights)
+
+        samplers, weights = self.board_samplers[key]
+        reelstrip_id = get_random_outcome(weights, rng=self.rng)
+        self.create_board_reelstrips(reelstrip_id, samplers[reelstrip_id].sample(self.rng))
+
     def force_special_board(self, force_criteria: str, num_force_syms: int) -> None:
         """Force a board to have a specified number of symbols.
         Set a specific type of special symbol on a given number of reels.
@@ -247,7 +283,7 @@ class Board(GeneralGameState):
         Helper function for forcing special (or name specific) symbols
         """
         reelstrip_id = get_random_outcome(
-            self.get_current_distribution_conditions()["reel_weights"][self.gametype]
+            self.get_current_distribution_conditions()["reel_weights"][self.gametype], rng=self.rng
         )
         reelstops = self.get_syms_on_reel(reelstrip_id, force_criteria)
 
@@ -258,8 +294,8 @@ class Board(GeneralGameState):
         while len(force_stop_positions) != num_force_syms:
             possible_reels = [i for i in range(self.config.num_reels) if sym_prob[i] > 0]
             possible_probs = [p for p in sym_prob if p > 0]
-            chosen_reel = random.choices(possible_reels, possible_probs)[0]
-            chosen_stop = random.choice(reelstops[chosen_reel])
+            chosen_reel = self.rng.choices(possible_reels, possible_probs)[0]
+            chosen_stop = self.rng.choice(reelstops[chosen_reel])
             sym_prob[chosen_reel] = 0
             force_stop_positions[int(chosen_reel)] = int(chosen_stop)
 
@@ -0,0 +1,62 @@
+"""Direct sampling of reel stops conditioned on the number of trigger symbols on the visible board."""
+
+from typing import List
+
+
+class TriggerCountSampler:
+    """
+    Reel stops of one reelstrip drawn uniformly from the boards showing at most max_count trigger symbols.
+
+    Stops are grouped per reel by how many trigger symbols they reveal, and ways[reel][budget] counts the stop
+    combinations of reels reel.. showing at most budget triggers. Drawing reel by reel in proportion to those counts
+    gives every allowed board the same probability, exactly as drawing uniform stops and rejecting boards over the
+    limit, with one draw per reel however often the strip triggers.
+    """
+
+    def __init__(self, reelstrip: list, trigger_names, num_rows: List[int], max_count: int):
+        self.max_count = max_count
+        self.stops_by_count = []
+        self.total = 1
+        for reel, rows in enumerate(num_rows):
+            strip = reelstrip[reel]
+            length = len(strip)
+            is_trigger = [symbol in trigger_names for symbol in strip]
+            by_count = [[] for _ in range(rows + 1)]
+            for stop in range(length):
+                by_count[sum(is_trigger[(stop + row) % length] for row in range(rows))].append(stop)
+            self.stops_by_count.append(by_count)
+            self.total *= length
+
+        self.ways = [[1] * (max_count + 1)]
+        for by_count in reversed(self.stops_by_count):
+            following = self.ways[0]
+            self.ways.insert(
+                0,
+                [
+                    sum(len(by_count[c]) * following[budget - c] for c in range(min(budget, len(by_count) - 1) + 1))
+                    for budget in range(max_count + 1)
+                ],
+            )
+
+    @property
+    def acceptance(self) -> float:
+        """Probability that uniformly drawn stops show at most max_count triggers."""
+        return self.ways[0][self.max_count] / self.total
+
+    def sample(self, rng) -> List[int]:
+        """One stop per reel, drawn from the allowed boards with equal probability."""
+        if self.ways[0][self.max_count] == 0:
+            raise RuntimeError(f"Every board shows more than {self.max_count} trigger symbols.")
+        budget = self.max_count
+        stops = []
+        for reel, by_count in enumerate(self.stops_by_count):
+            following = self.ways[reel + 1]
+            draw = rng.randrange(self.ways[reel][budget])
+            for count, group in enumerate(by_count[: budget + 1]):
+                block = len(group) * following[budget - count]
+                if draw < block:
+                    stops.append(group[draw // following[budget - count]])
+                    budget -= count
+                    break
+                draw -= block
+        return stops
@@ -0,0 +1,114 @@
+"""Per-simulation random number generators."""
+
+import random
+from bisect import bisect_right
+from itertools import accumulate
+
+MASK_64 = (1 << 64) - 1
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+
+
+def mix_64(z: int) -> int:
+    """SplitMix64 finalizer, maps a 64-bit integer to a well mixed 64-bit output."""
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & MASK_64
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & MASK_64
+    return z ^ (z >> 31)
+
+
+class BulkDraws:
+    """Bulk-draw helpers shared by all generators, expects a random.Random interface."""
+
+    def reel_stops(self, reel_lengths: list) -> list:
+        """One uniformly drawn stop position per reel."""
+        return [self._randbelow(length) for length in reel_lengths]
+
+    def draw_outcomes(self, distribution: dict, k: int = 1) -> list:
+        """Draw k values from a {value: weight} distribution."""
+        values = list(distribution.keys())
+        cum_weights = list(accumulate(distribution.values()))
+        total = cum_weights[-1]
+        return [values[bisect_right(cum_weights, self.random() * total)] for _ in range(k)]
+
+    def multipliers(self, mult_values: dict, k: int) -> list:
+        """Draw k multiplier values from a {multiplier: weight} distribution."""
+        return self.draw_outcomes(mult_values, k)
+
+
+class MersenneRandom(BulkDraws, random.Random):
+    """Mersenne-Twister stream, draw-for-draw identical to seeding the global random module."""
+
+    name = "mersenne"
+
+
+class CounterRandom(BulkDraws, random.Random):
+    """
+    Counter-based generator: output i is mix_64(key + i * GOLDEN_GAMMA).
+    Any position in the stream can be reached in O(1) with jump(), and substream() derives
+    independent keyed streams (e.g. one per reel) without touching the parent counter.
+    """
+
+    name = "counter"
+
+    def __init__(self, x=None, counter: int = 0):
+        self.key = 0
+        super().__init__(x)
+        # random.Random.__init__ seeds, which rewinds the counter
+        self.counter = counter
+
+    def seed(self, a=None, version=2) -> None:
+        if a is None:
+            a = random.SystemRandom().getrandbits(64)
+        if not isinstance(a, int):
+            a = int.from_bytes(str(a).encode("UTF-8"), "big")
+        self.key = mix_64(a & MASK_64)
+        self.counter = 0
+        self.gauss_next = None
+
+    def next_64(self) -> int:
+        """Next raw 64-bit output."""
+        out = mix_64((self.key + self.counter * GOLDEN_GAMMA) & MASK_64)
+        self.counter += 1
+        return out
+
+    def random(self) -> float:
+        return (self.next_64() >> 11) * (1.0 / (1 << 53))
+
+    def getrandbits(self, k: int) -> int:
+        if k < 0:
+            raise ValueError("number of bits must be non-negative")
+        out, bits = 0, 0
+        while bits < k:
+            out = (out << 64) | self.next_64()
+            bits += 64
+        return out >> (bits - k)
+
+    def jump(self, steps: int) -> None:
+        """Advance the stream by 'steps' 64-bit draws."""
+        self.counter += steps
+
+    def substream(self, index: int) -> "CounterRandom":
+        """Independent generator keyed on this stream's key and 'index'."""
+        child = CounterRandom.__new__(CounterRandom)
+        child.key = mix_64((self.key ^ mix_64(index + 1)) & MASK_64)
+        child.counter = 0
+        child.gauss_next = None
+        return child
+
+    def getstate(self):
+        return (self.key, self.counter, self.gauss_next)
+
+    def setstate(self, state) -> None:
+        self.key, self.counter, self.gauss_next = state
+
+
+RNG_TYPES = {
+    MersenneRandom.name: MersenneRandom,
+    CounterRandom.name: CounterRandom,
+}
+
+
+def make_rng(rng_type: str, seed: int) -> random.Random:
+    """Construct a generator of registered type 'rng_type' for a simulation seed."""
+    if rng_type not in RNG_TYPES:
+        raise RuntimeError(f"Unknown rng type '{rng_type}', expected one of {list(RNG_TYPES)}")
+    return RNG_TYPES[rng_type](seed)
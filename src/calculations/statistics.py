@@ -2,12 +2,12 @@ import random
 from typing import Union
 
 
-def get_random_outcome(distribution: dict, totalWeight: float = None) -> Union[float, int]:
-    """Returns a value from a distibution passed as a dictionary: {value : weight, ...}"""
+def get_random_outcome(distribution: dict, totalWeight: float = None, rng=random) -> Union[float, int]:
+    """Returns a value from a distibution passed as a dictionary: {value : weight, ...}, drawn from 'rng'."""
     assert isinstance(distribution, dict), "distribution must be of type: dict "
     if totalWeight is None:
         totalWeight = sum(distribution.values())
-    roll = random.uniform(0, totalWeight)
+    roll = rng.uniform(0, totalWeight)
     cumulative = 0.0
     for value, weight in distribution.items():
         cumulative += weight
@@ -0,0 +1,107 @@
+"""Sticky symbol positions held as a board bitmask, with per-position values in parallel arrays."""
+
+from typing import Callable, Iterator, List
+
+
+class StickyPositions:
+    """
+    Positions are bits of a single integer (reel * max_rows + row), so membership, union with a freshly drawn board
+    and counting are integer operations. Values such as multipliers or prizes are stored per field in flat lists
+    indexed by the same bit. Positions are kept in the order they were added, which is the order they are applied.
+    """
+
+    def __init__(self, num_rows: List[int], fields: tuple = ()):
+        self.num_rows = list(num_rows)
+        self.stride = max(self.num_rows)
+        self.fields = tuple(fields)
+        self.mask = 0
+        self.order = []
+        self.values = {field: [0] * (len(self.num_rows) * self.stride) for field in self.fields}
+
+    def bit(self, reel: int, row: int) -> int:
+        return reel * self.stride + row
+
+    def position(self, bit: int) -> tuple:
+        return divmod(bit, self.stride)
+
+    def __contains__(self, position) -> bool:
+        return (self.mask >> self.bit(*position)) & 1 == 1
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def __bool__(self) -> bool:
+        return self.mask != 0
+
+    def add(self, reel: int, row: int, **values) -> bool:
+        """Make a position sticky, returns False (leaving its values unchanged) if it already was."""
+        bit = self.bit(reel, row)
+        if (self.mask >> bit) & 1:
+            return False
+        self.mask |= 1 << bit
+        self.order.append(bit)
+        for field, value in values.items():
+            self.values[field][bit] = value
+        return True
+
+    def get(self, reel: int, row: int, field: str):
+        return self.values[field][self.bit(reel, row)]
+
+    def clear(self) -> None:
+        """Drop every position, resetting its values so a later add() without them reads 0."""
+        for column in self.values.values():
+            for bit in self.order:
+                column[bit] = 0
+        self.mask = 0
+        self.order = []
+
+    def items(self, *fields) -> Iterator[tuple]:
+        """(reel, row, *values) in the order positions were added."""
+        columns = [self.values[field] for field in fields]
+        for bit in self.order:
+            reel, row = divmod(bit, self.stride)
+            yield (reel, row, *(column[bit] for column in columns))
+
+    def board_mask(self, board: list, predicate: Callable) -> int:
+        """Bitmask of the board positions whose symbol satisfies predicate."""
+        mask = 0
+        for reel, symbols in enumerate(board):
+            base = reel * self.stride
+            for row, symbol in enumerate(symbols):
+                if predicate(symbol):
+                    mask |= 1 << (base + row)
+        return mask
+
+    def new_positions(self, board: list, predicate: Callable) -> List[tuple]:
+        """Board positions satisfying predicate which are not yet sticky, in reel then row order."""
+        return list(iter_bits(self.board_mask(board, predicate) & ~self.mask, self.stride))
+
+    def to_events(self, *fields, row_offset: int = 0, scale: dict = None) -> List[dict]:
+        """
+        [{"reel", "row", field: value}] sorted by position, for book events.
+        row_offset shifts rows for padded boards and scale multiplies fields (e.g. {"prize": 100} for cents).
+        """
+        scale = scale or {}
+        events = []
+        for bit in iter_set_bits(self.mask):
+            reel, row = divmod(bit, self.stride)
+            event = {"reel": reel, "row": row + row_offset}
+            for field in fields:
+                value = self.values[field][bit]
+                event[field] = int(value * scale[field]) if field in scale else value
+            events.append(event)
+        return events
+
+
+def iter_set_bits(mask: int) -> Iterator[int]:
+    """Indexes of the set bits of mask, lowest first."""
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def iter_bits(mask: int, stride: int) -> Iterator[tuple]:
+    """(reel, row) of the set bits of a board mask, lowest first."""
+    for bit in iter_set_bits(mask):
+        yield divmod(bit, stride)
@@ -49,6 +49,11 @@ class Config:
         self.padding_reels = {}  # symbol configuration displayed before the board reveal
 
         self.write_event_list = True
+        self.books_per_block = 1000  # books per independently decompressible zstd frame
+        self.rng_type = "mersenne"  # per-simulation generator, see src/calculations/rng.py
+        self.sample_non_trigger_boards = False  # draw non-triggering basegame boards directly instead of redrawing
+        # Settings that change the book drawn for a given seed, recorded in the seed table header
+        self.rng_settings = ["rng_type", "sample_non_trigger_boards"]
 
         self.bet_modes = []
         self.opt_params = {None: None}
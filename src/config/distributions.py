@@ -18,6 +18,8 @@ class Distribution:
             "reel_weights",
         ],
         default_distribution_conditions: dict = {"force_wincap": False, "force_freegame": False},
+        proposal_conditions: Union[dict, None] = None,
+        proposal_after: int = 0,
     ):
 
         if fixed_amt is None:
@@ -31,6 +33,7 @@ class Distribution:
         self._default_distribution_conditions = default_distribution_conditions
         self._win_criteria = win_criteria
         self.verify_and_set_conditions(conditions)
+        self.verify_and_set_proposal(proposal_conditions, proposal_after)
 
     def verify_and_set_conditions(self, conditions):
         """Enforce required conditions for distribution setup."""
@@ -44,6 +47,60 @@ class Distribution:
 
         self._conditions = conditions
 
+    def verify_and_set_proposal(self, proposal_conditions, proposal_after):
+        """
+        Optional importance-sampling weights, used in place of the matching condition weights once
+        'proposal_after' attempts of a simulation have been rejected. Proposals may only re-weight outcomes
+        already present in the conditions, so accepted books remain valid game outcomes.
+        """
+        assert proposal_after >= 0, "proposal_after must be non-negative"
+        self._proposal_after = proposal_after
+        self._proposal_conditions = None
+        if proposal_conditions is None:
+            return
+
+        for key, weights in proposal_conditions.items():
+            assert key in self._conditions, f"proposal key '{key}' is not a distribution condition"
+            self.verify_proposal_support(weights, self._conditions[key], key)
+
+        merged = dict(self._conditions)
+        for key, weights in proposal_conditions.items():
+            if self.is_weight_table(weights):
+                merged[key] = weights
+            else:
+                merged[key] = {**self._conditions[key], **weights}
+        self._proposal_conditions = merged
+
+    @staticmethod
+    def is_weight_table(table) -> bool:
+        """Weight tables map outcomes to numeric weights, i.e {"BR0": 1} or {2: 10, 3: 5}."""
+        return isinstance(table, dict) and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in table.values()
+        )
+
+    def verify_proposal_support(self, proposal, condition, path: str):
+        """Check proposal weights only cover outcomes with support in the original condition."""
+        assert isinstance(proposal, dict) and isinstance(
+            condition, dict
+        ), f"proposal '{path}' must be a weight table (or gametype -> weight table)"
+        if self.is_weight_table(proposal):
+            assert self.is_weight_table(condition), f"proposal '{path}' does not match condition structure"
+            unsupported = [k for k in proposal if k not in condition]
+            assert len(unsupported) == 0, f"proposal '{path}' adds outcomes not in conditions: {unsupported}"
+            assert all(v >= 0 for v in proposal.values()) and sum(
+                proposal.values()
+            ) > 0, f"proposal '{path}' weights must be non-negative with a positive sum"
+        else:
+            for key, weights in proposal.items():
+                assert key in condition, f"proposal key '{path}.{key}' is not in conditions"
+                self.verify_proposal_support(weights, condition[key], f"{path}.{key}")
+
+    def get_conditions(self, attempt: int = 0):
+        """Return conditions, switching to proposal weights after 'proposal_after' rejected attempts."""
+        if self._proposal_conditions is not None and attempt >= self._proposal_after:
+            return self._proposal_conditions
+        return self._conditions
+
     def get_criteria(self):
         """Return distribution criteria value."""
         return self._criteria
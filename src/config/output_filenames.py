@@ -34,6 +34,7 @@ class OutputFiles:
         self.compressed_path = self.publish_path  # Required RGS files
         self.final_lookup_path = self.publish_path  # Required RGS files
         self.optimization_result_path = os.path.join(self.optimization_path, "trial_results")
+        self.trace_path = os.path.join(self.library_path, "traces")  # Created on demand when tracing
 
         all_paths = [
             "library_path",
@@ -140,10 +141,32 @@ class OutputFiles:
         """Naming convention for temp segmented lookup files."""
         return os.path.join(self.temp_path, f"lookUpTableSegmented_{betmode}_{thread_index}_{repeat_count}")
 
+    def get_temp_seed_name(self, betmode: str, thread_index: int, repeat_count: int):
+        """Naming convention for temp simulation seed tables."""
+        return os.path.join(self.temp_path, f"lookUpTableSeeds_{betmode}_{thread_index}_{repeat_count}")
+
     def get_temp_force_name(self, betmode: str, thread_index: int, repeat_count: int):
         """Naming convention for temp force files."""
         return os.path.join(self.temp_path, f"force_{betmode}_{thread_index}_{repeat_count}.json")
 
+    def get_temp_repeat_stats_name(self, betmode: str, thread_index: int, repeat_count: int):
+        """Naming convention for temp repeat/rejection counters."""
+        return os.path.join(self.temp_path, f"repeatStats_{betmode}_{thread_index}_{repeat_count}.json")
+
+    def get_temp_summary_name(self, betmode: str, thread_index: int, repeat_count: int):
+        """Temporary per-simulation summary array for a single thread."""
+        return os.path.join(self.temp_path, f"summary_{betmode}_{thread_index}_{repeat_count}.npy")
+
+    def get_temp_histogram_name(self, betmode: str, thread_index: int, repeat_count: int):
+        """Temporary win histograms for a single thread."""
+        return os.path.join(self.temp_path, f"histograms_{betmode}_{thread_index}_{repeat_count}.json")
+
+    def get_trace_name(self, betmode: str, thread_index: int = None, repeat_count: int = None):
+        """Per-worker JSONL trace file, or the main-process trace when no worker index is given."""
+        if thread_index is None:
+            return os.path.join(self.trace_path, f"trace_{betmode}_main.jsonl")
+        return os.path.join(self.trace_path, f"trace_{betmode}_{thread_index}_{repeat_count}.jsonl")
+
     def get_final_book_name(self, betmode: str, compress: bool):
         """Returns final simulation books output name."""
         if compress:
@@ -156,6 +179,10 @@ class OutputFiles:
             raise RuntimeError("Logic error in name generation.")
         return os.path.join(self.compressed_path if compress else self.book_path, filename)
 
+    def get_book_index_name(self, betmode: str):
+        """Sidecar index for compressed books: id,block,frame_offset,frame_size,offset,length."""
+        return os.path.join(self.book_path, f"books_{betmode}_index.csv")
+
     def get_final_lookup_name(self, betmode: str):
         """Final csv lookup table name."""
         return os.path.join(self.lookup_path, f"lookUpTable_{betmode}.csv")
@@ -167,3 +194,23 @@ class OutputFiles:
     def get_final_segmented_name(self, betmode: str):
         """Final csv segmented wins lookup table name."""
         return os.path.join(self.lookup_path, f"lookUpTableSegmented_{betmode}.csv")
+
+    def get_final_seed_name(self, betmode: str):
+        """Final csv table of book id, criteria and simulation seed, used to regenerate books."""
+        return os.path.join(self.lookup_path, f"lookUpTableSeeds_{betmode}.csv")
+
+    def get_repeat_stats_name(self, betmode: str):
+        """Per-criteria attempt/rejection report, stored alongside the lookup tables."""
+        return os.path.join(self.lookup_path, f"repeatStats_{betmode}.json")
+
+    def get_summary_path(self, betmode: str):
+        """Folder of columnar per-simulation summary arrays, stored alongside the lookup tables."""
+        return os.path.join(self.lookup_path, f"summary_{betmode}")
+
+    def get_histogram_name(self, betmode: str):
+        """Merged payout, per-criteria and force-key counts, stored alongside the lookup tables."""
+        return os.path.join(self.lookup_path, f"histograms_{betmode}.json")
+
+    def get_convergence_name(self, betmode: str):
+        """Final RTP and hit-rate estimates with standard errors, and whether the mode stopped early."""
+        return os.path.join(self.lookup_path, f"convergence_{betmode}.json")
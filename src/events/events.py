@@ -2,6 +2,7 @@
 
 from copy import deepcopy
 from src.events.event_constants import EventConstants
+from src.calculations.sticky import StickyPositions
 
 
 def json_ready_sym(symbol: object, special_attributes: list = None):
@@ -157,17 +158,15 @@ def exit_bonus_event(gamestate):
 
 
 def sticky_wild_update_event(gamestate, sticky_map):
+    """sticky_map is a StickyPositions with a multiplier field, or a {(reel, row): multiplier} dict."""
+    if isinstance(sticky_map, StickyPositions):
+        wilds = sticky_map.to_events("multiplier")
+    else:
+        wilds = [{"reel": reel, "row": row, "multiplier": mult} for (reel, row), mult in sorted(sticky_map.items())]
     event = {
         "index": len(gamestate.book.events),
         "type": EventConstants.STICKY_WILD_UPDATE.value,
-        "wilds": [
-            {
-                "reel": reel,
-                "row": row,
-                "multiplier": mult,
-            }
-            for (reel, row), mult in sorted(sticky_map.items())
-        ],
+        "wilds": wilds,
     }
     gamestate.book.add_event(event)
 
@@ -0,0 +1,174 @@
+"""Running payout sums streamed from workers, and a stratified RTP / hit-rate convergence monitor."""
+
+from collections import defaultdict
+from math import sqrt
+from statistics import NormalDist
+
+from src.write_data.sim_summary import FLAG_FREEGAME, FLAG_WINCAP
+
+HIT_EVENTS = ["hit", "freegame", "wincap"]
+REPORT_INTERVAL = 1000  # simulations between worker snapshots
+
+
+class RunningSums:
+    """Per-criteria count, payout sums and event hit counts for one worker batch."""
+
+    def __init__(self):
+        self.sums = defaultdict(lambda: {"n": 0, "sum": 0.0, "sumsq": 0.0, **{e: 0 for e in HIT_EVENTS}})
+
+    def add(self, criteria: str, payout: float, flags: int) -> None:
+        """Payout in bet multiples, flags as written to the simulation summary."""
+        s = self.sums[criteria]
+        s["n"] += 1
+        s["sum"] += payout
+        s["sumsq"] += payout * payout
+        s["hit"] += payout > 0
+        s["freegame"] += bool(flags & FLAG_FREEGAME)
+        s["wincap"] += bool(flags & FLAG_WINCAP)
+
+    def to_dict(self) -> dict:
+        return {c: dict(s) for c, s in self.sums.items()}
+
+    def merge(self, sums: dict) -> None:
+        for c, vals in sums.items():
+            for k, v in vals.items():
+                self.sums[c][k] += v
+
+
+class ConvergenceMonitor:
+    """
+    Combines worker snapshots into a stratified estimate: each criteria's mean is weighted by its share of the
+    mode's simulations. Optional targets stop a mode once the standard error on RTP (absolute) and on event hit
+    probabilities (relative) are small enough.
+    """
+
+    def __init__(
+        self,
+        cost: float,
+        criteria_shares: dict,
+        rtp_se: float = None,
+        hit_rse: dict = None,
+        confidence: float = 0.95,
+        min_sims_per_criteria: int = 30,
+    ):
+        self.cost = cost
+        self.criteria_shares = criteria_shares
+        self.rtp_se = rtp_se
+        self.hit_rse = hit_rse or {}
+        for event in self.hit_rse:
+            if event not in HIT_EVENTS:
+                raise RuntimeError(f"Unknown convergence hit event '{event}', expected one of {HIT_EVENTS}")
+        self.z = NormalDist().inv_cdf(0.5 + confidence / 2)
+        self.confidence = confidence
+        self.min_sims_per_criteria = min_sims_per_criteria
+        self.completed = RunningSums()
+        self.in_progress = {}
+        self.stopped_early = False
+
+    @classmethod
+    def from_settings(cls, settings: dict, cost: float, criteria_assignment: list) -> "ConvergenceMonitor":
+        """settings: {'rtp_se': float, 'hit_rse': {event: float}, 'confidence': float, 'min_sims_per_criteria': int}"""
+        counts = defaultdict(int)
+        for c in criteria_assignment:
+            counts[c] += 1
+        shares = {c: n / len(criteria_assignment) for c, n in counts.items()}
+        return cls(cost, shares, **(settings or {}))
+
+    @property
+    def has_targets(self) -> bool:
+        return self.rtp_se is not None or len(self.hit_rse) > 0
+
+    def update(self, worker: tuple, sums: dict) -> None:
+        """Replace a worker's cumulative snapshot for the running batch."""
+        self.in_progress[worker] = sums
+
+    def finish_batch(self) -> None:
+        """Fold the batch's final worker snapshots into the completed totals."""
+        for sums in self.in_progress.values():
+            self.completed.merge(sums)
+        self.in_progress = {}
+
+    def totals(self) -> dict:
+        totals = RunningSums()
+        totals.merge(self.completed.to_dict())
+        for sums in self.in_progress.values():
+            totals.merge(sums)
+        return totals.to_dict()
+
+    def estimate(self) -> dict:
+        """Stratified RTP and hit probabilities with standard errors and confidence intervals."""
+        totals = self.totals()
+        num_sims = sum(s["n"] for s in totals.values())
+        mean, mean_var = 0.0, 0.0
+        hits = {e: [0.0, 0.0] for e in HIT_EVENTS}
+        contributions = {}
+        for c, share in self.criteria_shares.items():
+            s = totals.get(c)
+            if s is None or s["n"] == 0:
+                continue
+            n = s["n"]
+            c_mean = s["sum"] / n
+            c_var = max(s["sumsq"] / n - c_mean**2, 0.0) * n / (n - 1) if n > 1 else 0.0
+            mean += share * c_mean
+            mean_var += share**2 * c_var / n
+            contributions[c] = share * c_mean / self.cost
+            for e in HIT_EVENTS:
+                p = s[e] / n
+                hits[e][0] += share * p
+                hits[e][1] += share**2 * p * (1 - p) / n
+
+        rtp_se = sqrt(mean_var) / self.cost
+        estimate = {
+            "sims": num_sims,
+            "rtp": mean / self.cost,
+            "rtp_se": rtp_se,
+            "rtp_ci": [mean / self.cost - self.z * rtp_se, mean / self.cost + self.z * rtp_se],
+            "confidence": self.confidence,
+            "criteria_rtp": contributions,
+            "hit_rates": {},
+        }
+        for e, (p, var) in hits.items():
+            se = sqrt(var)
+            estimate["hit_rates"][e] = {
+                "prob": p,
+                "se": se,
+                "rse": se / p if p > 0 else None,
+                "hit_rate": 1 / p if p > 0 else None,
+            }
+        return estimate
+
+    def converged(self, estimate: dict = None) -> bool:
+        """All targets met, and every criteria has enough simulations for its variance estimate."""
+        if not self.has_targets:
+            return False
+        totals = self.totals()
+        for c in self.criteria_shares:
+            if totals.get(c, {"n": 0})["n"] < self.min_sims_per_criteria:
+                return False
+        estimate = estimate or self.estimate()
+        if self.rtp_se is not None and estimate["rtp_se"] > self.rtp_se:
+            return False
+        for e, target in self.hit_rse.items():
+            rse = estimate["hit_rates"][e]["rse"]
+            if rse is None or rse > target:
+                return False
+        return True
+
+    def stop_after_batch(self, batch: int, num_batches: int, estimate: dict = None) -> bool:
+        """Stop once targets are met with batches still to run, recorded in stopped_early."""
+        if batch + 1 < num_batches and self.converged(estimate):
+            self.stopped_early = True
+        return self.stopped_early
+
+    def report(self, estimate: dict = None) -> str:
+        estimate = estimate or self.estimate()
+        low, high = estimate["rtp_ci"]
+        msg = (
+            f"RTP {estimate['rtp']:.4f} ± {self.z * estimate['rtp_se']:.4f} "
+            f"({int(100 * self.confidence)}% CI [{low:.4f}, {high:.4f}], {estimate['sims']:,} sims)"
+        )
+        for e in HIT_EVENTS:
+            info = estimate["hit_rates"][e]
+            if info["hit_rate"] is not None:
+                msg += f", {e} 1 in {info['hit_rate']:.1f} (rse {info['rse']:.3f})"
+        return msg
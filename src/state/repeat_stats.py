@@ -0,0 +1,67 @@
+"""Per-criteria accounting of spin attempts, rejections and simulation time."""
+
+from collections import Counter, defaultdict
+
+
+class RepeatStats:
+    """Counters for a single worker, merged across workers into a per-mode report."""
+
+    def __init__(self):
+        self.sims = defaultdict(int)
+        self.attempts = defaultdict(int)
+        self.time = defaultdict(float)
+        self.rejections = defaultdict(Counter)
+
+    def add_attempt(self, criteria: str) -> None:
+        """One completed board/round evaluation (a call to check_repeat)."""
+        self.attempts[criteria] += 1
+
+    def add_rejection(self, criteria: str, reason: str) -> None:
+        """Reason an attempt was rejected, an attempt can fail for several reasons."""
+        self.rejections[criteria][reason] += 1
+
+    def add_sim(self, criteria: str, elapsed: float) -> None:
+        """Accepted simulation and the wall-time spent on all of its attempts."""
+        self.sims[criteria] += 1
+        self.time[criteria] += elapsed
+
+    def to_dict(self) -> dict:
+        """JSON-ready counters."""
+        all_criteria = set(self.sims) | set(self.attempts) | set(self.rejections)
+        return {
+            c: {
+                "sims": self.sims[c],
+                "attempts": self.attempts[c],
+                "time": self.time[c],
+                "rejections": dict(self.rejections[c]),
+            }
+            for c in sorted(all_criteria)
+        }
+
+    def merge(self, counters: dict) -> None:
+        """Add counters produced by another worker's to_dict()."""
+        for c, vals in counters.items():
+            self.sims[c] += vals["sims"]
+            self.attempts[c] += vals["attempts"]
+            self.time[c] += vals["time"]
+            for reason, count in vals["rejections"].items():
+                self.rejections[c][reason] += count
+
+    def report(self) -> dict:
+        """Per-criteria summary ordered by time spent, with attempts-per-sim and share of total runtime."""
+        total_time = sum(self.time.values())
+        summary = {}
+        counters = self.to_dict()
+        for c in sorted(counters, key=lambda k: counters[k]["time"], reverse=True):
+            vals = counters[c]
+            summary[c] = {
+                "sims": vals["sims"],
+                "attempts": vals["attempts"],
+                "rejected_attempts": max(vals["attempts"] - vals["sims"], 0),
+                "attempts_per_sim": round(vals["attempts"] / vals["sims"], 4) if vals["sims"] > 0 else None,
+                "rejections": vals["rejections"],
+                "time_seconds": round(vals["time"], 4),
+                "time_share": round(vals["time"] / total_time, 4) if total_time > 0 else 0.0,
+                "ms_per_sim": round(1000 * vals["time"] / vals["sims"], 4) if vals["sims"] > 0 else None,
+            }
+        return summary
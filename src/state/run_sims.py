@@ -1,5 +1,6 @@
 import time
 import math
+import json
 import random
 import hashlib
 from multiprocessing import Process, Manager
@@ -9,10 +10,11 @@ import shutil
 import asyncio
 from typing import Dict
 from datetime import datetime
-import os
 import psutil
 
 from src.write_data.write_data import output_lookup_and_force_files
+from src.state.tracing import NULL_TRACER, open_tracer
+from src.state.convergence import ConvergenceMonitor
 
 
 def create_books(
@@ -23,8 +25,17 @@ def create_books(
     threads: int,
     compress: bool,
     profiling: bool,
+    store_books: bool = True,
+    convergence: dict = None,
 ):
-    """Main run-function for simulating game outcomes and outputting all files."""
+    """
+    Main run-function for simulating game outcomes and outputting all files.
+    With store_books=False only lookup tables, pay splits and the seed table are kept, books can be
+    regenerated on demand with utils/regenerate_books.py.
+    convergence maps bet modes to stopping targets, e.g. {"base": {"rtp_se": 0.001, "hit_rse": {"freegame": 0.02}}},
+    a mode then stops after the first batch at which every target is met.
+    """
+    convergence = convergence or {}
     for key, ns in num_sim_args.items():
         if all([ns > 0, ns > batch_size * batch_size]):
             assert (
@@ -60,39 +71,54 @@ def create_books(
             print(f"   - Requested simulations: {num_sim_args[betmode_name]:,}")
             gamestate.betmode = betmode_name
             nsims = max(num_sim_args[betmode_name], sim_counter)
-            if os.getenv("SIM_DEBUG_PROGRESS", "0") != "0":
-                print(
-                    f"[sim-debug] Preparing mode={betmode_name} temp_path={gamestate.output_files.temp_path} "
-                    f"nsims={nsims} threads={threads} batch={batch_size}",
-                    flush=True,
+            mode_tracer = open_tracer(gamestate.output_files.get_trace_name(betmode_name), mode=betmode_name)
+            try:
+                mode_tracer.event(
+                    "mode_start",
+                    temp_path=gamestate.output_files.temp_path,
+                    nsims=nsims,
+                    threads=threads,
+                    batch=batch_size,
                 )
-            print(f"   [{datetime.now().strftime('%H:%M:%S')}] Starting run_multi_process_sims()...")
-            run_multi_process_sims(
-                threads,
-                batch_size,
-                config.game_id,
-                betmode_name,
-                gamestate,
-                num_sims=nsims,
-                compress=compress,
-                write_event_list=config.write_event_list,
-                profiling=profiling,
-                set_sim_amount=set_sim_amount,
-            )
-            sim_elapsed = time.time() - mode_start_time
-            print(f"   [{datetime.now().strftime('%H:%M:%S')}] run_multi_process_sims() completed (took {sim_elapsed:.1f} seconds)")
-            print(f"   [{datetime.now().strftime('%H:%M:%S')}] Starting output_lookup_and_force_files()...")
-            output_start_time = time.time()
-            output_lookup_and_force_files(
-                threads,
-                batch_size,
-                config.game_id,
-                betmode_name,
-                gamestate,
-                num_sims=nsims,
-                compress=compress,
-            )
-            output_elapsed = time.time() - output_start_time
+                print(f"   [{datetime.now().strftime('%H:%M:%S')}] Starting run_multi_process_sims()...")
+                # workers open their own tracers, the mode tracer's open file is not handed to them
+                gamestate.tracer = NULL_TRACER
+                completed_repeats, monitor = run_multi_process_sims(
+                    threads,
+                    batch_size,
+                    config.game_id,
+                    betmode_name,
+                    gamestate,
+                    num_sims=nsims,
+                    compress=compress,
+                    write_event_list=config.write_event_list,
+                    profiling=profiling,
+                    set_sim_amount=set_sim_amount,
+                    store_books=store_books,
+                    convergence_settings=convergence.get(betmode_name),
+                    tracer=mode_tracer,
+                )
+                gamestate.tracer = mode_tracer
+                write_convergence(gamestate.output_files.get_convergence_name(betmode_name), monitor, completed_repeats)
+                sim_elapsed = time.time() - mode_start_time
+                print(f"   [{datetime.now().strftime('%H:%M:%S')}] run_multi_process_sims() completed (took {sim_elapsed:.1f} seconds)")
+                print(f"   [{datetime.now().strftime('%H:%M:%S')}] Starting output_lookup_and_force_files()...")
+                output_start_time = time.time()
+                output_lookup_and_force_files(
+                    threads,
+                    batch_size,
+                    config.game_id,
+                    betmode_name,
+                    gamestate,
+                    num_sims=nsims,
+                    compress=compress,
+                    store_books=store_books,
+                    num_repeats=completed_repeats,
+                )
+                output_elapsed = time.time() - output_start_time
+            finally:
+                mode_tracer.close()
+                gamestate.tracer = NULL_TRACER
             mode_total_elapsed = time.time() - mode_start_time
             print(f"   [{datetime.now().strftime('%H:%M:%S')}] output_lookup_and_force_files() completed (took {output_elapsed:.1f} seconds)")
             print(f"   [{datetime.now().strftime('%H:%M:%S')}] Mode {betmode_name} complete! Total time: {mode_total_elapsed:.1f} seconds\n")
@@ -100,6 +126,28 @@ def create_books(
     print("\nFinished creating books in", time.time() - startTime, "seconds.\n")
 
 
+def write_convergence(filename: str, monitor: ConvergenceMonitor, completed_repeats: int) -> None:
+    """Final RTP and hit-rate estimates of a mode, with the number of batches run."""
+    with open(filename, "w", encoding="UTF-8") as f:
+        json.dump(
+            {
+                "targets": {"rtp_se": monitor.rtp_se, "hit_rse": monitor.hit_rse},
+                "stopped_early": monitor.stopped_early,
+                "completed_batches": completed_repeats,
+                **monitor.estimate(),
+            },
+            f,
+            indent=4,
+        )
+
+
+def drain_progress(progress_queue: object, monitor: ConvergenceMonitor) -> None:
+    """Pass all pending worker snapshots to the monitor."""
+    while not progress_queue.empty():
+        worker, sums = progress_queue.get()
+        monitor.update(worker, sums)
+
+
 def get_sim_splits(gamestate: object, num_sims: int, betmode_name: str) -> Dict[str, int]:
     """Ensure assignment of criteria to all simulations numbers."""
     betmode_distributions = gamestate.get_betmode(betmode_name).get_distributions()
@@ -145,11 +193,12 @@ async def profile_and_visualize(
     compress,
     write_event_list,
     simulation_seeds,
+    store_books=True,
 ):
     """Create flame-graph, automatically opens output on localhost."""
     output_string = f"games/{game_id}/simulationProfile_{betmode}.prof"
     cProfile.runctx(
-        "gamestate.run_sims(all_betmode_configs, betmode, sim_allocation, threads, num_repeats, sims_per_thread, 0, repeat, compress, write_event_list, simulation_seeds)",
+        "gamestate.run_sims(all_betmode_configs, betmode, sim_allocation, threads, num_repeats, sims_per_thread, 0, repeat, compress, write_event_list, simulation_seeds, store_books)",
         globals(),
         locals(),
         output_string,
@@ -168,8 +217,15 @@ def run_multi_process_sims(
     write_event_list: bool = False,
     profiling: bool = False,
     set_sim_amount=False,
+    store_books: bool = True,
+    convergence_settings: dict = None,
+    tracer: object = NULL_TRACER,
 ):
-    """Setup multiprocessing manager for running all game-mode simulations."""
+    """
+    Setup multiprocessing manager for running all game-mode simulations.
+    Per-batch convergence estimates are traced to tracer, which stays in this process.
+    Returns the number of batches run and the convergence monitor holding the streamed RTP estimate.
+    """
     print("\nCreating books for", game_id, "in", betmode)
     print(f"   [{datetime.now().strftime('%H:%M:%S')}] Calculating simulation parameters...")
     num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
@@ -231,12 +287,17 @@ def run_multi_process_sims(
             criteria_counter[c] += 1
             simulation_seeds.append(offset_val)
 
+    monitor = ConvergenceMonitor.from_settings(
+        convergence_settings, gamestate.get_betmode(betmode).get_cost(), criteria_assignment[:num_sims]
+    )
+    completed_repeats = 0
     for repeat in range(num_repeats):
         batch_start_time = time.time()
         print(f"\n   [{datetime.now().strftime('%H:%M:%S')}] Starting Batch {repeat + 1} of {num_repeats}")
         processes = []
         manager = Manager()
         all_betmode_configs = manager.list()
+        progress_queue = manager.Queue()
         print(f"   [{datetime.now().strftime('%H:%M:%S')}] Created Manager and shared list")
         if profiling:
             asyncio.run(
@@ -253,6 +314,7 @@ def run_multi_process_sims(
                     compress=compress,
                     write_event_list=write_event_list,
                     simulation_seeds=simulation_seeds,
+                    store_books=store_books,
                 )
             )
         elif threads == 1:
@@ -270,11 +332,14 @@ def run_multi_process_sims(
                 compress=compress,
                 write_event_list=write_event_list,
                 simulation_seeds=simulation_seeds,
+                store_books=store_books,
+                progress_queue=progress_queue,
             )
             single_elapsed = time.time() - single_start_time
             print(f"   [{datetime.now().strftime('%H:%M:%S')}] Single-threaded simulation completed (took {single_elapsed:.1f} seconds)")
             gamestate.combine(all_betmode_configs, betmode)
             gamestate.get_betmode(betmode).lock_force_keys()
+            drain_progress(progress_queue, monitor)
             manager.shutdown()
             batch_elapsed = time.time() - batch_start_time
             print(f"   [{datetime.now().strftime('%H:%M:%S')}] Batch {repeat + 1} complete! Time: {batch_elapsed:.1f} seconds")
@@ -296,6 +361,8 @@ def run_multi_process_sims(
                         compress,
                         write_event_list,
                         simulation_seeds,
+                        store_books,
+                        progress_queue,
                     ),
                 )
                 print(f"   [{datetime.now().strftime('%H:%M:%S')}] Started thread {thread}")
@@ -314,6 +381,7 @@ def run_multi_process_sims(
                 
                 # Periodic status update every 30 seconds
                 if current_time - last_status_time >= 30:
+                    drain_progress(progress_queue, monitor)
                     alive_count = sum(1 for p in processes if p.is_alive())
                     elapsed_min = int(elapsed // 60)
                     elapsed_sec = int(elapsed % 60)
@@ -348,6 +416,7 @@ def run_multi_process_sims(
                         status_msg += f"\n      Avg CPU usage: {avg_cpu:.1f}%, Avg memory: {avg_mem:.1f} MB"
                         if avg_cpu < 1.0 and elapsed_min > 5:
                             status_msg += " ⚠️ LOW CPU - thread may be stuck!"
+                    status_msg += f"\n      Live {monitor.report()}"
                     
                     print(status_msg)
                     last_status_time = current_time
@@ -374,6 +443,27 @@ def run_multi_process_sims(
             print(f"   [{datetime.now().strftime('%H:%M:%S')}] Results combined (took {combine_elapsed:.1f} seconds)")
             print(f"   [{datetime.now().strftime('%H:%M:%S')}] Locking force keys...")
             gamestate.get_betmode(betmode).lock_force_keys()
+            drain_progress(progress_queue, monitor)
             manager.shutdown()
             batch_elapsed = time.time() - batch_start_time
             print(f"   [{datetime.now().strftime('%H:%M:%S')}] Batch {repeat + 1} complete! Time: {batch_elapsed:.1f} seconds")
+
+        completed_repeats += 1
+        monitor.finish_batch()
+        estimate = monitor.estimate()
+        print(f"   [{datetime.now().strftime('%H:%M:%S')}] {monitor.report(estimate)}")
+        tracer.event(
+            "convergence",
+            batch=repeat,
+            sims=estimate["sims"],
+            rtp=estimate["rtp"],
+            rtp_se=estimate["rtp_se"],
+        )
+        if monitor.stop_after_batch(repeat, num_repeats, estimate):
+            print(
+                f"   [{datetime.now().strftime('%H:%M:%S')}] Convergence targets met, "
+                f"stopping {betmode} after {completed_repeats} of {num_repeats} batches"
+            )
+            break
+
+    return completed_repeats, monitor
@@ -2,25 +2,36 @@ from copy import copy, deepcopy
 from abc import ABC, abstractmethod
 from warnings import warn
 import os
+import time
 import random
 
 # from src.config.config import BetMode
 from src.wins.win_manager import WinManager
 from src.calculations.symbol import SymbolStorage
+from src.calculations.rng import make_rng
 from src.config.output_filenames import OutputFiles
 from src.state.books import Book
+from src.state.tracing import NULL_TRACER, open_tracer
+from src.state.repeat_stats import RepeatStats
+from src.state.convergence import REPORT_INTERVAL, RunningSums
+from src.write_data.sim_summary import get_criteria_names, summary_row, write_temp_summary
+from src.write_data.sim_histograms import WinHistograms
 from src.write_data.write_data import (
     print_recorded_wins,
     make_lookup_tables,
     write_json,
     make_lookup_pay_split,
     write_library_events,
+    write_repeat_stats,
+    make_seed_table,
 )
 
 
 class GeneralGameState(ABC):
     """Master gamestate which other classes inherit from."""
 
+    tracer = NULL_TRACER
+
     def __init__(self, config):
         self.config = config
         self.output_files = OutputFiles(self.config)
@@ -28,6 +39,7 @@ class GeneralGameState(ABC):
         self.library = {}
         self.recorded_events = {}
         self.special_symbol_functions = {}
+        self.board_samplers = {}
         self.temp_wins = []
         self.create_symbol_map()
         self.assign_special_sym_function()
@@ -36,6 +48,8 @@ class GeneralGameState(ABC):
         self.book = Book(self.sim, self.criteria)
         self.repeat = True
         self.repeat_count = 0
+        self.repeat_stats = RepeatStats()
+        self.summary_rows = []
         self.win_data = {
             "totalWin": 0,
             "wins": [],
@@ -87,10 +101,9 @@ class GeneralGameState(ABC):
 
     def reset_seed(self, sim: int = 0, seed_override=None) -> None:
         """Reset rng seed to simulation number for reproducibility."""
-        if seed_override is not None:
-            random.seed(seed_override + 1)
-        else:
-            random.seed(sim + 1)
+        seed = (seed_override if seed_override is not None else sim) + 1
+        self.rng = make_rng(getattr(self.config, "rng_type", "mersenne"), seed)
+        random.seed(seed)  # game code still drawing from the global random module
         self.sim = sim
         self.repeat_count = 0
 
@@ -126,7 +139,7 @@ class GeneralGameState(ABC):
         """Return requirements for criteria setup/acceptance."""
         for d in self.get_betmode(self.betmode).get_distributions():
             if d._criteria == self.criteria:
-                return d._conditions
+                return d.get_conditions(self.repeat_count)
         return RuntimeError("Could not locate betmode conditions")
 
     def check_current_repeat_count(self, warn_after_count: int = 1000):
@@ -210,33 +223,32 @@ class GeneralGameState(ABC):
             round(self.book.payout_multiplier, 2), round(self.config.wincap, 2)
         ), "Base + Free game payout mismatch!"
 
+    def reject_spin(self, reason: str, **details) -> None:
+        """Flag the current attempt for repeat and record the rejection reason."""
+        self.repeat = True
+        self.repeat_stats.add_rejection(self.criteria, reason)
+        self.tracer.repeat(reason, criteria=self.criteria, sim=self.sim, **details)
+
     def check_repeat(self) -> None:
         """Checks if the spin failed a criteria constraint at any point."""
-        if self.repeat is False:
+        game_specific = self.repeat
+        if not game_specific:
             win_criteria = self.get_current_betmode_distributions().get_win_criteria()
-            debug_repeat = os.getenv("SIM_DEBUG_PROGRESS", "0") != "0"
             if win_criteria is not None and self.final_win != win_criteria:
-                self.repeat = True
-                if debug_repeat:
-                    print(
-                        "[sim-debug] repeat_reason=win_criteria mode={mode} criteria={criteria} "
-                        "target={target} final={final}".format(
-                            mode=self.betmode,
-                            criteria=self.criteria,
-                            target=win_criteria,
-                            final=self.final_win,
-                        ),
-                        flush=True,
-                    )
+                self.reject_spin("win_criteria", target=win_criteria, final=self.final_win)
 
             if self.get_current_distribution_conditions()["force_freegame"] and not (self.triggered_freegame):
-                self.repeat = True
-                if debug_repeat:
-                    print(
-                        "[sim-debug] repeat_reason=force_freegame mode={mode} criteria={criteria}",
-                        flush=True,
-                    )
+                self.reject_spin("force_freegame")
+        self.record_attempt(game_specific)
 
+    def record_attempt(self, game_specific: bool = False) -> None:
+        """
+        Count the finished attempt in the repeat stats and repeat_count, once per check_repeat.
+        game_specific records a rejection for attempts game logic flagged for repeat before check_repeat ran.
+        """
+        if game_specific:
+            self.repeat_stats.add_rejection(self.criteria, "game_specific")
+        self.repeat_stats.add_attempt(self.criteria)
         self.repeat_count += 1
         max_repeats = 500
         if getattr(self, "criteria", "") == "wincap":
@@ -271,8 +283,13 @@ class GeneralGameState(ABC):
         compress=True,
         write_event_list=True,
         simulation_seeds=[],
+        store_books=True,
+        progress_queue=None,
     ) -> None:
-        """Assigns criteria and runs individual simulations. Results are stored in temporary file to be combined when all threads are finished."""
+        """
+        Assigns criteria and runs individual simulations. Results are stored in temporary file to be combined when all threads are finished.
+        Running payout sums are periodically put on progress_queue as ((thread_index, repeat_count), sums).
+        """
         mode_max_win = None
         for bm in self.config.bet_modes:
             if bm._name.lower() == betmode.lower():
@@ -281,39 +298,38 @@ class GeneralGameState(ABC):
 
         self.win_manager = WinManager(self.config.basegame_type, self.config.freegame_type, mode_max_win)
         self.library = {}
+        self.repeat_stats = RepeatStats()
+        self.criteria_codes = {c: i for i, c in enumerate(get_criteria_names(self, betmode))}
+        self.summary_rows = []
+        running_sums = RunningSums()
         self.betmode = betmode
         self.num_sims = num_sims
         start_sim_id = thread_index * num_sims + (total_threads * num_sims) * repeat_count
         end_sim_id = (thread_index + 1) * num_sims + (total_threads * num_sims) * repeat_count
-        debug_progress = os.getenv("SIM_DEBUG_PROGRESS", "0") != "0"
-        debug_interval = max(int(os.getenv("SIM_DEBUG_INTERVAL", "500")), 1)
+        parent_tracer = self.tracer
+        self.tracer = open_tracer(
+            self.output_files.get_trace_name(betmode, thread_index, repeat_count),
+            mode=betmode,
+            thread=thread_index,
+            repeat=repeat_count,
+        )
 
         for sim in range(start_sim_id, end_sim_id):
             self.criteria = sim_to_criteria[sim]
+            spin_start = time.perf_counter()
+            attempts_start = self.repeat_stats.attempts[self.criteria]
             self.run_spin(sim, simulation_seeds[sim])
+            self.repeat_stats.add_sim(self.criteria, time.perf_counter() - spin_start)
+            self.summary_rows.append(
+                summary_row(self, self.criteria_codes, self.repeat_stats.attempts[self.criteria] - attempts_start)
+            )
+            running_sums.add(self.criteria, self.summary_rows[-1][2] / 100, self.summary_rows[-1][-1])
+            if progress_queue is not None and (sim - start_sim_id + 1) % REPORT_INTERVAL == 0:
+                progress_queue.put(((thread_index, repeat_count), running_sums.to_dict()))
+            self.tracer.sim_complete(
+                sim - start_sim_id + 1, num_sims, sim=sim, criteria=self.criteria, final_win=self.final_win
+            )
 
-            if debug_progress:
-                local_idx = sim - start_sim_id + 1
-                if (
-                    local_idx == 1
-                    or local_idx == num_sims
-                    or local_idx % debug_interval == 0
-                ):
-                    print(
-                        "[sim-debug] mode={mode} thread={thread} repeat={repeat} "
-                        "spin={current}/{total} criteria={criteria} final_win={win:.4f} "
-                        "repeat_flag={repeat_flag}".format(
-                            mode=betmode,
-                            thread=thread_index,
-                            repeat=repeat_count,
-                            current=local_idx,
-                            total=num_sims,
-                            criteria=self.criteria,
-                            win=self.final_win,
-                            repeat_flag=self.repeat,
-                        ),
-                        flush=True,
-                    )
         mode_cost = self.get_current_betmode().get_cost()
 
         print(
@@ -325,25 +341,31 @@ class GeneralGameState(ABC):
             flush=True,
         )
 
-        temp_chunk_path = self.output_files.get_temp_multi_thread_name(
-            betmode, thread_index, repeat_count, (compress) * True + (not compress) * False
-        )
-        write_json(self, temp_chunk_path)
-        if debug_progress:
-            try:
-                size_bytes = os.path.getsize(temp_chunk_path)
-            except OSError:
-                size_bytes = -1
-            size_msg = f"{size_bytes / (1024 * 1024):.3f} MB" if size_bytes >= 0 else "unknown size"
-            print(
-                f"[sim-debug] chunk_saved mode={betmode} thread={thread_index} repeat={repeat_count} "
-                f"path={temp_chunk_path} size={size_msg}",
-                flush=True,
+        if store_books:
+            temp_chunk_path = self.output_files.get_temp_multi_thread_name(
+                betmode, thread_index, repeat_count, (compress) * True + (not compress) * False
             )
+            write_json(self, temp_chunk_path)
+            if self.tracer.enabled:
+                self.tracer.event("chunk_saved", path=temp_chunk_path, size_bytes=os.path.getsize(temp_chunk_path))
         print_recorded_wins(self, self.output_files.get_temp_force_name(betmode, thread_index, repeat_count))
         make_lookup_tables(self, self.output_files.get_temp_lookup_name(betmode, thread_index, repeat_count))
         make_lookup_pay_split(self, self.output_files.get_temp_segmented_name(betmode, thread_index, repeat_count))
+        make_seed_table(
+            self, self.output_files.get_temp_seed_name(betmode, thread_index, repeat_count), simulation_seeds
+        )
+        write_repeat_stats(self, self.output_files.get_temp_repeat_stats_name(betmode, thread_index, repeat_count))
+        write_temp_summary(
+            self.summary_rows, self.output_files.get_temp_summary_name(betmode, thread_index, repeat_count)
+        )
+        WinHistograms.from_summary_rows(self.summary_rows, list(self.criteria_codes)).save(
+            self.output_files.get_temp_histogram_name(betmode, thread_index, repeat_count)
+        )
+        if progress_queue is not None:
+            progress_queue.put(((thread_index, repeat_count), running_sums.to_dict()))
 
         if write_event_list:
             write_library_events(self, list(self.library.values()), betmode)
         betmode_copy_list.append(self.config.bet_modes)
+        self.tracer.close()
+        self.tracer = parent_tracer
@@ -0,0 +1,146 @@
+"""Structured simulation tracing, configured once per worker process."""
+
+import os
+import json
+import time
+from functools import lru_cache
+
+TRACE_LEVELS = {"off": 0, "info": 1, "debug": 2}
+
+
+class TraceSettings:
+    """Trace level and sampling intervals, read from the environment once per process."""
+
+    def __init__(
+        self,
+        level: int = 0,
+        sim_interval: int = 500,
+        spin_interval: int = 100,
+        fs_interval: int = 5,
+        echo: bool = False,
+    ):
+        self.level = level
+        self.sim_interval = max(int(sim_interval), 1)
+        self.spin_interval = max(int(spin_interval), 1)
+        self.fs_interval = max(int(fs_interval), 1)
+        self.echo = echo
+
+    @classmethod
+    def from_env(cls) -> "TraceSettings":
+        """SIM_TRACE_LEVEL=off|info|debug, SIM_DEBUG_PROGRESS=1 is kept as an alias for debug."""
+        level_name = os.getenv("SIM_TRACE_LEVEL", "").strip().lower()
+        if level_name:
+            if level_name not in TRACE_LEVELS:
+                raise RuntimeError(f"Unknown SIM_TRACE_LEVEL '{level_name}', expected one of {list(TRACE_LEVELS)}")
+            level = TRACE_LEVELS[level_name]
+        else:
+            level = TRACE_LEVELS["debug"] if os.getenv("SIM_DEBUG_PROGRESS", "0") != "0" else TRACE_LEVELS["off"]
+
+        return cls(
+            level=level,
+            sim_interval=int(os.getenv("SIM_DEBUG_INTERVAL", "500")),
+            spin_interval=int(os.getenv("SIM_DEBUG_SPIN_INTERVAL", "100")),
+            fs_interval=int(os.getenv("SIM_DEBUG_FS_INTERVAL", "5")),
+            echo=os.getenv("SIM_TRACE_ECHO", "0") != "0",
+        )
+
+
+@lru_cache(maxsize=1)
+def get_trace_settings() -> TraceSettings:
+    """Process-wide trace settings."""
+    return TraceSettings.from_env()
+
+
+class NullTracer:
+    """Disabled tracer, every hook is a no-op."""
+
+    enabled = False
+    debug = False
+
+    def event(self, name: str, **fields) -> None:
+        pass
+
+    def sim_complete(self, index: int, total: int, **fields) -> None:
+        pass
+
+    def spin_attempt(self, attempt: int, **fields) -> None:
+        pass
+
+    def spin_resolved(self, attempts: int, **fields) -> None:
+        pass
+
+    def repeat(self, reason: str, **fields) -> None:
+        pass
+
+    def freespin(self, stage: str, spin: int = 0, total: int = 0, **fields) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+NULL_TRACER = NullTracer()
+
+
+class SimTracer(NullTracer):
+    """Writes sampled trace records to a JSONL file, one record per line."""
+
+    enabled = True
+
+    def __init__(self, path: str, settings: TraceSettings, **context):
+        self.path = path
+        self.settings = settings
+        self.debug = settings.level >= TRACE_LEVELS["debug"]
+        self.context = context
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._file = open(path, "w", encoding="UTF-8")
+
+    def _write(self, name: str, fields: dict) -> None:
+        record = {"t": round(time.time(), 6), "event": name}
+        record.update(self.context)
+        record.update(fields)
+        line = json.dumps(record, default=str)
+        self._file.write(line + "\n")
+        if self.settings.echo:
+            print(f"[sim-debug] {line}", flush=True)
+
+    def event(self, name: str, **fields) -> None:
+        """Unsampled info-level record."""
+        self._write(name, fields)
+
+    def sim_complete(self, index: int, total: int, **fields) -> None:
+        """Sampled record after each accepted simulation (1-indexed within the worker)."""
+        if index == 1 or index == total or index % self.settings.sim_interval == 0:
+            self._write("sim_complete", {"index": index, "total": total, **fields})
+
+    def spin_attempt(self, attempt: int, **fields) -> None:
+        if self.debug and (attempt == 1 or attempt % self.settings.spin_interval == 0):
+            self._write("spin_attempt", {"attempt": attempt, **fields})
+
+    def spin_resolved(self, attempts: int, **fields) -> None:
+        if self.debug:
+            self._write("spin_resolved", {"attempts": attempts, **fields})
+
+    def repeat(self, reason: str, **fields) -> None:
+        if self.debug:
+            self._write("repeat", {"reason": reason, **fields})
+
+    def freespin(self, stage: str, spin: int = 0, total: int = 0, **fields) -> None:
+        """Free-spin start/progress/end, progress records are sampled by spin number."""
+        if not self.debug:
+            return
+        if stage == "progress" and not (spin == 1 or spin == total or spin % self.settings.fs_interval == 0):
+            return
+        self._write(f"fs_{stage}", {"spin": spin, "total": total, **fields})
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self._file.close()
+
+
+def open_tracer(path: str, **context) -> NullTracer:
+    """Return a file-backed tracer when tracing is enabled, otherwise the shared no-op tracer."""
+    settings = get_trace_settings()
+    if settings.level <= TRACE_LEVELS["off"]:
+        return NULL_TRACER
+    return SimTracer(path, settings, **context)
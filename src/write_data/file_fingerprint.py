@@ -0,0 +1,100 @@
+"""SHA256 and line count of output files computed in one pass, cached by path, size, mtime and inode."""
+
+import os
+import json
+import hashlib
+import tempfile
+
+from src.config.paths import PROJECT_PATH
+
+CACHE_FILE = os.path.join(PROJECT_PATH, ".cache", "file_fingerprints.json")
+READ_SIZE = 1 << 20
+
+_cache = None
+
+
+def _stat_key(filepath: str) -> list:
+    stat = os.stat(filepath)
+    return [stat.st_size, stat.st_mtime_ns, stat.st_ino]
+
+
+def _load_cache() -> dict:
+    global _cache
+    if _cache is None:
+        _cache = {}
+        if os.path.isfile(CACHE_FILE):
+            try:
+                with open(CACHE_FILE, "r", encoding="UTF-8") as f:
+                    _cache = json.load(f)
+            except (json.JSONDecodeError, OSError):
+                _cache = {}
+    return _cache
+
+
+def _save_cache(cache: dict) -> None:
+    """Atomic rewrite, concurrent writers can only drop each other's newest entries."""
+    os.makedirs(os.path.dirname(CACHE_FILE), exist_ok=True)
+    cache = {path: entry for path, entry in cache.items() if os.path.exists(path)}
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(CACHE_FILE), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="UTF-8") as f:
+        json.dump(cache, f)
+    os.replace(temp_name, CACHE_FILE)
+
+
+def compute_fingerprint(filepath: str) -> dict:
+    """Stream the file once, hashing and counting lines (a final line without a newline is counted)."""
+    sha256 = hashlib.sha256()
+    lines, last_byte = 0, b"\n"
+    with open(filepath, "rb") as f:
+        while True:
+            data = f.read(READ_SIZE)
+            if not data:
+                break
+            sha256.update(data)
+            lines += data.count(b"\n")
+            last_byte = data[-1:]
+    if last_byte != b"\n":
+        lines += 1
+    return {"sha256": sha256.hexdigest(), "lines": lines}
+
+
+def get_fingerprint(filepath: str, use_cache: bool = True) -> dict:
+    """Return {'sha256', 'lines', 'size'}, re-reading the file only if its size, mtime or inode changed."""
+    filepath = os.path.abspath(filepath)
+    key = _stat_key(filepath)
+    if not use_cache:
+        return {**compute_fingerprint(filepath), "size": key[0]}
+
+    cache = _load_cache()
+    entry = cache.get(filepath)
+    if entry is None or entry["key"] != key:
+        entry = {"key": key, **compute_fingerprint(filepath)}
+        cache[filepath] = entry
+        _save_cache(cache)
+    return {"sha256": entry["sha256"], "lines": entry["lines"], "size": key[0]}
+
+
+def get_cached_fingerprint(filepath: str):
+    """Cached {'sha256', 'lines', 'size'} if the file is unchanged since it was fingerprinted, without reading it."""
+    filepath = os.path.abspath(filepath)
+    key = _stat_key(filepath)
+    entry = _load_cache().get(filepath)
+    if entry is None or entry["key"] != key:
+        return None
+    return {"sha256": entry["sha256"], "lines": entry["lines"], "size": key[0]}
+
+
+def record_fingerprint(filepath: str, sha256: str, lines: int) -> None:
+    """Store a fingerprint computed while the file was being written, so it is never read back to hash it."""
+    filepath = os.path.abspath(filepath)
+    cache = _load_cache()
+    cache[filepath] = {"key": _stat_key(filepath), "sha256": sha256, "lines": lines}
+    _save_cache(cache)
+
+
+def get_file_sha256(filepath: str) -> str:
+    return get_fingerprint(filepath)["sha256"]
+
+
+def get_line_count(filepath: str) -> int:
+    return get_fingerprint(filepath)["lines"]
@@ -0,0 +1,128 @@
+"""Inverted index over force records: (name, value) -> force entries -> sorted book ids."""
+
+import os
+import json
+import numpy as np
+
+
+class ForceIndex:
+    """
+    Force record entries with sorted book-id lists, and posting lists of entry indices for every (name, value).
+    A search dict matches an entry when all of its pairs appear in that entry's description, book ids of all
+    matching entries are then merged. Book ids are stored delta-encoded and zlib compressed on disk.
+    """
+
+    def __init__(self, searches: list, times_triggered: np.ndarray, book_offsets: np.ndarray, book_ids: np.ndarray):
+        self.searches = searches
+        self.times_triggered = times_triggered
+        self.book_offsets = book_offsets
+        self.book_ids = book_ids
+        postings = {}
+        for entry, search in enumerate(searches):
+            for pair in search.items():
+                postings.setdefault(pair, []).append(entry)
+        self.postings = {pair: np.array(entries, dtype=np.int64) for pair, entries in postings.items()}
+        self.all_entries = np.arange(len(searches), dtype=np.int64)
+
+    @classmethod
+    def from_force_records(cls, records: list) -> "ForceIndex":
+        """Build from the force_record_<mode>.json list format."""
+        searches, times_triggered, book_lists = [], [], []
+        for record in records:
+            searches.append({str(item["name"]): str(item["value"]) for item in record["search"]})
+            times_triggered.append(record["timesTriggered"])
+            book_lists.append(np.unique(np.asarray(record["bookIds"], dtype=np.int64)))
+        book_offsets = np.zeros(len(book_lists) + 1, dtype=np.int64)
+        book_offsets[1:] = np.cumsum([len(ids) for ids in book_lists])
+        book_ids = np.concatenate(book_lists) if book_lists else np.zeros(0, dtype=np.int64)
+        return cls(searches, np.asarray(times_triggered, dtype=np.int64), book_offsets, book_ids)
+
+    @classmethod
+    def from_force_file(cls, filename: str) -> "ForceIndex":
+        with open(filename, "r", encoding="UTF-8") as f:
+            return cls.from_force_records(json.load(f))
+
+    def save(self, filename: str) -> None:
+        """Write the index as a compressed .npz, book ids are delta-encoded within each entry."""
+        deltas = np.diff(self.book_ids, prepend=0)
+        starts = self.book_offsets[:-1][np.diff(self.book_offsets) > 0]
+        deltas[starts] = self.book_ids[starts]
+        np.savez_compressed(
+            filename,
+            searches=np.array(json.dumps(self.searches)),
+            times_triggered=self.times_triggered,
+            book_offsets=self.book_offsets,
+            book_deltas=deltas.astype(np.uint32),
+        )
+
+    @classmethod
+    def load(cls, filename: str) -> "ForceIndex":
+        with np.load(filename, allow_pickle=False) as data:
+            book_offsets = data["book_offsets"]
+            deltas = data["book_deltas"].astype(np.int64)
+            searches = json.loads(str(data["searches"]))
+            times_triggered = data["times_triggered"]
+        # Undo the delta encoding, the first id of each entry is stored as an absolute value
+        running = np.cumsum(deltas)
+        lengths = np.diff(book_offsets)
+        starts = book_offsets[:-1][lengths > 0]
+        base = running[starts] - deltas[starts]
+        book_ids = running - np.repeat(base, lengths[lengths > 0])
+        return cls(searches, times_triggered, book_offsets, book_ids)
+
+    def match_entries(self, search_key: dict) -> np.ndarray:
+        """Entries containing every (name, value) pair of the search key, an empty key matches all entries."""
+        postings = [self.postings.get((str(k), str(v))) for k, v in search_key.items()]
+        if any(posting is None for posting in postings):
+            return self.all_entries[:0]
+        entries = self.all_entries
+        for posting in sorted(postings, key=len):  # shortest lists first
+            entries = np.intersect1d(entries, posting, assume_unique=True)
+        return entries
+
+    def entry_book_ids(self, entries: np.ndarray) -> np.ndarray:
+        """Sorted unique book ids over a set of entries."""
+        if len(entries) == 0:
+            return self.book_ids[:0]
+        return np.unique(
+            np.concatenate([self.book_ids[self.book_offsets[e] : self.book_offsets[e + 1]] for e in entries])
+        )
+
+    def find(self, search_key: dict) -> np.ndarray:
+        """Book ids of entries partially matching a single search key."""
+        return self.entry_book_ids(self.match_entries(search_key))
+
+    def find_all(self, search_keys: list) -> np.ndarray:
+        """AND: book ids matching every search key (each key may match a different entry)."""
+        matched = None
+        for search_key in search_keys:
+            ids = self.find(search_key)
+            matched = ids if matched is None else np.intersect1d(matched, ids, assume_unique=True)
+        return matched if matched is not None else self.book_ids[:0]
+
+    def find_any(self, search_keys: list) -> np.ndarray:
+        """OR: book ids matching at least one search key."""
+        if len(search_keys) == 0:
+            return self.book_ids[:0]
+        return self.entry_book_ids(np.unique(np.concatenate([self.match_entries(k) for k in search_keys])))
+
+    def sim_count(self, search_key: dict) -> int:
+        """Summed timesTriggered of matching entries."""
+        return int(self.times_triggered[self.match_entries(search_key)].sum())
+
+
+def get_force_index_name(force_path: str, betmode: str) -> str:
+    return os.path.join(force_path, f"force_index_{betmode}.npz")
+
+
+def load_force_index(force_path: str, betmode: str) -> ForceIndex:
+    """Load force_index_<mode>.npz, rebuilding it from force_record_<mode>.json when missing or stale."""
+    index_file = get_force_index_name(force_path, betmode)
+    record_file = os.path.join(force_path, f"force_record_{betmode}.json")
+    if os.path.isfile(index_file) and (
+        not os.path.isfile(record_file) or os.path.getmtime(index_file) >= os.path.getmtime(record_file)
+    ):
+        return ForceIndex.load(index_file)
+    force_index = ForceIndex.from_force_file(record_file)
+    force_index.save(index_file)
+    return force_index
@@ -0,0 +1,161 @@
+"""
+Binary lookup table and force record bundle, memory-mapped by the optimizer instead of re-parsing CSV and JSON.
+
+Layout (little-endian):
+    magic b"OPTBNDL2"
+    u64 counts: books, force entries, pairs, book refs, force strings
+    u64 weights[books], u64 payouts[books], u32 ids[books]
+    string table of force names/values (u64 offsets[count + 1], utf-8 bytes[offsets[count]])
+    u32 times_triggered[entries], u64 pair_offsets[entries + 1], u32 pair_names[pairs], u32 pair_values[pairs]
+    u64 book_offsets[entries + 1], u32 book_ids[book refs]
+"""
+
+import os
+import json
+import numpy as np
+
+from utils.analysis.lut_statistics import LookupTable
+
+MAGIC = b"OPTBNDL2"
+
+
+def get_optimizer_bundle_name(lookup_path: str, betmode: str) -> str:
+    return os.path.join(lookup_path, f"optimizer_bundle_{betmode}.bin")
+
+
+def _string_table(strings: list) -> bytes:
+    encoded = [s.encode("UTF-8") for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype="<u8")
+    offsets[1:] = np.cumsum([len(s) for s in encoded])
+    return offsets.tobytes() + b"".join(encoded)
+
+
+def write_optimizer_bundle(
+    filename: str,
+    ids: np.ndarray,
+    weights: np.ndarray,
+    payouts: np.ndarray,
+    force_records: list,
+) -> None:
+    """Write the bundle, book arrays share one order and force records are stored as given."""
+    strings, string_ids = [], {}
+
+    def string_id(s: str) -> int:
+        if s not in string_ids:
+            string_ids[s] = len(strings)
+            strings.append(s)
+        return string_ids[s]
+
+    times, pair_names, pair_values, book_lists = [], [], [], []
+    pair_offsets, book_offsets = [0], [0]
+    for record in force_records:
+        times.append(record["timesTriggered"])
+        for item in record["search"]:
+            pair_names.append(string_id(str(item["name"])))
+            pair_values.append(string_id(str(item["value"])))
+        pair_offsets.append(len(pair_names))
+        book_lists.append(np.asarray(record["bookIds"], dtype="<u4"))
+        book_offsets.append(book_offsets[-1] + len(record["bookIds"]))
+
+    counts = [len(ids), len(force_records), len(pair_names), book_offsets[-1], len(strings)]
+    # written beside the target and swapped in, so a running optimizer never sees a partial file
+    temp_name = filename + ".tmp"
+    with open(temp_name, "wb") as f:
+        f.write(MAGIC)
+        f.write(np.asarray(counts, dtype="<u8").tobytes())
+        f.write(np.asarray(weights, dtype="<u8").tobytes())
+        f.write(np.asarray(payouts, dtype="<u8").tobytes())
+        f.write(np.asarray(ids, dtype="<u4").tobytes())
+        f.write(_string_table(strings))
+        f.write(np.asarray(times, dtype="<u4").tobytes())
+        f.write(np.asarray(pair_offsets, dtype="<u8").tobytes())
+        f.write(np.asarray(pair_names, dtype="<u4").tobytes())
+        f.write(np.asarray(pair_values, dtype="<u4").tobytes())
+        f.write(np.asarray(book_offsets, dtype="<u8").tobytes())
+        for book_list in book_lists:
+            f.write(book_list.tobytes())
+    os.replace(temp_name, filename)
+
+
+def read_optimizer_bundle(filename: str) -> dict:
+    """Memory-map a bundle, returning its arrays and force records."""
+    data = np.memmap(filename, dtype=np.uint8, mode="r")
+    if bytes(data[:8]) != MAGIC:
+        raise RuntimeError(f"{filename} is not an optimizer bundle.")
+    pos = 8
+
+    def take(dtype: str, count: int) -> np.ndarray:
+        nonlocal pos
+        size = np.dtype(dtype).itemsize * count
+        if pos + size > len(data):
+            raise RuntimeError(f"Optimizer bundle {filename} is truncated.")
+        array = data[pos : pos + size].view(dtype)
+        pos += size
+        return array
+
+    def take_strings(count: int) -> list:
+        offsets = take("<u8", count + 1)
+        raw = bytes(take("u1", int(offsets[-1])))
+        return [raw[offsets[i] : offsets[i + 1]].decode("UTF-8") for i in range(count)]
+
+    num_books, num_entries, num_pairs, num_refs, num_strings = take("<u8", 5).tolist()
+    bundle = {
+        "weights": take("<u8", num_books),
+        "payouts": take("<u8", num_books),
+        "ids": take("<u4", num_books),
+    }
+    strings = take_strings(num_strings)
+    times = take("<u4", num_entries)
+    pair_offsets = take("<u8", num_entries + 1)
+    pair_names, pair_values = take("<u4", num_pairs), take("<u4", num_pairs)
+    book_offsets = take("<u8", num_entries + 1)
+    book_ids = take("<u4", num_refs)
+    bundle["force_records"] = [
+        {
+            "search": [
+                {"name": strings[pair_names[p]], "value": strings[pair_values[p]]}
+                for p in range(pair_offsets[e], pair_offsets[e + 1])
+            ],
+            "timesTriggered": int(times[e]),
+            "bookIds": book_ids[book_offsets[e] : book_offsets[e + 1]].tolist(),
+        }
+        for e in range(num_entries)
+    ]
+    return bundle
+
+
+def build_optimizer_bundle(library_path: str, betmode: str) -> str:
+    """Rebuild a mode's bundle from its lookup table and force record files."""
+    lookup_path = os.path.join(library_path, "lookup_tables")
+    lookup_table = LookupTable.from_csv(os.path.join(lookup_path, f"lookUpTable_{betmode}.csv"))
+    ids, weights, payouts = lookup_table.ids, lookup_table.weights, lookup_table.payouts
+    with open(os.path.join(library_path, "forces", f"force_record_{betmode}.json"), "r", encoding="UTF-8") as f:
+        force_records = json.load(f)
+
+    filename = get_optimizer_bundle_name(lookup_path, betmode)
+    write_optimizer_bundle(filename, ids, weights, payouts, force_records)
+    return filename
+
+
+def _is_current_format(filename: str) -> bool:
+    with open(filename, "rb") as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def ensure_optimizer_bundle(library_path: str, betmode: str) -> str:
+    """
+    Return the bundle path, rebuilding it if the lookup table or force record changed since it was written,
+    or if it was written in an older layout.
+    """
+    filename = get_optimizer_bundle_name(os.path.join(library_path, "lookup_tables"), betmode)
+    sources = [
+        os.path.join(library_path, "lookup_tables", f"lookUpTable_{betmode}.csv"),
+        os.path.join(library_path, "forces", f"force_record_{betmode}.json"),
+    ]
+    if (
+        not os.path.isfile(filename)
+        or not _is_current_format(filename)
+        or any(os.path.getmtime(s) > os.path.getmtime(filename) for s in sources)
+    ):
+        build_optimizer_bundle(library_path, betmode)
+    return filename
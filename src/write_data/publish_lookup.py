@@ -0,0 +1,207 @@
+"""
+Publish optimizer results as final lookup tables. The table is written, hashed and summarised in a single
+streaming pass, and the results are cached so the backend config never re-reads published tables.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from src.config.paths import PROJECT_PATH
+from src.write_data.file_fingerprint import get_cached_fingerprint, record_fingerprint
+
+STATS_FILE = os.path.join(PROJECT_PATH, ".cache", "lookup_stats.json")
+READ_SIZE = 1 << 20
+
+
+class LookupAccumulator:
+    """Running SHA256, line count and payout distribution of lookup table rows, fed one block at a time."""
+
+    def __init__(self):
+        self.sha256 = hashlib.sha256()
+        self.lines = 0
+        self.last_byte = b"\n"
+        self.dist = {}
+
+    def update(self, raw: bytes, weights: np.ndarray, payouts: np.ndarray) -> None:
+        """raw is the exact file content of the rows, payouts are in lookup table units (cents)."""
+        self.sha256.update(raw)
+        self.lines += raw.count(b"\n")
+        if raw:
+            self.last_byte = raw[-1:]
+        if len(payouts) == 0:
+            return
+        unique, inverse = np.unique(payouts, return_inverse=True)
+        # sum 32-bit halves so block totals of large optimized weights cannot overflow
+        low_sums = np.zeros(len(unique), dtype=np.uint64)
+        high_sums = np.zeros(len(unique), dtype=np.uint64)
+        np.add.at(low_sums, inverse, weights & np.uint64(0xFFFFFFFF))
+        np.add.at(high_sums, inverse, weights >> np.uint64(32))
+        for payout, low, high in zip(unique.tolist(), low_sums.tolist(), high_sums.tolist()):
+            self.dist[payout] = self.dist.get(payout, 0) + (high << 32) + low
+
+    def result(self) -> dict:
+        lines = self.lines + (1 if self.last_byte != b"\n" else 0)
+        return {"sha256": self.sha256.hexdigest(), "lines": lines, **distribution_stats(self.dist)}
+
+
+def distribution_stats(dist: dict) -> dict:
+    """
+    Moments of {payout (cents): total weight} in payout multiples. Mean and variance match
+    make_win_distribution/get_distribution_moments. Skewness and kurtosis are standardised by the distribution's
+    own standard deviation, get_distribution_moments divides by (std / bet_cost) ** 3 and ** 4 instead.
+    """
+    total_weight = sum(dist.values())
+    if total_weight == 0:
+        return {"total_weight": 0, "mean": 0.0, "variance": 0.0, "skewness": 0.0, "kurtosis": 0.0}
+    normalized = {payout / 100: weight / total_weight for payout, weight in sorted(dist.items())}
+    mean = float(np.average(list(normalized.keys()), weights=list(normalized.values())))
+    norm_weight = sum(normalized.values())
+    variance, third, fourth = 0.0, 0.0, 0.0
+    for payout, prob in normalized.items():
+        variance += ((payout - mean) ** 2) * (prob / norm_weight)
+        third += ((payout - mean) ** 3) * prob
+        fourth += ((payout - mean) ** 4) * prob
+    skewness = third / variance**1.5 if variance > 0 else 0.0
+    kurtosis = fourth / variance**2 - 3 if variance > 0 else 0.0
+    return {
+        "total_weight": total_weight,
+        "mean": mean,
+        "variance": variance,
+        "skewness": skewness,
+        "kurtosis": kurtosis,
+    }
+
+
+def _split_rows(lines: list, source: str) -> np.ndarray:
+    rows = [line.split(",") for line in lines]
+    for parts in rows:
+        if len(parts) != 3:
+            raise SyntaxError(f"Malformed line in {source}, expecting [id,weight,payout]. Have: {parts}")
+    return np.array(rows)
+
+
+def publish_optimized_table(opt_file: str, lut_file: str) -> dict:
+    """
+    Convert the distribution section of an optimizer result into a published lookup table (payouts scaled to
+    cents), returning the new table's sha256, length and moments.
+    """
+    accumulator = LookupAccumulator()
+    temp_name = lut_file + ".tmp"
+    with open(opt_file, "r", encoding="UTF-8") as infile, open(temp_name, "wb") as outfile:
+        for line in infile:
+            if line.strip() == "Distribution":
+                break
+        while True:
+            lines = [line.strip() for line in infile.readlines(READ_SIZE)]
+            if not lines:
+                break
+            lines = [line for line in lines if line]
+            if not lines:
+                continue
+            rows = _split_rows(lines, opt_file)
+            try:
+                ids = rows[:, 0].astype(np.int64)
+                weights = rows[:, 1].astype(np.uint64)
+                payouts = np.rint(rows[:, 2].astype(np.float64) * 100).astype(np.int64)
+            except ValueError as err:
+                raise ValueError(f"Could not transform lines of {opt_file}.") from err
+            raw = "".join(
+                f"{idx},{weight},{payout}\n"
+                for idx, weight, payout in zip(ids.tolist(), weights.tolist(), payouts.tolist())
+            ).encode("UTF-8")
+            outfile.write(raw)
+            accumulator.update(raw, weights, payouts)
+    os.replace(temp_name, lut_file)
+
+    stats = accumulator.result()
+    stats["file"] = lut_file
+    return stats
+
+
+def summarise_lookup_table(lut_file: str) -> dict:
+    """sha256, length and moments of an existing lookup table, read once."""
+    accumulator = LookupAccumulator()
+    with open(lut_file, "rb") as f:
+        while True:
+            lines = f.readlines(READ_SIZE)
+            if not lines:
+                break
+            text_lines = [line.strip() for line in lines if line.strip()]
+            if text_lines:
+                rows = _split_rows([line.decode("UTF-8") for line in text_lines], lut_file)
+                accumulator.update(b"".join(lines), rows[:, 1].astype(np.uint64), rows[:, 2].astype(np.int64))
+            else:
+                accumulator.update(b"".join(lines), np.zeros(0, dtype=np.uint64), np.zeros(0, dtype=np.int64))
+    stats = accumulator.result()
+    stats["file"] = lut_file
+    return stats
+
+
+def _load_stats() -> dict:
+    if os.path.isfile(STATS_FILE):
+        try:
+            with open(STATS_FILE, "r", encoding="UTF-8") as f:
+                return json.load(f)
+        except (json.JSONDecodeError, OSError):
+            pass
+    return {}
+
+
+def _save_stats(stats_cache: dict) -> None:
+    os.makedirs(os.path.dirname(STATS_FILE), exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(dir=os.path.dirname(STATS_FILE), suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="UTF-8") as f:
+        json.dump(stats_cache, f)
+    os.replace(temp_name, STATS_FILE)
+
+
+def _record(results: dict) -> None:
+    """Store fingerprints and moments (keyed by content hash) computed in worker processes."""
+    stats_cache = _load_stats()
+    for stats in results.values():
+        record_fingerprint(stats["file"], stats["sha256"], stats["lines"])
+        stats_cache[stats["sha256"]] = {k: v for k, v in stats.items() if k != "file"}
+    _save_stats(stats_cache)
+
+
+def _run_parallel(function, jobs: dict, max_workers: int = None) -> dict:
+    """Run function(*args) for each {mode: args}, across a process pool when there is more than one job."""
+    if max_workers is None:
+        max_workers = min(len(jobs), os.cpu_count() or 1)
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = {mode: executor.submit(function, *args) for mode, args in jobs.items()}
+            return {mode: future.result() for mode, future in futures.items()}
+    return {mode: function(*args) for mode, args in jobs.items()}
+
+
+def publish_lookup_tables(jobs: dict, max_workers: int = None) -> dict:
+    """Publish several modes at once, jobs are {mode: (optimizer result file, lookup table file)}."""
+    results = _run_parallel(publish_optimized_table, jobs, max_workers)
+    _record(results)
+    return results
+
+
+def get_lookup_stats(lut_files: dict, max_workers: int = None) -> dict:
+    """
+    sha256, length and moments of published tables ({mode: path}). Tables unchanged since they were published
+    or last summarised are answered from the cache, the rest are summarised in parallel.
+    """
+    stats_cache = _load_stats()
+    results, pending = {}, {}
+    for mode, lut_file in lut_files.items():
+        fingerprint = get_cached_fingerprint(lut_file)
+        if fingerprint is not None and fingerprint["sha256"] in stats_cache:
+            results[mode] = {**stats_cache[fingerprint["sha256"]], "file": lut_file}
+        else:
+            pending[mode] = (lut_file,)
+
+    if pending:
+        computed = _run_parallel(summarise_lookup_table, pending, max_workers)
+        _record(computed)
+        results.update(computed)
+    return {mode: results[mode] for mode in lut_files}
@@ -0,0 +1,117 @@
+"""Exact, mergeable win histograms kept per worker, so unoptimized statistics need no second pass over the LUTs."""
+
+import json
+from collections import Counter
+import numpy as np
+
+from src.write_data.sim_summary import SUMMARY_DTYPE
+from src.write_data.file_fingerprint import get_fingerprint
+
+
+def _count(values: np.ndarray) -> Counter:
+    unique, counts = np.unique(values, return_counts=True)
+    return Counter(dict(zip(unique.tolist(), counts.tolist())))
+
+
+class WinHistograms:
+    """
+    Simulation counts per payout (lookup table units), and per criteria counts of basegame, freegame and total
+    (basegame + freegame) wins. Force counts hold the summed timesTriggered of every (name, value) force pair.
+    """
+
+    def __init__(
+        self,
+        num_sims: int = 0,
+        payout: Counter = None,
+        criteria: dict = None,
+        force: dict = None,
+        lookup_sha256: str = None,
+    ):
+        self.num_sims = num_sims
+        self.payout = payout or Counter()
+        self.criteria = criteria or {}
+        self.force = force or {}
+        self.lookup_sha256 = lookup_sha256
+
+    @classmethod
+    def from_summary_rows(cls, rows: list, criteria_names: list) -> "WinHistograms":
+        """Histograms of a single worker's summary rows (see sim_summary.summary_row)."""
+        summary = np.array(rows, dtype=SUMMARY_DTYPE)
+        criteria = {}
+        for code, name in enumerate(criteria_names):
+            mask = summary["criteria"] == code
+            if not mask.any():
+                continue
+            base, free = summary["base_win"][mask], summary["free_win"][mask]
+            criteria[name] = {"base": _count(base), "free": _count(free), "total": _count(base + free)}
+        return cls(len(summary), _count(summary["payout"]), criteria)
+
+    def merge(self, other: "WinHistograms") -> None:
+        self.num_sims += other.num_sims
+        self.payout.update(other.payout)
+        for name, hists in other.criteria.items():
+            own = self.criteria.setdefault(name, {kind: Counter() for kind in hists})
+            for kind, counts in hists.items():
+                own[kind].update(counts)
+
+    def set_force_counts(self, force_results: dict) -> None:
+        """Sum timesTriggered over merged force records ({((name, value), ...): {'timesTriggered': n}})."""
+        force = {}
+        for combination, result in force_results.items():
+            for name, value in combination:
+                values = force.setdefault(str(name), {})
+                values[str(value)] = values.get(str(value), 0) + result["timesTriggered"]
+        self.force = force
+
+    def set_lookup_table(self, lut_file: str) -> None:
+        """Record the lookup table the histograms describe, used to detect later edits or optimization."""
+        self.lookup_sha256 = get_fingerprint(lut_file)["sha256"]
+
+    def describes(self, lut_file: str) -> bool:
+        """True if lut_file is still the unweighted table these histograms were built from."""
+        return self.lookup_sha256 is not None and get_fingerprint(lut_file)["sha256"] == self.lookup_sha256
+
+    def to_dict(self) -> dict:
+        return {
+            "num_sims": self.num_sims,
+            "lookup_sha256": self.lookup_sha256,
+            "payout": {str(k): v for k, v in sorted(self.payout.items())},
+            "criteria": {
+                name: {kind: {str(k): v for k, v in sorted(counts.items())} for kind, counts in hists.items()}
+                for name, hists in self.criteria.items()
+            },
+            "force": self.force,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "WinHistograms":
+        def counter(counts):
+            return Counter({int(k): v for k, v in counts.items()})
+
+        return cls(
+            data["num_sims"],
+            counter(data["payout"]),
+            {
+                name: {kind: counter(counts) for kind, counts in hists.items()}
+                for name, hists in data["criteria"].items()
+            },
+            data.get("force", {}),
+            data.get("lookup_sha256"),
+        )
+
+    def save(self, filename: str, indent: int = None) -> None:
+        with open(filename, "w", encoding="UTF-8") as f:
+            json.dump(self.to_dict(), f, indent=indent)
+
+    @classmethod
+    def load(cls, filename: str) -> "WinHistograms":
+        with open(filename, "r", encoding="UTF-8") as f:
+            return cls.from_dict(json.load(f))
+
+
+def merge_histograms(file_list: list) -> WinHistograms:
+    """Merge temporary per-worker histogram files."""
+    histograms = WinHistograms()
+    for filename in file_list:
+        histograms.merge(WinHistograms.load(filename))
+    return histograms
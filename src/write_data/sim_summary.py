@@ -0,0 +1,80 @@
+"""Columnar per-simulation summary, written beside the lookup tables as memory-mappable .npy columns."""
+
+import os
+import json
+import numpy as np
+
+# Win columns use lookup table units (payout multiplier x100)
+SUMMARY_DTYPE = np.dtype(
+    [
+        ("id", np.uint64),
+        ("weight", np.uint64),
+        ("payout", np.uint64),
+        ("base_win", np.uint64),
+        ("free_win", np.uint64),
+        ("criteria", np.int16),
+        ("attempts", np.uint32),
+        ("events", np.uint32),
+        ("flags", np.uint8),
+    ]
+)
+SUMMARY_COLUMNS = list(SUMMARY_DTYPE.names)
+
+FLAG_FREEGAME = 1
+FLAG_WINCAP = 2
+
+
+def get_criteria_names(gamestate: object, betmode: str) -> list:
+    """Criteria in distribution order, the list position is the criteria code."""
+    return [d._criteria for d in gamestate.get_betmode(betmode).get_distributions()]
+
+
+def summary_row(gamestate: object, criteria_codes: dict, attempts: int) -> tuple:
+    """Summary values for the accepted simulation currently held in gamestate.book."""
+    book = gamestate.book
+    flags = FLAG_FREEGAME * bool(gamestate.triggered_freegame) | FLAG_WINCAP * bool(gamestate.wincap_triggered)
+    return (
+        book.id,
+        1,
+        int(round(book.payout_multiplier * 100, 0)),
+        int(round(book.basegame_wins * 100, 0)),
+        int(round(book.freegame_wins * 100, 0)),
+        criteria_codes.get(book.criteria, -1),
+        attempts,
+        len(book.events),
+        flags,
+    )
+
+
+def write_temp_summary(rows: list, name: str) -> None:
+    """Write a single thread's summary rows as a structured array."""
+    np.save(name, np.array(rows, dtype=SUMMARY_DTYPE), allow_pickle=False)
+
+
+def merge_summaries(file_list: list, out_dir: str, criteria_names: list) -> np.ndarray:
+    """Concatenate thread summaries, sorted by id, and write one .npy file per column."""
+    summary = np.concatenate([np.load(fname, allow_pickle=False) for fname in file_list])
+    summary = summary[np.argsort(summary["id"], kind="stable")]
+    os.makedirs(out_dir, exist_ok=True)
+    for column in SUMMARY_COLUMNS:
+        np.save(os.path.join(out_dir, f"{column}.npy"), np.ascontiguousarray(summary[column]), allow_pickle=False)
+    with open(os.path.join(out_dir, "criteria.json"), "w", encoding="UTF-8") as f:
+        json.dump(criteria_names, f, indent=4)
+    return summary
+
+
+def load_summary(summary_dir: str, mmap: bool = True, columns: list = None) -> dict:
+    """
+    Return {column: array} for a summary folder, memory-mapped by default.
+    'criteria_names' maps criteria codes back to names.
+    """
+    if not os.path.isdir(summary_dir):
+        raise FileNotFoundError(f"Summary folder not found: {summary_dir}\nRe-run create_books to write the summary.")
+    summary = {}
+    for column in columns if columns is not None else SUMMARY_COLUMNS:
+        summary[column] = np.load(
+            os.path.join(summary_dir, f"{column}.npy"), mmap_mode="r" if mmap else None, allow_pickle=False
+        )
+    with open(os.path.join(summary_dir, "criteria.json"), "r", encoding="UTF-8") as f:
+        summary["criteria_names"] = json.load(f)
+    return summary
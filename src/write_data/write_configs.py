@@ -5,12 +5,9 @@ import os
 import shutil
 import warnings
 from collections import defaultdict
+from math import sqrt
 from utils.get_file_hash import get_hash
-from utils.analysis.distribution_functions import (
-    make_win_distribution,
-    get_lookup_length,
-    get_distribution_moments,
-)
+from src.write_data.publish_lookup import get_lookup_stats
 
 
 def copy_and_rename_csv(filepath: str) -> None:
@@ -328,19 +325,24 @@ def make_be_config(gamestate):
     }
 
     # Betmode specific data
-    be_info["bookShelfConfig"] = []
+    lut_tables = {}
     for bet in available_bm:
         lut_table = gamestate.output_files.lookups[bet.get_name()]["paths"]["optimized_lookup"]
         if not (os.path.exists(lut_table)):
             print(f"File does not exist: {lut_table}, \n Generating lut_0 file.")
             base_table = gamestate.output_files.lookups[bet.get_name()]["paths"]["base_lookup"]
             copy_and_rename_csv(base_table)
+        lut_tables[bet.get_name()] = lut_table
+    # tables written by the publish stage are answered from its cache, any others are summarised in parallel
+    lut_stats = get_lookup_stats(lut_tables)
 
-        lut_sha_value = get_hash(lut_table)
-        dist = make_win_distribution(lut_table)
-        _, std_val, _, _ = get_distribution_moments(dist, bet.get_cost())
-        std_val = round(std_val / bet.get_cost(), 2)
-        booklength = get_lookup_length(lut_table)
+    be_info["bookShelfConfig"] = []
+    for bet in available_bm:
+        lut_table = lut_tables[bet.get_name()]
+        stats = lut_stats[bet.get_name()]
+        lut_sha_value = stats["sha256"]
+        std_val = round(sqrt(stats["variance"]) / bet.get_cost(), 2)
+        booklength = stats["lines"]
 
         _, lut_nme = os.path.split(lut_table)
         dic = {
@@ -360,7 +362,13 @@ def make_be_config(gamestate):
             data_sha = get_hash(data_loc)
         except FileNotFoundError:
             data_sha = ""
-            warnings.warn("Compressed books file not found. Hash is empty.")
+            if os.path.isfile(gamestate.output_files.get_final_seed_name(bet.get_name())):
+                print(
+                    f"Books for {bet.get_name()} were not stored, hash is empty. Before publishing, write them with "
+                    f"python utils/regenerate_books.py -g {gamestate.config.game_id} -m {bet.get_name()} --all"
+                )
+            else:
+                warnings.warn("Compressed books file not found. Hash is empty.")
 
         force_loc = gamestate.output_files.force[bet.get_name()]["paths"]["force_record"]
         force_sha = get_hash(force_loc)
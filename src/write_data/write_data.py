@@ -4,23 +4,22 @@ from collections import defaultdict
 from warnings import warn
 import shutil
 import os
-import hashlib
 import json
 import ast
 import zstandard as zstd
 
+from src.state.repeat_stats import RepeatStats
+from src.write_data.file_fingerprint import get_file_sha256
+from src.write_data.force_index import ForceIndex, get_force_index_name
+from src.write_data.sim_summary import get_criteria_names, merge_summaries
+from src.write_data.sim_histograms import merge_histograms
+from src.write_data.optimizer_bundle import get_optimizer_bundle_name, write_optimizer_bundle
+
 
 def get_sha_256(file_to_hash: str):
     """Get human readable hash of file."""
     try:
-        with open(file_to_hash, "rb") as f:
-            sha256_file = hashlib.sha256()
-            while True:
-                data = f.read(65536)
-                if not data:
-                    break
-                sha256_file.update(data)
-        sha256_hexRep = sha256_file.hexdigest()
+        sha256_hexRep = get_file_sha256(file_to_hash)
     except FileNotFoundError:
         warn(f"{file_to_hash} is empty.\nCould not create hash")
         sha256_hexRep = ""
@@ -103,6 +102,23 @@ def make_lookup_pay_split(gamestate: object, name: str):
     file.close()
 
 
+def make_seed_table(gamestate: object, name: str, simulation_seeds: list):
+    """Record book id, criteria and run_spin seed, enough to regenerate any book."""
+    file = open(name, "w", encoding="UTF-8")
+    sims = list(gamestate.library.keys())
+    sims.sort()
+    for sim in sims:
+        book = gamestate.library[sim]
+        file.write("{},{},{}\n".format(book["id"], book["criteria"], simulation_seeds[book["id"] - 1]))
+    file.close()
+
+
+def write_repeat_stats(gamestate: object, name: str):
+    """Write per-criteria attempt and rejection counters for a single thread."""
+    with open(name, "w", encoding="UTF-8") as f:
+        json.dump(gamestate.repeat_stats.to_dict(), f)
+
+
 def write_library_events(gamestate: object, library: list, gametype: str):
     """Write all unique events within a given mode - with one example application."""
     unique_event = []
@@ -124,18 +140,19 @@ def write_library_events(gamestate: object, library: list, gametype: str):
         f.write(json_object)
 
 
-def output_lookup_and_force_files(
-    threads: int,
-    batching_size: int,
-    game_id: str,
-    betmode: str,
-    gamestate: object,
-    num_sims: int = 1000000,
-    compress: bool = True,
-):
-    """Combine temporary lookup tables and force files into a single output."""
+def write_book_index_rows(index_out, frames: list, block_index: int = 0, frame_offset: int = 0) -> tuple:
+    """Append a chunk's frames to the books index csv, return the block index and frame offset after them."""
+    for frame_size, entries in frames:
+        for book_id, offset, length in entries:
+            index_out.write(f"{book_id},{block_index},{frame_offset},{frame_size},{offset},{length}\n")
+        block_index += 1
+        frame_offset += frame_size
+    return block_index, frame_offset
+
+
+def output_books(threads: int, num_repeats: int, game_id: str, betmode: str, gamestate: object, compress: bool):
+    """Combine temporary book chunks into the final books file."""
     print("Saving books for ", game_id, "in", betmode)
-    num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
     file_list = []
     for repeat_index in range(num_repeats):
         for thread in range(threads):
@@ -149,28 +166,24 @@ def output_lookup_and_force_files(
             "One or more temp book chunks are missing:\n"
             + "\n".join(missing_chunks)
             + "\nEnsure the simulation threads completed successfully. "
-            "You can set SIM_DEBUG_PROGRESS=1 to trace chunk creation."
+            "You can set SIM_TRACE_LEVEL=info to trace chunk creation."
         )
 
     if compress:
-        temp_book_output_path = os.path.join(gamestate.output_files.book_path, "temp_book_output.json")
-        with open(temp_book_output_path, "w", encoding="UTF-8") as outfile:
+        # Chunks are sequences of independent zstd frames, concatenating them is still a valid zstd stream
+        final_out = gamestate.output_files.get_final_book_name(betmode, True)
+        block_index, frame_offset = 0, 0
+        with open(final_out, "wb") as f_out, open(
+            gamestate.output_files.get_book_index_name(betmode), "w", encoding="UTF-8"
+        ) as index_out:
             for fname in file_list:
                 with open(fname, "rb") as infile:
-                    decompressed = zstd.ZstdDecompressor().decompress(infile.read())
-                    outfile.write(decompressed.decode("UTF-8"))
-                    if os.getenv("SIM_DEBUG_PROGRESS", "0") != "0":
-                        try:
-                            size_mb = os.path.getsize(fname) / (1024 * 1024)
-                        except OSError:
-                            size_mb = 0
-                        print(f"[sim-debug] merging chunk {fname} ({size_mb:.3f} MB)", flush=True)
-
-        final_out = gamestate.output_files.get_final_book_name(betmode, True)
-        with open(temp_book_output_path, "rb") as f_in, open(final_out, "wb") as f_out:
-            f_out.write(zstd.ZstdCompressor().compress(f_in.read()))
-
-        os.remove(temp_book_output_path)
+                    shutil.copyfileobj(infile, f_out)
+                with open(fname + ".index", "r", encoding="UTF-8") as infile:
+                    chunk_frames = json.load(infile)
+                block_index, frame_offset = write_book_index_rows(index_out, chunk_frames, block_index, frame_offset)
+                if gamestate.tracer.enabled:
+                    gamestate.tracer.event("chunk_merged", path=fname, size_bytes=os.path.getsize(fname))
     else:
         with open(
             gamestate.output_files.get_final_book_name(betmode, False),
@@ -192,6 +205,29 @@ def output_lookup_and_force_files(
                         else:
                             outfile.write("," + file_data[1::])  # dont write first '[', write last ']'
 
+
+def output_lookup_and_force_files(
+    threads: int,
+    batching_size: int,
+    game_id: str,
+    betmode: str,
+    gamestate: object,
+    num_sims: int = 1000000,
+    compress: bool = True,
+    store_books: bool = True,
+    num_repeats: int = None,
+):
+    """
+    Combine temporary lookup tables and force files into a single output.
+    num_repeats overrides the batch count derived from num_sims, for modes stopped early on convergence.
+    """
+    if num_repeats is None:
+        num_repeats = max(int(round(num_sims / threads / batching_size, 0)), 1)
+    if store_books:
+        output_books(threads, num_repeats, game_id, betmode, gamestate, compress)
+    else:
+        print("Skipping books for", game_id, "in", betmode, "(regenerate from seed table)")
+
     print("Saving force files for", game_id, "in", betmode)
     force_results_dict = {}
     file_list = []
@@ -226,6 +262,9 @@ def output_lookup_and_force_files(
     force_record_path = os.path.join(gamestate.output_files.force_path, f"force_record_{betmode}.json")
     with open(force_record_path, "w", encoding="UTF-8") as file:
         file.write(json_object_for_rob)
+    ForceIndex.from_force_records(force_results_dict_just_for_rob).save(
+        get_force_index_name(gamestate.output_files.force_path, betmode)
+    )
 
     forceResultKeys = get_force_options(force_results_dict)
     json_file_path = os.path.join(gamestate.output_files.force_path, "force.json")
@@ -260,6 +299,17 @@ def output_lookup_and_force_files(
             with open(filename, "r", encoding="UTF-8") as infile:
                 outfile.write(infile.read())
 
+    print("Saving repeat stats for", game_id, "in", betmode)
+    repeat_stats = RepeatStats()
+    for repeat_index in range(num_repeats):
+        for thread in range(threads):
+            with open(
+                gamestate.output_files.get_temp_repeat_stats_name(betmode, thread, repeat_index), "r", encoding="UTF-8"
+            ) as infile:
+                repeat_stats.merge(json.load(infile))
+    with open(gamestate.output_files.get_repeat_stats_name(betmode), "w", encoding="UTF-8") as outfile:
+        json.dump(repeat_stats.report(), outfile, indent=4)
+
     # Write _0 file if it does not exist
     if not (os.path.exists(gamestate.output_files.get_optimized_lookup_name(betmode))):
         shutil.copy(
@@ -275,18 +325,91 @@ def output_lookup_and_force_files(
             with open(filename, "r", encoding="UTF-8") as infile:
                 outfile.write(infile.read())
 
+    print("Saving win histograms for", game_id, "in", betmode)
+    histograms = merge_histograms(
+        [
+            gamestate.output_files.get_temp_histogram_name(betmode, thread, repeat_index)
+            for repeat_index in range(num_repeats)
+            for thread in range(threads)
+        ]
+    )
+    histograms.set_force_counts(force_results_dict)
+    histograms.set_lookup_table(gamestate.output_files.get_final_lookup_name(betmode))
+    histograms.save(gamestate.output_files.get_histogram_name(betmode))
+
+    print("Saving simulation summary for", game_id, "in", betmode)
+    summary = merge_summaries(
+        [
+            gamestate.output_files.get_temp_summary_name(betmode, thread, repeat_index)
+            for repeat_index in range(num_repeats)
+            for thread in range(threads)
+        ],
+        gamestate.output_files.get_summary_path(betmode),
+        get_criteria_names(gamestate, betmode),
+    )
+    write_optimizer_bundle(
+        get_optimizer_bundle_name(gamestate.output_files.lookup_path, betmode),
+        summary["id"],
+        summary["weight"],
+        summary["payout"],
+        force_results_dict_just_for_rob,
+    )
+
+    with open(gamestate.output_files.get_final_seed_name(betmode), "w", encoding="UTF-8") as outfile:
+        outfile.write(make_seed_table_header(gamestate.config))
+        for repeat_index in range(num_repeats):
+            for thread in range(threads):
+                with open(
+                    gamestate.output_files.get_temp_seed_name(betmode, thread, repeat_index), "r", encoding="UTF-8"
+                ) as infile:
+                    outfile.write(infile.read())
+
+
+def make_seed_table_header(config: object) -> str:
+    """'#'-prefixed JSON line recording the config.rng_settings a seed table was drawn with."""
+    settings = {name: getattr(config, name, None) for name in getattr(config, "rng_settings", [])}
+    return "# " + json.dumps(settings) + "\n"
+
+
+def write_book_frames(f, books, block_size: int) -> list:
+    """
+    Write books to an open binary file as independent zstd frames of block_size books.
+    Books may be any iterable, only one block is held in memory. Returns the '.index' frame list.
+    """
+    compressor = zstd.ZstdCompressor()
+    frames, entries, block, offset = [], [], [], 0
+    for book in books:
+        data = (json.dumps(book) + "\n").encode("UTF-8")
+        entries.append([book["id"], offset, len(data)])
+        block.append(data)
+        offset += len(data)
+        if len(entries) == block_size:
+            compressed_data = compressor.compress(b"".join(block))
+            f.write(compressed_data)
+            frames.append([len(compressed_data), entries])
+            entries, block, offset = [], [], 0
+    if entries:
+        compressed_data = compressor.compress(b"".join(block))
+        f.write(compressed_data)
+        frames.append([len(compressed_data), entries])
+    return frames
 
-def write_json(gamestate, filename: str):
-    """Convert the list of dictionaries to a JSON-encoded string and compress it in chunks."""
-    json_objects = [json.dumps(item) for item in gamestate.library.values()]
-    combined_data = "\n".join(json_objects) + "\n"
 
+def write_json(gamestate, filename: str):
+    """
+    Write library books as JSONL. Compressed books are written as independent zstd frames of
+    config.books_per_block books, with a '<filename>.index' sidecar holding, per frame,
+    [frame_size, [[book_id, offset, length], ...]] where offsets are into the decompressed frame.
+    """
     if filename.endswith(".zst"):
-        compressor = zstd.ZstdCompressor()
-        compressed_data = compressor.compress(combined_data.encode("UTF-8"))
+        block_size = max(int(getattr(gamestate.config, "books_per_block", 1000)), 1)
         with open(filename, "wb") as f:
-            f.write(compressed_data)
+            frames = write_book_frames(f, gamestate.library.values(), block_size)
+        with open(filename + ".index", "w", encoding="UTF-8") as f:
+            json.dump(frames, f)
     else:
+        json_objects = [json.dumps(item) for item in gamestate.library.values()]
+        combined_data = "\n".join(json_objects) + "\n"
         with open(filename, "w", encoding="UTF-8") as f:
             if not (gamestate.config.output_regular_json):
                 f.write(combined_data)
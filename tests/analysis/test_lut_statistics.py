@@ -0,0 +1,106 @@
+"""Test vectorized lookup table statistics against the per-row calculation they replaced."""
+
+from collections import defaultdict
+from math import sqrt
+import random
+import numpy as np
+import pytest
+from utils.analysis.lut_statistics import LookupTable
+
+
+def per_row_statistics(filename: str, bet_cost: float) -> dict:
+    """Statistics as the per-row verify_lookup_format/distribution_functions implementation computed them."""
+    dist, integer_payouts = defaultdict(float), []
+    weight_range, min_win, max_win = 0, None, None
+    with open(filename, "r", encoding="UTF-8") as f:
+        for line in f:
+            _, weight, payout = line.strip().split(",")
+            weight, payout = float(weight), float(payout)
+            integer_payouts.append(int(payout))
+            min_win = payout if min_win is None or payout < min_win else min_win
+            max_win = payout if max_win is None or payout > max_win else max_win
+            weight_range += weight
+            dist[payout / 100] += int(weight)
+    dist = dict(sorted(dist.items()))
+    dist = {x: y / sum(dist.values()) for x, y in dist.items()}
+
+    wins = list(dist.keys())
+    average_win = float(np.average(wins, weights=list(dist.values())))
+    variance = sum(((pay - average_win) ** 2) * prob for pay, prob in dist.items())
+    standard_dev = sqrt(variance) / bet_cost
+    skew = sum(((win - average_win) ** 3) * prob for win, prob in dist.items()) / standard_dev**3
+    kurtosis = sum(((win - average_win) ** 4) * prob for win, prob in dist.items()) / standard_dev**4 - 3
+
+    min_diff = None
+    for i in range(len(wins) - 2):
+        if min_diff is None or (min_diff > abs(wins[i + 1]) - wins[i]):
+            min_diff = abs(wins[i + 1]) - wins[i]
+
+    cumulative, median = 0, 0
+    for win, prob in dist.items():
+        cumulative += prob
+        if cumulative >= 0.5:
+            median = win
+            break
+
+    return {
+        "win_distribution": dist,
+        "weight_range": weight_range,
+        "min_win": min_win,
+        "max_win": max_win,
+        "min_diff": int(round(min_diff * 100)),
+        "average_wins": average_win,
+        "rtp": float(np.dot(wins, list(dist.values()))) / bet_cost,
+        "std": sqrt(variance),
+        "var": variance,
+        "m2m": average_win / median if median > 0 else 0,
+        "hr_max": 1.0 / dist[max(wins)],
+        "non_zero_hr": 1 / (1 - dist[0]) if min(wins) == 0 else 1,
+        "prob_nil": dist[0] if min(wins) == 0 else 0,
+        "prob_less_bet": sum(prob for win, prob in dist.items() if win < bet_cost),
+        "num_non_zero_payouts": len([p for p in integer_payouts if p > 0]),
+        "skew": skew,
+        "excess_kurtosis": kurtosis,
+    }
+
+
+def write_lut(path, payout_choices: list, num_rows: int, seed: int) -> str:
+    rand = random.Random(seed)
+    filename = str(path / "lookUpTable_test_0.csv")
+    with open(filename, "w", encoding="UTF-8") as f:
+        for book_id in range(1, num_rows + 1):
+            f.write(f"{book_id},{rand.randint(1, 10**9)},{rand.choice(payout_choices)}\n")
+    return filename
+
+
+@pytest.mark.parametrize(
+    "payout_choices, bet_cost",
+    [
+        ([0, 10, 20, 50, 100, 500, 1000, 5000, 100000], 1.0),
+        ([0, 0, 0, 10, 20, 30, 200, 2000, 500000], 2.0),
+        ([10, 20, 40, 100, 250, 1000], 1.0),
+    ],
+)
+def test_statistics_match_per_row(tmp_path, payout_choices, bet_cost):
+    "Every statistic has the per-row value and type"
+    filename = write_lut(tmp_path, payout_choices, 2000, seed=len(payout_choices))
+    lookup_table = LookupTable.from_csv(filename)
+    lookup_table.verify()
+    stats = lookup_table.statistics(bet_cost)
+    expected = per_row_statistics(filename, bet_cost)
+
+    assert stats["win_distribution"] == pytest.approx(expected.pop("win_distribution"))
+    for key, value in expected.items():
+        assert type(stats[key]) is type(value), key
+        assert stats[key] == pytest.approx(value, rel=1e-9), key
+
+
+def test_statistics_without_zero_payouts(tmp_path):
+    "Tables with no zero payout report prob_nil 0 and non_zero_hr 1"
+    filename = write_lut(tmp_path, [10, 20, 50], 100, seed=1)
+    lookup_table = LookupTable.from_csv(filename)
+    lookup_table.verify()
+    stats = lookup_table.statistics(1.0)
+    assert stats["prob_nil"] == 0 and type(stats["prob_nil"]) is int
+    assert stats["non_zero_hr"] == 1
+    assert stats["num_non_zero_payouts"] == 100
@@ -0,0 +1,74 @@
+"""Test block-compressed books written in chunks and read back by id or as one stream."""
+
+import json
+import random
+from types import SimpleNamespace
+import pytest
+from src.state.tracing import NULL_TRACER
+from src.write_data.write_data import output_books, write_json
+from utils.books_archive import BooksArchive
+from utils.books_stream import open_books
+
+BOOKS = [
+    {"id": i, "payoutMultiplier": 10 * (i % 7), "events": [{"index": 0, "type": "reveal", "board": [[i, i + 1]]}]}
+    for i in range(1, 501)
+]
+
+
+class ArchiveOutputFiles:
+    """Temp chunk, books and index names under one folder."""
+
+    def __init__(self, path):
+        self.path = path
+
+    def get_temp_multi_thread_name(self, betmode: str, thread_index: int, repeat_count: int, compress: bool) -> str:
+        return str(self.path / f"books_{betmode}_{thread_index}_{repeat_count}.jsonl.zst")
+
+    def get_final_book_name(self, betmode: str, compress: bool) -> str:
+        return str(self.path / f"books_{betmode}.jsonl.zst")
+
+    def get_book_index_name(self, betmode: str) -> str:
+        return str(self.path / f"books_{betmode}_index.csv")
+
+
+def write_archive(path, chunks: list, block_size: int) -> tuple:
+    """Write each chunk as a worker batch would, then concatenate them with output_books."""
+    output_files = ArchiveOutputFiles(path)
+    gamestate = SimpleNamespace(config=SimpleNamespace(books_per_block=block_size), tracer=NULL_TRACER)
+    gamestate.output_files = output_files
+    for repeat, chunk in enumerate(chunks):
+        gamestate.library = {book["id"]: book for book in chunk}
+        write_json(gamestate, output_files.get_temp_multi_thread_name("base", 0, repeat, True))
+    output_books(1, len(chunks), "test", "base", gamestate, True)
+    return output_files.get_final_book_name("base", True), output_files.get_book_index_name("base")
+
+
+@pytest.mark.parametrize("num_chunks, block_size", [(1, 1000), (4, 17), (7, 1), (3, 125)])
+def test_archive_round_trip(tmp_path, num_chunks, block_size):
+    "Random ids and the full stream read back as the source books"
+    step = -(-len(BOOKS) // num_chunks)
+    chunks = [BOOKS[start : start + step] for start in range(0, len(BOOKS), step)]
+    books_path, index_path = write_archive(tmp_path, chunks, block_size)
+
+    archive = BooksArchive(books_path, index_path)
+    assert len(archive) == len(BOOKS)
+    book_ids = random.Random(block_size).sample(range(1, len(BOOKS) + 1), 60)
+    assert archive.get_books(book_ids) == {book_id: BOOKS[book_id - 1] for book_id in book_ids}
+    assert archive.get_book(len(BOOKS)) == BOOKS[-1]
+    assert [book_id for book_id, _ in archive.iter_books([3, 2, 1])] == [1, 2, 3]
+
+    with open_books(books_path) as f:
+        assert [json.loads(line) for line in f] == BOOKS
+
+
+def test_archive_missing_ids(tmp_path):
+    "Ids outside the index raise KeyError"
+    archive = BooksArchive(*write_archive(tmp_path, [BOOKS[:10]], 4))
+    assert 10 in archive and 11 not in archive
+    with pytest.raises(KeyError):
+        archive.get_book(11)
+
+
+def test_archive_requires_index(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        BooksArchive(str(tmp_path / "books_base.jsonl.zst"), str(tmp_path / "books_base_index.csv"))
@@ -0,0 +1,81 @@
+"""Test streamed JSON object parsing of books files, including recovery from corrupt lines."""
+
+import json
+import pytest
+import zstandard as zstd
+from utils.books_stream import iter_json_objects, validate_books
+
+BOOKS = [
+    {"id": i, "payoutMultiplier": 10 * i, "events": [{"index": 0, "type": "reveal", "board": [[i]]}]}
+    for i in range(1, 41)
+]
+
+
+def split_chunks(text: str, size: int) -> list:
+    return [text[start : start + size] for start in range(0, len(text), size)]
+
+
+def jsonl(books: list) -> str:
+    return "".join(json.dumps(book) + "\n" for book in books)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64, 10**6])
+def test_objects_across_chunks(chunk_size):
+    "Objects split over any chunk boundaries are parsed whole"
+    results = list(iter_json_objects(split_chunks(jsonl(BOOKS), chunk_size)))
+    assert [obj for obj, _ in results] == BOOKS
+    assert all(error is None for _, error in results)
+
+
+@pytest.mark.parametrize("chunk_size", [5, 64, 10**6])
+def test_corrupt_lines_resync(chunk_size):
+    "Every corrupt line yields one error and parsing resumes at the next line opening an object"
+    text = jsonl(BOOKS[:10]) + '{"id": 11, "payoutMultiplier": ,\n' + jsonl(BOOKS[11:25])
+    text += "not json at all\n" + jsonl(BOOKS[25:])
+    results = list(iter_json_objects(split_chunks(text, chunk_size)))
+    errors = [error for obj, error in results if obj is None]
+    assert len(errors) == 2
+    assert [obj for obj, _ in results if obj is not None] == BOOKS[:10] + BOOKS[11:]
+
+
+def test_corrupt_line_does_not_buffer_rest():
+    "A corrupt line is reported as soon as the next object's line has been read"
+    text = '{"id": 0, "events": [\n' + jsonl(BOOKS)
+    chunks = split_chunks(text, 16)
+    consumed = []
+
+    def counted():
+        for chunk in chunks:
+            consumed.append(chunk)
+            yield chunk
+
+    for obj, error in iter_json_objects(counted()):
+        if error is not None:
+            break
+    assert len(consumed) < 5 < len(chunks)
+
+
+def test_truncated_final_object():
+    "An incomplete last object yields a single error"
+    text = jsonl(BOOKS[:3]) + json.dumps(BOOKS[3])[:-5]
+    results = list(iter_json_objects(split_chunks(text, 10)))
+    assert [obj for obj, _ in results[:3]] == BOOKS[:3]
+    assert len(results) == 4 and results[3][0] is None
+
+
+def test_single_line_array():
+    "Separators allow walking the objects of a single-line JSON array"
+    text = json.dumps(BOOKS)
+    results = list(iter_json_objects(split_chunks(text, 50), separators="[,]"))
+    assert [obj for obj, _ in results] == BOOKS
+
+
+def test_validate_compressed_books(tmp_path):
+    "Valid books are counted and corrupt lines reported from a zstd books file"
+    text = jsonl(BOOKS[:20]) + "{broken\n" + jsonl(BOOKS[20:])
+    path = tmp_path / "books_base.jsonl.zst"
+    path.write_bytes(zstd.ZstdCompressor().compress(text.encode("utf-8")))
+    output_path = tmp_path / "books_base.jsonl"
+    count, errors = validate_books(path, max_workers=1, output_path=output_path, batch_chars=200)
+    assert count == len(BOOKS) and len(errors) == 1
+    assert output_path.read_text(encoding="utf-8") == text
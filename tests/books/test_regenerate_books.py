@@ -0,0 +1,65 @@
+"""Test regenerating books from the seed table of a small 0_0_lines run."""
+
+import sys
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from utils.books_archive import BooksArchive
+from utils.regenerate_books import (
+    GAME_MODULES,
+    check_seed_settings,
+    iter_regenerated_books,
+    load_gamestate,
+    read_seed_table,
+)
+
+NUM_SIMS = 100
+
+
+@pytest.fixture(scope="module")
+def lines_gamestate(tmp_path_factory):
+    """0_0_lines gamestate after simulating and storing NUM_SIMS base books into a temporary library."""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path_factory.mktemp("games")))
+        gamestate = load_gamestate("0_0_lines")
+        create_books(gamestate, gamestate.config, {"base": NUM_SIMS}, 50, 2, True, False)
+        yield gamestate
+    for name in GAME_MODULES:
+        sys.modules.pop(name, None)
+
+
+def test_read_seed_table(lines_gamestate):
+    "Every simulated book has its criteria and seed, the settings header is skipped"
+    seed_table = read_seed_table(lines_gamestate, "base")
+    assert sorted(seed_table) == list(range(1, NUM_SIMS + 1))
+    criteria = {d._criteria for d in lines_gamestate.get_betmode("base").get_distributions()}
+    assert all(c in criteria and isinstance(seed, int) for c, seed in seed_table.values())
+    with open(lines_gamestate.output_files.get_final_seed_name("base"), "r", encoding="UTF-8") as f:
+        assert f.readline().startswith("#")
+
+
+def test_regenerated_books_match_stored(lines_gamestate):
+    "Books regenerated from the seed table are identical to the books create_books stored"
+    archive = BooksArchive(
+        lines_gamestate.output_files.get_final_book_name("base", True),
+        lines_gamestate.output_files.get_book_index_name("base"),
+    )
+    book_ids = [NUM_SIMS, 1, 37, 2, 64]
+    regenerated = list(iter_regenerated_books(lines_gamestate, "base", book_ids))
+    assert [book["id"] for book in regenerated] == book_ids
+    assert regenerated == [archive.get_book(book_id) for book_id in book_ids]
+
+
+def test_check_seed_settings_mismatch(lines_gamestate, monkeypatch):
+    "Changed rng settings are refused before any book is regenerated"
+    check_seed_settings(lines_gamestate, "base")
+    monkeypatch.setattr(lines_gamestate.config, "rng_type", "counter")
+    with pytest.raises(RuntimeError, match="rng_type"):
+        check_seed_settings(lines_gamestate, "base")
+    with pytest.raises(RuntimeError):
+        next(iter_regenerated_books(lines_gamestate, "base", [1]))
+
+
+def test_unknown_book_id(lines_gamestate):
+    with pytest.raises(KeyError):
+        next(iter_regenerated_books(lines_gamestate, "base", [NUM_SIMS + 1]))
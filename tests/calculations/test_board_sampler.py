@@ -0,0 +1,83 @@
+"""Test trigger-count board sampling against enumerating every stop combination of small reelstrips."""
+
+from fractions import Fraction
+from itertools import product
+import pytest
+from src.calculations.board_sampler import TriggerCountSampler
+
+NUM_ROWS = [2, 3, 2]
+REELSTRIP = [
+    ["S", "L1", "H1", "S", "L2"],
+    ["L1", "S", "L2", "H1"],
+    ["S", "S", "L1", "H2", "L2", "S"],
+]
+
+
+class ScriptedRng:
+    """Returns the scripted draws in order (0 once they run out) and records every range asked for."""
+
+    def __init__(self, draws: list):
+        self.draws = draws
+        self.ranges = []
+
+    def randrange(self, n: int) -> int:
+        self.ranges.append(n)
+        return self.draws[len(self.ranges) - 1] if len(self.ranges) <= len(self.draws) else 0
+
+
+def count_triggers(stops: tuple) -> int:
+    return sum(
+        REELSTRIP[reel][(stop + row) % len(REELSTRIP[reel])] == "S"
+        for reel, stop in enumerate(stops)
+        for row in range(NUM_ROWS[reel])
+    )
+
+
+def sample_probabilities(sampler: TriggerCountSampler) -> dict:
+    """Exact probability of every board sample() can return, walking every sequence of random draws."""
+    probabilities = {}
+    pending = [[]]
+    while pending:
+        draws = pending.pop()
+        rng = ScriptedRng(draws)
+        stops = tuple(sampler.sample(rng))
+        if len(draws) < len(rng.ranges):
+            pending.extend(draws + [draw] for draw in range(rng.ranges[len(draws)]))
+            continue
+        probability = Fraction(1)
+        for n in rng.ranges:
+            probability /= n
+        probabilities[stops] = probabilities.get(stops, 0) + probability
+    return probabilities
+
+
+@pytest.mark.parametrize("max_count", [0, 1, 2, 3])
+def test_sample_is_uniform_over_allowed_boards(max_count):
+    "Every board with at most max_count triggers is drawn with equal probability, no other board is drawn"
+    sampler = TriggerCountSampler(REELSTRIP, {"S"}, NUM_ROWS, max_count)
+    all_boards = list(product(*(range(len(strip)) for strip in REELSTRIP)))
+    allowed = {stops for stops in all_boards if count_triggers(stops) <= max_count}
+
+    assert sampler.total == len(all_boards)
+    assert sampler.ways[0][max_count] == len(allowed)
+    assert sampler.acceptance == len(allowed) / len(all_boards)
+    assert sample_probabilities(sampler) == {stops: Fraction(1, len(allowed)) for stops in allowed}
+
+
+def test_ways_count_combinations():
+    "ways[reel][budget] counts the stop combinations of reels reel.. with at most budget triggers"
+    max_count = 3
+    sampler = TriggerCountSampler(REELSTRIP, {"S"}, NUM_ROWS, max_count)
+    for reel in range(len(REELSTRIP)):
+        tails = list(product(*(range(len(strip)) for strip in REELSTRIP[reel:])))
+        for budget in range(max_count + 1):
+            expected = sum(count_triggers((0,) * reel + tail) - count_triggers((0,) * reel) <= budget for tail in tails)
+            assert sampler.ways[reel][budget] == expected
+
+
+def test_no_allowed_board():
+    "Strips which always trigger cannot be sampled"
+    sampler = TriggerCountSampler([["S", "S"], ["S"], ["S", "S", "S"]], {"S"}, NUM_ROWS, 2)
+    assert sampler.acceptance == 0
+    with pytest.raises(RuntimeError):
+        sampler.sample(ScriptedRng([]))
@@ -0,0 +1,117 @@
+"""Test per-simulation random number generators."""
+
+import random
+import pytest
+from src.calculations.rng import CounterRandom, MersenneRandom, make_rng, mix_64, MASK_64, GOLDEN_GAMMA
+
+
+def test_mersenne_matches_global_random():
+    "MersenneRandom draws are identical to seeding the global random module"
+    rng = make_rng("mersenne", 7)
+    random.seed(7)
+    assert [rng.random() for _ in range(20)] == [random.random() for _ in range(20)]
+    assert rng.reel_stops([30, 40, 50]) == [random.randrange(n) for n in [30, 40, 50]]
+
+
+def test_counter_is_deterministic():
+    "Equal seeds give equal streams, different seeds differ"
+    assert [make_rng("counter", 3).random() for _ in range(5)] == [make_rng("counter", 3).random() for _ in range(5)]
+    a, b = make_rng("counter", 3), make_rng("counter", 4)
+    assert [a.next_64() for _ in range(5)] != [b.next_64() for _ in range(5)]
+
+
+def test_counter_output_formula():
+    "Output i is mix_64(key + i * GOLDEN_GAMMA)"
+    rng = CounterRandom(11)
+    expected = [mix_64((rng.key + i * GOLDEN_GAMMA) & MASK_64) for i in range(10)]
+    assert [rng.next_64() for _ in range(10)] == expected
+
+
+def test_counter_jump_matches_drawing():
+    "jump(n) lands on the same stream position as n draws"
+    drawn, jumped = CounterRandom(5), CounterRandom(5)
+    for _ in range(1000):
+        drawn.next_64()
+    jumped.jump(1000)
+    assert [drawn.next_64() for _ in range(10)] == [jumped.next_64() for _ in range(10)]
+
+
+def test_counter_starts_at_given_position():
+    "The counter argument positions the stream like jump() after seeding"
+    jumped = CounterRandom(5)
+    jumped.jump(40)
+    started = CounterRandom(5, counter=40)
+    assert started.counter == 40
+    assert [started.next_64() for _ in range(5)] == [jumped.next_64() for _ in range(5)]
+
+
+def test_counter_state_roundtrip():
+    "setstate restores the exact stream position"
+    rng = CounterRandom(9)
+    rng.random()
+    state = rng.getstate()
+    first = [rng.randrange(100) for _ in range(10)]
+    rng.setstate(state)
+    assert [rng.randrange(100) for _ in range(10)] == first
+
+
+def test_substreams_are_independent_of_parent():
+    "Substreams depend only on the key and index, and drawing from them leaves the parent untouched"
+    parent = CounterRandom(21)
+    before = [parent.substream(i).next_64() for i in range(3)]
+    parent.jump(12345)
+    assert [parent.substream(i).next_64() for i in range(3)] == before
+    assert len(set(before)) == 3
+
+    counter = parent.counter
+    child = parent.substream(0)
+    child.jump(50)
+    child.random()
+    assert parent.counter == counter
+
+
+def test_counter_draws_are_in_range():
+    "random() stays in [0, 1) and getrandbits returns exactly k bits"
+    rng = CounterRandom(1)
+    assert all(0.0 <= rng.random() < 1.0 for _ in range(1000))
+    assert all(rng.getrandbits(k) < (1 << k) for k in [1, 7, 64, 65, 130] for _ in range(50))
+    with pytest.raises(ValueError):
+        rng.getrandbits(-1)
+
+
+def test_counter_uniformity():
+    "reel_stops are close to uniform over a reel"
+    rng = CounterRandom(2)
+    counts = [0] * 10
+    for _ in range(20000):
+        counts[rng.reel_stops([10])[0]] += 1
+    chi2 = sum((c - 2000) ** 2 / 2000 for c in counts)
+    assert chi2 < 30
+
+
+def test_draw_outcomes_follows_weights():
+    "Bulk draws respect the weight table"
+    rng = MersenneRandom(3)
+    draws = rng.draw_outcomes({"a": 1, "b": 0, "c": 3}, k=8000)
+    assert "b" not in draws
+    assert 0.2 < draws.count("a") / len(draws) < 0.3
+
+
+def test_draw_outcomes_skips_zero_weights():
+    "A zero-weight outcome is never drawn, even when random() returns 0.0"
+    rng = MersenneRandom(3)
+    rng.random = lambda: 0.0
+    assert rng.draw_outcomes({"a": 0, "b": 2, "c": 0, "d": 1}, k=3) == ["b"] * 3
+
+
+def test_draw_outcomes_matches_choices():
+    "Bulk draws are draw-for-draw identical to random.choices"
+    weights = {"a": 1, "b": 0, "c": 3, "d": 2}
+    rng, reference = MersenneRandom(8), random.Random(8)
+    expected = [reference.choices(list(weights), list(weights.values()))[0] for _ in range(200)]
+    assert rng.draw_outcomes(weights, k=200) == expected
+
+
+def test_unknown_rng_type():
+    with pytest.raises(RuntimeError):
+        make_rng("xorshift", 1)
@@ -0,0 +1,81 @@
+"""Test bitmask sticky positions against a plain dict of positions."""
+
+import random
+import pytest
+from src.calculations.sticky import StickyPositions, iter_bits
+
+NUM_ROWS = [3, 4, 5, 4, 3]
+
+
+def random_board(rand: random.Random) -> list:
+    return [[rand.choice(["W", "H1", "L1", "S"]) for _ in range(rows)] for rows in NUM_ROWS]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_matches_dict_of_positions(seed):
+    "Membership, insertion order, values and events agree with an ordered dict of positions"
+    rand = random.Random(seed)
+    sticky = StickyPositions(NUM_ROWS, ("multiplier", "prize"))
+    reference = {}
+    for step in range(200):
+        if step % 50 == 49:
+            sticky.clear()
+            reference = {}
+            assert not sticky and len(sticky) == 0
+            continue
+        reel = rand.randrange(len(NUM_ROWS))
+        row = rand.randrange(NUM_ROWS[reel])
+        multiplier, prize = rand.choice([2, 3, 5]), rand.choice([0.5, 1.0, 2.5])
+        added = sticky.add(reel, row, multiplier=multiplier, prize=prize)
+        assert added == ((reel, row) not in reference)
+        reference.setdefault((reel, row), (multiplier, prize))
+
+        assert len(sticky) == len(reference) and bool(sticky)
+        assert all(((r, w) in sticky) == ((r, w) in reference) for r in range(5) for w in range(NUM_ROWS[r]))
+        assert list(sticky.items("multiplier", "prize")) == [(r, w, *v) for (r, w), v in reference.items()]
+        assert sticky.get(reel, row, "prize") == reference[(reel, row)][1]
+        events = sticky.to_events("multiplier", "prize", row_offset=1, scale={"prize": 100})
+        assert events == [
+            {"reel": r, "row": w + 1, "multiplier": m, "prize": int(p * 100)}
+            for (r, w), (m, p) in sorted(reference.items())
+        ]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_new_positions(seed):
+    "new_positions lists matching positions which are not yet sticky, in reel then row order"
+    rand = random.Random(seed)
+    sticky = StickyPositions(NUM_ROWS, ("multiplier",))
+    for _ in range(4):
+        board = random_board(rand)
+        expected = [
+            (reel, row)
+            for reel, symbols in enumerate(board)
+            for row, symbol in enumerate(symbols)
+            if symbol == "W" and (reel, row) not in sticky
+        ]
+        new = sticky.new_positions(board, lambda symbol: symbol == "W")
+        assert new == expected
+        for reel, row in new:
+            sticky.add(reel, row, multiplier=2)
+
+
+def test_board_mask_bits():
+    "Bits of a board mask map back to their positions"
+    sticky = StickyPositions(NUM_ROWS)
+    board = [["W"] * rows for rows in NUM_ROWS]
+    positions = list(iter_bits(sticky.board_mask(board, lambda symbol: symbol == "W"), sticky.stride))
+    assert positions == [(reel, row) for reel, rows in enumerate(NUM_ROWS) for row in range(rows)]
+    assert all(sticky.position(sticky.bit(reel, row)) == (reel, row) for reel, row in positions)
+
+
+def test_clear_resets_values():
+    "Positions added again after clear() without a field read 0, not the value from before clear()"
+    sticky = StickyPositions(NUM_ROWS, ("multiplier", "prize"))
+    sticky.add(1, 2, multiplier=5, prize=2.5)
+    sticky.add(3, 0, multiplier=3, prize=1.0)
+    sticky.clear()
+    sticky.add(1, 2, multiplier=2)
+    assert sticky.get(1, 2, "prize") == 0 and sticky.get(3, 0, "multiplier") == 0
+    assert list(sticky.items("multiplier", "prize")) == [(1, 2, 2, 0)]
+    assert sticky.to_events("multiplier", "prize") == [{"reel": 1, "row": 2, "multiplier": 2, "prize": 0}]
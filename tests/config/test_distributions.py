@@ -0,0 +1,188 @@
+"""Test proposal conditions for importance-sampled criteria."""
+
+import importlib
+import os
+import random
+import sys
+import pytest
+from tests.win_calculations.game_test_config import GamestateTest
+from src.config.betmode import BetMode
+from src.config.distributions import Distribution
+from src.config.paths import PATH_TO_GAMES
+from src.calculations.statistics import get_random_outcome
+from src.state.repeat_stats import RepeatStats
+from src.wins.win_manager import WinManager
+
+STRIP_PAYOUTS = {"BR0": 0.0, "BR1": 2.0, "WCAP": 5000.0}
+WINCAP_CONDITIONS = {"reel_weights": {"basegame": {"BR0": 1000, "BR1": 100, "WCAP": 1}}, "mult_values": {2: 10, 5: 1}}
+
+
+def wincap_distribution(proposal_conditions=None, proposal_after=0):
+    return Distribution(
+        criteria="wincap",
+        quota=1,
+        win_criteria=5000.0,
+        conditions={key: dict(value) for key, value in WINCAP_CONDITIONS.items()},
+        proposal_conditions=proposal_conditions,
+        proposal_after=proposal_after,
+    )
+
+
+class GameProposalConfig:
+    """Single betmode with a rarely hit wincap criteria."""
+
+    def __init__(self, distribution):
+        self.basegame_type = "basegame"
+        self.bet_modes = [
+            BetMode(
+                name="base",
+                cost=1.0,
+                rtp=0.97,
+                max_win=5000.0,
+                auto_close_disabled=False,
+                is_feature=True,
+                is_buybonus=False,
+                distributions=[distribution],
+            )
+        ]
+
+
+def create_proposal_gamestate(distribution, gamestate_class=GamestateTest):
+    """Boilerplate gamestate for testing."""
+    gamestate = gamestate_class(GameProposalConfig(distribution))
+    gamestate.betmode = "base"
+    gamestate.criteria = "wincap"
+    gamestate.repeat_stats = RepeatStats()
+    gamestate.triggered_freegame = False
+    gamestate.sim = 0
+    gamestate.win_manager = WinManager("basegame", "freegame", 5000.0)
+    return gamestate
+
+
+def simulate_books(gamestate, num_sims, seed=1):
+    """Draw a reelstrip per attempt until the criteria's win is hit, returning the accepted strips and attempts."""
+    rng = random.Random(seed)
+    books, attempts = [], 0
+    for sim in range(num_sims):
+        gamestate.sim = sim
+        gamestate.repeat_count = 0
+        gamestate.repeat = True
+        while gamestate.repeat:
+            gamestate.repeat = False
+            reel_weights = gamestate.get_current_distribution_conditions()["reel_weights"]["basegame"]
+            strip = get_random_outcome(reel_weights, rng=rng)
+            gamestate.final_win = STRIP_PAYOUTS[strip]
+            gamestate.win_manager.running_bet_win = gamestate.final_win
+            gamestate.check_repeat()
+            attempts += 1
+        books.append({"id": sim + 1, "strip": strip, "payoutMultiplier": gamestate.final_win})
+    return books, attempts
+
+
+def test_proposal_used_after_rejections():
+    "Conditions switch to the proposal once 'proposal_after' attempts have been rejected"
+    proposal = {"reel_weights": {"basegame": {"WCAP": 1, "BR1": 1}}}
+    distribution = wincap_distribution(proposal, proposal_after=3)
+    for attempt in range(3):
+        assert distribution.get_conditions(attempt)["reel_weights"]["basegame"] == {"BR0": 1000, "BR1": 100, "WCAP": 1}
+    assert distribution.get_conditions(3)["reel_weights"]["basegame"] == {"WCAP": 1, "BR1": 1}
+    assert distribution.get_conditions(3)["mult_values"] == {2: 10, 5: 1}
+
+
+def test_proposal_merges_per_gametype():
+    "Nested proposals replace only the gametypes they name, flat weight tables are replaced whole"
+    distribution = Distribution(
+        criteria="wincap",
+        quota=1,
+        conditions={
+            "reel_weights": {"basegame": {"BR0": 1}, "freegame": {"FR0": 1, "WCAP": 1}},
+            "mult_values": {2: 10, 5: 1},
+        },
+        proposal_conditions={"reel_weights": {"freegame": {"WCAP": 1}}, "mult_values": {5: 1}},
+    )
+    conditions = distribution.get_conditions(0)
+    assert conditions["reel_weights"] == {"basegame": {"BR0": 1}, "freegame": {"WCAP": 1}}
+    assert conditions["mult_values"] == {5: 1}
+
+
+@pytest.mark.parametrize(
+    "proposal",
+    [
+        {"reel_weights": {"basegame": {"NEW": 1}}},
+        {"reel_weights": {"freegame": {"BR0": 1}}},
+        {"reel_weights": {"basegame": {"BR0": 0}}},
+        {"reel_weights": {"basegame": {"BR0": -1, "WCAP": 2}}},
+        {"scatter_triggers": {3: 1}},
+    ],
+)
+def test_proposal_rejects_unsupported_outcomes(proposal):
+    "Proposals may only re-weight outcomes already present in the conditions"
+    with pytest.raises(AssertionError):
+        wincap_distribution(proposal)
+
+
+def test_proposal_books_meet_win_criteria():
+    "Proposal-weighted simulations only accept books with the criteria's win, in far fewer attempts"
+    num_sims = 20
+    plain_books, plain_attempts = simulate_books(create_proposal_gamestate(wincap_distribution()), num_sims)
+    proposal = {"reel_weights": {"basegame": {"BR0": 1, "BR1": 1, "WCAP": 2}}}
+    proposal_books, proposal_attempts = simulate_books(
+        create_proposal_gamestate(wincap_distribution(proposal, proposal_after=5)), num_sims
+    )
+
+    for books in [plain_books, proposal_books]:
+        assert len(books) == num_sims
+        assert all(book["strip"] == "WCAP" and book["payoutMultiplier"] == 5000.0 for book in books)
+    assert proposal_attempts < plain_attempts / 10
+
+
+def test_proposal_rejections_are_recorded():
+    "Rejected attempts are counted against the criteria whether or not the proposal is active"
+    gamestate = create_proposal_gamestate(wincap_distribution({"reel_weights": {"basegame": {"BR1": 1, "WCAP": 1}}}))
+    _, attempts = simulate_books(gamestate, 5)
+    stats = gamestate.repeat_stats.to_dict()["wincap"]
+    assert stats["attempts"] == attempts
+    assert stats["rejections"].get("win_criteria", 0) == attempts - 5
+
+
+@pytest.fixture
+def cluster_gamestate_class(monkeypatch):
+    """Test gamestate using the 0_0_cluster game's check_repeat override."""
+    game_modules = ["game_override", "game_executables", "game_calculations", "game_events"]
+    monkeypatch.syspath_prepend(os.path.join(PATH_TO_GAMES, "0_0_cluster"))
+    for name in game_modules:
+        monkeypatch.delitem(sys.modules, name, raising=False)
+    check_repeat = importlib.import_module("game_override").GameStateOverride.check_repeat
+    yield type("ClusterGamestateTest", (GamestateTest,), {"check_repeat": check_repeat})
+    for name in game_modules:
+        sys.modules.pop(name, None)
+
+
+def test_proposal_used_by_overriding_check_repeat(cluster_gamestate_class):
+    "Games overriding check_repeat count attempts, so their conditions switch to the proposal too"
+    proposal = {"reel_weights": {"basegame": {"BR1": 1, "WCAP": 1}}}
+    gamestate = create_proposal_gamestate(wincap_distribution(proposal, proposal_after=3), cluster_gamestate_class)
+    gamestate.repeat_count = 0
+    for attempt in range(3):
+        assert gamestate.get_current_distribution_conditions()["reel_weights"]["basegame"]["BR0"] == 1000
+        gamestate.repeat = False
+        gamestate.final_win = gamestate.win_manager.running_bet_win = 0.0
+        gamestate.check_repeat()
+        assert gamestate.repeat and gamestate.repeat_count == attempt + 1
+    assert gamestate.get_current_distribution_conditions()["reel_weights"]["basegame"] == {"BR1": 1, "WCAP": 1}
+
+    gamestate.check_repeat()
+    stats = gamestate.repeat_stats.to_dict()["wincap"]
+    assert stats["attempts"] == 4
+    assert stats["rejections"] == {"win_criteria": 3, "zero_win": 3, "game_specific": 1}
+
+
+def test_overriding_check_repeat_books_meet_win_criteria(cluster_gamestate_class):
+    "Proposal-weighted books from an overriding check_repeat still hit the criteria's win"
+    proposal = {"reel_weights": {"basegame": {"BR0": 1, "BR1": 1, "WCAP": 2}}}
+    gamestate = create_proposal_gamestate(wincap_distribution(proposal, proposal_after=5), cluster_gamestate_class)
+    books, attempts = simulate_books(gamestate, 20)
+    assert all(book["strip"] == "WCAP" for book in books)
+    assert gamestate.repeat_stats.to_dict()["wincap"]["attempts"] == attempts
+    _, plain_attempts = simulate_books(create_proposal_gamestate(wincap_distribution()), 20)
+    assert attempts < plain_attempts / 10
@@ -0,0 +1,113 @@
+"""Test copy-on-write symbol removal on the 0_0_space_dummies bonus reelstrips."""
+
+import copy
+import importlib.util
+import os
+import random
+import pytest
+from src.config.paths import PATH_TO_GAMES
+
+# game modules are imported flat from their game folder, load this one without putting the folder on sys.path
+spec = importlib.util.spec_from_file_location(
+    "space_dummies_bonus_reels", os.path.join(PATH_TO_GAMES, "0_0_space_dummies", "bonus_reels.py")
+)
+bonus_reels = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(bonus_reels)
+BonusReelLibrary = bonus_reels.BonusReelLibrary
+
+SYMBOLS = ["H1", "H2", "L1", "L2", "L3", "W", "scatter"]
+LOWS = ["L1", "L2", "L3"]
+
+
+def make_reels(seed: int, num_reels: int = 5, length: int = 60) -> dict:
+    rand = random.Random(seed)
+    reels = [[rand.choice(SYMBOLS) for _ in range(length)] for _ in range(num_reels)]
+    reels[2] = ["scatter"] * length  # a reel only the fallback can refill
+    return {"BR0": reels}
+
+
+def stops_of(strip) -> dict:
+    stops = {}
+    for stop, code in enumerate(strip):
+        stops.setdefault(code, []).append(stop)
+    return stops
+
+
+def legacy_remove(reels: list, name: str, rng, fallback: list = None) -> bool:
+    """Symbol removal on list-of-names strips as the game did before the coded reels (filter, backfill, shuffle)."""
+    changed = False
+    for reel, strip in enumerate(reels):
+        if name not in strip:
+            continue
+        filtered = [sym for sym in strip if sym != name]
+        if not filtered:
+            if not fallback:
+                raise RuntimeError(f"Symbol removal '{name}' exhausted reel {reel}.")
+            reels[reel] = [rng.choice(fallback) for _ in strip]
+        else:
+            new_strip = filtered + [rng.choice(filtered) for _ in range(len(strip) - len(filtered))]
+            rng.shuffle(new_strip)
+            reels[reel] = new_strip
+        changed = True
+    return changed
+
+
+REMOVALS = [("scatter", LOWS), ("H1", None), ("W", None), ("H1", None), ("L2", None)]
+
+
+def test_substitute_keeps_stops_consistent():
+    "After each in-place removal the stop index matches the reels and removed symbols are gone"
+    library = BonusReelLibrary(make_reels(1))
+    session = library.session("BR0", legacy_shuffle=False)
+    rng = random.Random(4)
+    removed = set()
+    for name, fallback in REMOVALS:
+        before = [list(session[reel]) for reel in range(len(session))]
+        session.remove_symbol(name, rng, fallback)
+        removed.add(name)
+        for reel in range(len(session)):
+            assert {c: sorted(p) for c, p in session.stops[reel].items()} == stops_of(session.reels[reel])
+            names = session[reel]
+            assert not removed & set(names)
+            assert len(names) == len(before[reel])
+            # only stops which held the removed symbol change, and they take symbols the reel still had
+            changed = [stop for stop, sym in enumerate(before[reel]) if sym != names[stop]]
+            assert all(before[reel][stop] == name for stop in changed)
+            if name in before[reel] and set(before[reel]) != {name}:
+                assert {names[stop] for stop in changed} <= set(before[reel]) - {name}
+    assert set(session[2]) <= set(LOWS)
+
+
+def test_substitute_exhausted_reel_without_fallback():
+    library = BonusReelLibrary(make_reels(2))
+    with pytest.raises(RuntimeError, match="exhausted"):
+        library.session("BR0", legacy_shuffle=False).remove_symbol("scatter", random.Random(1))
+
+
+@pytest.mark.parametrize("legacy_shuffle", [False, True])
+def test_library_strips_are_never_mutated(legacy_shuffle):
+    "Removals only change the session's own reels, later sessions start from the untouched strips"
+    library = BonusReelLibrary(make_reels(3))
+    original = copy.deepcopy(library.get("BR0"))
+    rng = random.Random(5)
+    session = library.session("BR0", legacy_shuffle)
+    for name, fallback in REMOVALS:
+        session.remove_symbol(name, rng, fallback)
+        assert library.get("BR0") == original
+
+    fresh = library.session("BR0", legacy_shuffle)
+    assert [fresh[reel] for reel in range(len(fresh))] == make_reels(3)["BR0"]
+    assert all(fresh.reels[reel] is library.get("BR0")[0][reel] for reel in range(len(fresh)))
+
+
+@pytest.mark.parametrize("seed", [6, 7, 8])
+def test_compat_matches_legacy_draws(seed):
+    "With legacy_shuffle every removal reproduces the old strips and leaves the rng in the same state"
+    reels = make_reels(seed)
+    session = BonusReelLibrary(reels).session("BR0", legacy_shuffle=True)
+    legacy_reels = copy.deepcopy(reels["BR0"])
+    rng, legacy_rng = random.Random(seed), random.Random(seed)
+    for name, fallback in REMOVALS + [("missing", None)]:
+        assert session.remove_symbol(name, rng, fallback) == legacy_remove(legacy_reels, name, legacy_rng, fallback)
+        assert [session[reel] for reel in range(len(session))] == legacy_reels
+        assert rng.getstate() == legacy_rng.getstate()
@@ -0,0 +1,137 @@
+"""Test vectorized bonus to base lookup merging against the per-row single-key merge it replaced."""
+
+import os
+import random
+import numpy as np
+import pytest
+from utils.merge_luts.lookup_properties import (
+    LookupProperties,
+    align_swap_rows,
+    solve_target_hit_rates,
+    calculate_new_freegame_probabilities,
+    override_optimized_lookup,
+)
+
+GAME_ID = "0_0_merge_test"
+PAYOUTS = [0, 10, 50, 120, 400, 2500, 10000]
+
+
+def write_mode(library: str, mode: str, criteria: list, payouts: list, rand: random.Random) -> None:
+    with open(os.path.join(library, "publish_files", f"lookUpTable_{mode}_0.csv"), "w", encoding="UTF-8") as f:
+        for idx, payout in enumerate(payouts, start=1):
+            f.write(f"{idx},{rand.randint(1, 2**36)},{payout}\n")
+    with open(os.path.join(library, "lookup_tables", f"lookUpTableSegmented_{mode}.csv"), "w", encoding="UTF-8") as f:
+        for idx, (criterion, payout) in enumerate(zip(criteria, payouts), start=1):
+            f.write(f"{idx},{criterion},{payout / 100},0.0\n")
+
+
+@pytest.fixture
+def game_tables(tmp_path, monkeypatch):
+    """Base and bonus tables whose 'freegame' and 'wincap' rows have identical payouts, in table order."""
+    rand = random.Random(21)
+    library = os.path.join(tmp_path, "games", GAME_ID, "library")
+    os.makedirs(os.path.join(library, "publish_files"))
+    os.makedirs(os.path.join(library, "lookup_tables"))
+
+    base_criteria = [rand.choice(["basegame", "0", "freegame", "freegame", "wincap"]) for _ in range(600)]
+    swapped = {key: [rand.choice(PAYOUTS[1:]) for c in base_criteria if c == key] for key in ["freegame", "wincap"]}
+    base_payouts, taken = [], {"freegame": 0, "wincap": 0}
+    for criterion in base_criteria:
+        if criterion in swapped:
+            base_payouts.append(swapped[criterion][taken[criterion]])
+            taken[criterion] += 1
+        else:
+            base_payouts.append(rand.choice(PAYOUTS[:3]))
+    write_mode(library, "base", base_criteria, base_payouts, rand)
+
+    bonus_criteria = ["freegame"] * len(swapped["freegame"]) + ["wincap"] * len(swapped["wincap"])
+    write_mode(library, "bonus", bonus_criteria, swapped["freegame"] + swapped["wincap"], rand)
+    monkeypatch.chdir(tmp_path)
+    return LookupProperties(GAME_ID, "base"), LookupProperties(GAME_ID, "bonus")
+
+
+def read_rows(lookup_path: str, segment_path: str) -> tuple:
+    payouts, payouts_ints, weights, criteria = [], [], [], []
+    with open(lookup_path, "r", encoding="utf-8") as f:
+        for line in f:
+            _, w, p = line.strip().split(",")
+            payouts.append(round(int(p) / 100, 3))
+            payouts_ints.append(int(p))
+            weights.append(int(w))
+    with open(segment_path, "r", encoding="utf-8") as f:
+        for line in f:
+            criteria.append(line.strip().split(",")[1])
+    return payouts, payouts_ints, weights, criteria
+
+
+def per_row_merge(base: LookupProperties, bonus: LookupProperties, freegame_key: str, mode_cost: float) -> tuple:
+    """Single-key merge as the per-row LookupProperties/calculate_new_freegame_probabilities computed it."""
+    base_payouts, _, base_weights, base_criteria = read_rows(base.lookup_path, base.segment_path)
+    bonus_payouts, _, bonus_weights, bonus_criteria = read_rows(bonus.lookup_path, bonus.segment_path)
+    base_total, bonus_total = sum(base_weights), sum(bonus_weights)
+
+    def criteria_av_win(payouts, weights, criteria, total, key):
+        subset_weights = np.array([w for w, c in zip(weights, criteria) if c == key])
+        subset_payouts = np.array([p for p, c in zip(payouts, criteria) if c == key])
+        return float(subset_payouts @ subset_weights) / total
+
+    fg_contribution_in_base = criteria_av_win(base_payouts, base_weights, base_criteria, base_total, freegame_key)
+    fg_contribution_in_base /= mode_cost
+    Efg = criteria_av_win(bonus_payouts, bonus_weights, bonus_criteria, bonus_total, "freegame")
+    target_hr = fg_contribution_in_base / Efg
+
+    bonus_key_weights = [w for w, c in zip(bonus_weights, bonus_criteria) if c == freegame_key]
+    new_base_weights, fg_rtp_contribution, fg_act_hr, counter = [], 0.0, 0.0, 0
+    for idx, bp in enumerate(base_payouts):
+        if base_criteria[idx] == freegame_key:
+            w = target_hr * (bonus_key_weights[counter] / bonus_total)
+            fg_rtp_contribution += bp * w
+            fg_act_hr += w
+            new_base_weights.append(int(base_total * w))
+            counter += 1
+        else:
+            new_base_weights.append(base_weights[idx])
+    return new_base_weights, fg_rtp_contribution, fg_act_hr, target_hr
+
+
+def vectorized_merge(base: LookupProperties, bonus: LookupProperties, swap_keys: list, mode_cost: float) -> tuple:
+    swap_rows = align_swap_rows(base, bonus, swap_keys)
+    target_hrs, _, _ = solve_target_hit_rates(base, bonus, swap_rows, len(swap_keys), mode_cost)
+    new_weights, fg_rtp, fg_hr, _ = calculate_new_freegame_probabilities(base, bonus, target_hrs, swap_rows)
+    return new_weights, fg_rtp, fg_hr, target_hrs
+
+
+@pytest.mark.parametrize("mode_cost", [1.0, 2.5])
+def test_single_key_matches_per_row(game_tables, mode_cost):
+    "Single-key weights are identical to the per-row merge"
+    base, bonus = game_tables
+    new_weights, fg_rtp, fg_hr, target_hrs = vectorized_merge(base, bonus, ["freegame"], mode_cost)
+    expected_weights, expected_rtp, expected_hr, expected_target = per_row_merge(base, bonus, "freegame", mode_cost)
+
+    assert new_weights.tolist() == expected_weights
+    assert target_hrs[0] == pytest.approx(expected_target, rel=1e-12)
+    assert fg_rtp[0] == pytest.approx(expected_rtp, rel=1e-12)
+    assert fg_hr[0] == pytest.approx(expected_hr, rel=1e-12)
+
+
+def test_multiple_keys_match_single_keys(game_tables):
+    "Merging two keys at once sets each key's rows as merging it alone does"
+    base, bonus = game_tables
+    both, _, _, _ = vectorized_merge(base, bonus, ["freegame", "wincap"], 1.0)
+    for key in ["freegame", "wincap"]:
+        alone, _, _, _ = vectorized_merge(base, bonus, [key], 1.0)
+        rows = base.criteria_mask(key)
+        assert both[rows].tolist() == alone[rows].tolist()
+    untouched = ~(base.criteria_mask("freegame") | base.criteria_mask("wincap"))
+    assert both[untouched].tolist() == base.weights_ints[untouched].tolist()
+
+
+def test_override_writes_book_ids(game_tables):
+    "The merged table keeps each row's own book id"
+    base, bonus = game_tables
+    new_weights, _, _, _ = vectorized_merge(base, bonus, ["freegame"], 1.0)
+    override_optimized_lookup(base.lookup_path, base.ids, base.payouts_ints, new_weights)
+    rewritten = LookupProperties(GAME_ID, "base")
+    assert rewritten.ids.tolist() == list(range(1, len(base.ids) + 1))
+    assert rewritten.weights_ints.tolist() == new_weights.tolist()
+    assert rewritten.payouts_ints.tolist() == base.payouts_ints.tolist()
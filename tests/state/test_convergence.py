@@ -0,0 +1,129 @@
+"""Test the stratified RTP / hit-rate convergence monitor and the worker running sums it combines."""
+
+from math import sqrt
+import pytest
+from src.state.convergence import ConvergenceMonitor, RunningSums
+from src.write_data.sim_summary import FLAG_FREEGAME
+
+# criteria: [(payout, flags), ...]
+BOOKS = {
+    "0": [(0.0, 0), (2.0, 0)],
+    "basegame": [(1.0, 0), (3.0, FLAG_FREEGAME), (5.0, 0)],
+}
+
+
+def running_sums(books: dict) -> dict:
+    sums = RunningSums()
+    for criteria, rows in books.items():
+        for payout, flags in rows:
+            sums.add(criteria, payout, flags)
+    return sums.to_dict()
+
+
+def create_monitor(**targets) -> ConvergenceMonitor:
+    return ConvergenceMonitor(2.0, {"0": 0.5, "basegame": 0.5}, **targets)
+
+
+def test_running_sums():
+    "Counts, payout sums and event hits are accumulated per criteria"
+    sums = running_sums(BOOKS)
+    assert sums["basegame"] == {"n": 3, "sum": 9.0, "sumsq": 35.0, "hit": 3, "freegame": 1, "wincap": 0}
+    assert sums["0"]["hit"] == 1
+
+
+def test_stratified_estimate():
+    "Criteria means and variances are weighted by their share of the mode, not their share of simulations"
+    monitor = create_monitor()
+    monitor.update((0, 0), running_sums(BOOKS))
+    estimate = monitor.estimate()
+
+    # means 1 and 3, sample variances 2 and 4, each criteria has half the mode's weight
+    assert estimate["sims"] == 5
+    assert estimate["rtp"] == pytest.approx((0.5 * 1 + 0.5 * 3) / 2.0)
+    assert estimate["rtp_se"] == pytest.approx(sqrt(0.25 * 2 / 2 + 0.25 * 4 / 3) / 2.0)
+    assert estimate["criteria_rtp"] == pytest.approx({"0": 0.25, "basegame": 0.75})
+    low, high = estimate["rtp_ci"]
+    assert (high - low) / 2 == pytest.approx(monitor.z * estimate["rtp_se"])
+
+    hit = estimate["hit_rates"]["hit"]
+    assert hit["prob"] == pytest.approx(0.5 * 0.5 + 0.5 * 1.0)
+    assert hit["se"] == pytest.approx(sqrt(0.25 * 0.5 * 0.5 / 2))
+    freegame = estimate["hit_rates"]["freegame"]
+    assert freegame["prob"] == pytest.approx(0.5 / 3)
+    assert freegame["se"] == pytest.approx(sqrt(0.25 * (1 / 3) * (2 / 3) / 3))
+    assert estimate["hit_rates"]["wincap"] == {"prob": 0.0, "se": 0.0, "rse": None, "hit_rate": None}
+
+
+def test_snapshots_replace_and_batches_accumulate():
+    "update replaces a worker's cumulative snapshot, finish_batch folds the snapshots into the completed totals"
+    monitor = create_monitor()
+    monitor.update((0, 0), running_sums({"0": BOOKS["0"][:1]}))
+    monitor.update((0, 0), running_sums({"0": BOOKS["0"]}))
+    monitor.update((0, 1), running_sums({"basegame": BOOKS["basegame"]}))
+    assert monitor.totals() == running_sums(BOOKS)
+
+    monitor.finish_batch()
+    assert monitor.in_progress == {}
+    assert monitor.totals() == running_sums(BOOKS)
+
+    monitor.update((1, 0), running_sums({"0": BOOKS["0"]}))
+    assert monitor.totals()["0"]["n"] == 4
+    monitor.finish_batch()
+    assert monitor.estimate()["sims"] == 7
+
+
+def test_converged_requires_min_sims_per_criteria():
+    "Targets only count once every criteria has min_sims_per_criteria simulations"
+    monitor = create_monitor(rtp_se=10.0, min_sims_per_criteria=3)
+    monitor.update((0, 0), running_sums(BOOKS))
+    assert not monitor.converged()
+    monitor.update((0, 1), running_sums({"0": [(0.0, 0)]}))
+    assert monitor.converged()
+
+
+def test_converged_targets():
+    "Every RTP and hit-rate target must be met, and a monitor without targets never converges"
+    books = running_sums(BOOKS)
+    no_targets = create_monitor(min_sims_per_criteria=1)
+    no_targets.update((0, 0), books)
+    assert not no_targets.converged()
+
+    for targets, expected in [
+        ({"rtp_se": 0.5}, True),
+        ({"rtp_se": 0.1}, False),
+        ({"rtp_se": 0.5, "hit_rse": {"freegame": 0.9}}, True),
+        ({"rtp_se": 0.5, "hit_rse": {"freegame": 0.5}}, False),
+        ({"hit_rse": {"wincap": 1.0}}, False),
+    ]:
+        monitor = create_monitor(min_sims_per_criteria=1, **targets)
+        monitor.update((0, 0), books)
+        assert monitor.converged() is expected, targets
+
+
+def test_unknown_hit_event():
+    with pytest.raises(RuntimeError):
+        create_monitor(hit_rse={"bonus": 0.1})
+
+
+def test_stop_after_batch():
+    "Modes stop early only when targets are met with batches left to run"
+    monitor = create_monitor(rtp_se=0.5, min_sims_per_criteria=1)
+    monitor.update((0, 0), running_sums({"0": BOOKS["0"]}))
+    monitor.finish_batch()
+    assert not monitor.stop_after_batch(0, 3)
+
+    monitor.update((1, 0), running_sums({"basegame": BOOKS["basegame"]}))
+    monitor.finish_batch()
+    assert monitor.stop_after_batch(1, 3) and monitor.stopped_early
+
+    last_batch = create_monitor(rtp_se=0.5, min_sims_per_criteria=1)
+    last_batch.update((2, 0), running_sums(BOOKS))
+    last_batch.finish_batch()
+    assert not last_batch.stop_after_batch(2, 3) and not last_batch.stopped_early
+
+
+def test_from_settings_shares():
+    "Criteria shares come from the mode's criteria assignment"
+    monitor = ConvergenceMonitor.from_settings({"rtp_se": 0.01}, 1.0, ["0", "0", "0", "basegame"])
+    assert monitor.criteria_shares == {"0": 0.75, "basegame": 0.25}
+    assert monitor.rtp_se == 0.01 and monitor.has_targets
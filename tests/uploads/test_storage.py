@@ -0,0 +1,98 @@
+"""Test skipping and resuming uploads against a local storage backend."""
+
+import os
+import pytest
+from src.write_data import file_fingerprint
+from uploads.storage import MANIFEST_NAME, MANIFEST_PREFIX, LocalBackend, StorageBackend, upload_files
+
+PREFIX = "0_0_test/"
+
+
+class FailingBackend(LocalBackend):
+    """LocalBackend refusing to store the given filenames, as an interrupted or failing transfer would."""
+
+    def __init__(self, root: str, failing: set):
+        super().__init__(root)
+        self.failing = failing
+        self.uploaded = []
+
+    def upload(self, local_path, key, callback=None):
+        if os.path.basename(local_path) in self.failing:
+            raise ConnectionError("connection reset")
+        self.uploaded.append(os.path.basename(local_path))
+        super().upload(local_path, key, callback)
+
+
+@pytest.fixture(autouse=True)
+def fingerprint_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(file_fingerprint, "CACHE_FILE", str(tmp_path / ".cache" / "file_fingerprints.json"))
+    monkeypatch.setattr(file_fingerprint, "_cache", None)
+
+
+@pytest.fixture
+def local_files(tmp_path):
+    folder = tmp_path / "publish_files"
+    folder.mkdir()
+    files = []
+    for name, content in [("config.json", "{}"), ("lookUpTable_base_0.csv", "1,1,0\n"), ("books_base.jsonl.zst", "x")]:
+        (folder / name).write_text(content * 100)
+        files.append(str(folder / name))
+    return files
+
+
+def test_skips_unchanged_files(tmp_path, local_files):
+    "A second upload skips everything, a changed file is the only one sent again"
+    bucket = str(tmp_path / "bucket")
+    first = upload_files(FailingBackend(bucket, set()), local_files, PREFIX, max_workers=2)
+    assert sorted(first["uploaded"]) == sorted(local_files) and not first["skipped"]
+    for local_file in local_files:
+        target = os.path.join(bucket, PREFIX, os.path.basename(local_file))
+        with open(local_file, "rb") as src, open(target, "rb") as dst:
+            assert src.read() == dst.read()
+
+    backend = FailingBackend(bucket, set())
+    second = upload_files(backend, local_files, PREFIX, max_workers=2)
+    assert not second["uploaded"] and sorted(second["skipped"]) == sorted(local_files) and not backend.uploaded
+
+    with open(local_files[1], "a", encoding="UTF-8") as f:
+        f.write("2,1,10\n")
+    backend = FailingBackend(bucket, set())
+    third = upload_files(backend, local_files, PREFIX, max_workers=2)
+    assert third["uploaded"] == [local_files[1]] and backend.uploaded == [os.path.basename(local_files[1])]
+
+    forced = upload_files(FailingBackend(bucket, set()), local_files, PREFIX, force=True)
+    assert sorted(forced["uploaded"]) == sorted(local_files)
+
+
+def test_resumes_after_failure(tmp_path, local_files):
+    "Files completed before a failure are recorded, the next run uploads only what failed"
+    bucket = str(tmp_path / "bucket")
+    failing_name = os.path.basename(local_files[2])
+    first = upload_files(FailingBackend(bucket, {failing_name}), local_files, PREFIX, max_workers=2)
+    assert first["failed"] == [local_files[2]] and sorted(first["uploaded"]) == sorted(local_files[:2])
+
+    backend = FailingBackend(bucket, set())
+    resumed = upload_files(backend, local_files, PREFIX, max_workers=2)
+    assert resumed["uploaded"] == [local_files[2]] and backend.uploaded == [failing_name]
+    assert sorted(resumed["skipped"]) == sorted(local_files[:2])
+
+
+def test_manifest_outside_game_folder(tmp_path, local_files):
+    "The manifest is kept under its own prefix, the game folder only holds the uploaded files"
+    bucket = str(tmp_path / "bucket")
+    backend = LocalBackend(bucket)
+    upload_files(backend, local_files, PREFIX)
+    assert sorted(os.listdir(os.path.join(bucket, PREFIX))) == sorted(os.path.basename(f) for f in local_files)
+    manifest = backend.read_json(MANIFEST_PREFIX + PREFIX + MANIFEST_NAME)
+    assert set(manifest) == {PREFIX + os.path.basename(f) for f in local_files}
+
+
+def test_backend_methods_are_abstract():
+    "Backends missing a storage method cannot be constructed"
+
+    class UploadOnly(StorageBackend):
+        def upload(self, local_path, key, callback=None):
+            pass
+
+    with pytest.raises(TypeError):
+        UploadOnly()
@@ -0,0 +1,81 @@
+"""Test force record index lookups against a brute-force scan of the records."""
+
+import random
+import pytest
+from src.write_data.force_index import ForceIndex, load_force_index, get_force_index_name
+
+NAMES = {"symbol": ["H1", "H2", "scatter"], "kind": [3, 4, 5], "gametype": ["basegame", "freegame"]}
+
+
+@pytest.fixture
+def force_records():
+    rand = random.Random(5)
+    records = []
+    for _ in range(60):
+        names = rand.sample(list(NAMES), rand.randint(1, len(NAMES)))
+        book_ids = [rand.randint(1, 500) for _ in range(rand.randint(1, 40))]
+        records.append(
+            {
+                "search": [{"name": name, "value": rand.choice(NAMES[name])} for name in names],
+                "timesTriggered": len(book_ids) + rand.randint(0, 5),
+                "bookIds": book_ids,
+            }
+        )
+    return records
+
+
+def search_keys():
+    rand = random.Random(9)
+    keys = [{}, {"symbol": "H1"}, {"kind": 4}, {"symbol": "missing"}, {"unknown": "x"}]
+    for _ in range(30):
+        names = rand.sample(list(NAMES), rand.randint(1, len(NAMES)))
+        keys.append({name: rand.choice(NAMES[name]) for name in names})
+    return keys
+
+
+def brute_force_entries(records: list, search_key: dict) -> list:
+    matched = []
+    for record in records:
+        description = {str(item["name"]): str(item["value"]) for item in record["search"]}
+        if all(description.get(str(k)) == str(v) for k, v in search_key.items()):
+            matched.append(record)
+    return matched
+
+
+def brute_force_ids(records: list, search_key: dict) -> set:
+    return {book_id for record in brute_force_entries(records, search_key) for book_id in record["bookIds"]}
+
+
+def test_find_matches_brute_force(force_records):
+    "find and sim_count agree with scanning every record"
+    force_index = ForceIndex.from_force_records(force_records)
+    for search_key in search_keys():
+        found = force_index.find(search_key).tolist()
+        assert found == sorted(brute_force_ids(force_records, search_key)), search_key
+        expected_count = sum(record["timesTriggered"] for record in brute_force_entries(force_records, search_key))
+        assert force_index.sim_count(search_key) == expected_count
+
+
+def test_find_all_and_any(force_records):
+    "find_all intersects and find_any unites per-key matches"
+    force_index = ForceIndex.from_force_records(force_records)
+    keys = search_keys()
+    for start in range(0, len(keys) - 2, 3):
+        group = keys[start : start + 3]
+        per_key = [brute_force_ids(force_records, key) for key in group]
+        assert force_index.find_all(group).tolist() == sorted(set.intersection(*per_key))
+        assert force_index.find_any(group).tolist() == sorted(set.union(*per_key))
+    assert len(force_index.find_all([])) == 0 and len(force_index.find_any([])) == 0
+
+
+def test_save_load_round_trip(tmp_path, force_records):
+    "Delta-encoded .npz index answers queries as the in-memory index"
+    force_index = ForceIndex.from_force_records(force_records)
+    filename = get_force_index_name(str(tmp_path), "base")
+    force_index.save(filename)
+    loaded = load_force_index(str(tmp_path), "base")
+    assert loaded.searches == force_index.searches
+    assert loaded.book_offsets.tolist() == force_index.book_offsets.tolist()
+    for search_key in search_keys():
+        assert loaded.find(search_key).tolist() == force_index.find(search_key).tolist()
+        assert loaded.sim_count(search_key) == force_index.sim_count(search_key)
@@ -0,0 +1,137 @@
+"""Test the optimizer's binary lookup table and force record bundle against the CSV and JSON it replaces."""
+
+import json
+import os
+import random
+import sys
+import pytest
+import src.config.output_filenames as output_filenames
+from src.state.run_sims import create_books
+from src.write_data.optimizer_bundle import (
+    MAGIC,
+    ensure_optimizer_bundle,
+    get_optimizer_bundle_name,
+    read_optimizer_bundle,
+    write_optimizer_bundle,
+)
+from utils.regenerate_books import GAME_MODULES, load_gamestate
+
+FORCE_RECORDS = [
+    {
+        "search": [{"name": "symbol", "value": "scatter"}, {"name": "kind", "value": 3}],
+        "timesTriggered": 4,
+        "bookIds": [1, 5, 9],
+    },
+    {"search": [{"name": "gametype", "value": "freegame"}], "timesTriggered": 0, "bookIds": []},
+    {
+        "search": [{"name": "symbol", "value": "scatter"}, {"name": "kind", "value": 4}],
+        "timesTriggered": 1,
+        "bookIds": [7],
+    },
+]
+
+
+def read_lookup_csv(filename: str) -> tuple:
+    ids, weights, payouts = [], [], []
+    with open(filename, "r", encoding="UTF-8") as f:
+        for line in f:
+            book_id, weight, payout = line.strip().split(",")
+            ids.append(int(book_id))
+            weights.append(int(weight))
+            payouts.append(int(payout))
+    return ids, weights, payouts
+
+
+def stringified(force_records: list) -> list:
+    """Force records as read back from a bundle, search values are stored as strings."""
+    return [
+        {**record, "search": [{"name": str(i["name"]), "value": str(i["value"])} for i in record["search"]]}
+        for record in force_records
+    ]
+
+
+def write_library(path, num_books: int = 300) -> str:
+    """Lookup table with weights beyond 32 bits and a force record file, laid out like a game library."""
+    rand = random.Random(num_books)
+    os.makedirs(path / "lookup_tables")
+    os.makedirs(path / "forces")
+    with open(path / "lookup_tables" / "lookUpTable_base.csv", "w", encoding="UTF-8") as f:
+        for book_id in range(1, num_books + 1):
+            f.write(f"{book_id},{rand.randint(1, 10**15)},{rand.choice([0, 0, 10, 250, 500000])}\n")
+    with open(path / "forces" / "force_record_base.json", "w", encoding="UTF-8") as f:
+        json.dump(FORCE_RECORDS, f)
+    return str(path)
+
+
+def test_bundle_round_trip(tmp_path):
+    "Book arrays and force records read back exactly as written"
+    ids, weights, payouts = [3, 1, 2], [2**40, 1, 7], [0, 500000, 10]
+    filename = str(tmp_path / "optimizer_bundle_base.bin")
+    write_optimizer_bundle(filename, ids, weights, payouts, FORCE_RECORDS)
+    bundle = read_optimizer_bundle(filename)
+    assert bundle["ids"].tolist() == ids
+    assert bundle["weights"].tolist() == weights
+    assert bundle["payouts"].tolist() == payouts
+    assert bundle["force_records"] == stringified(FORCE_RECORDS)
+    assert not os.path.exists(filename + ".tmp")
+
+
+def test_bundle_matches_lookup_csv(tmp_path):
+    "A bundle built from a library holds the lookup table's ids, weights and payouts in file order"
+    library_path = write_library(tmp_path)
+    bundle = read_optimizer_bundle(ensure_optimizer_bundle(library_path, "base"))
+    ids, weights, payouts = read_lookup_csv(os.path.join(library_path, "lookup_tables", "lookUpTable_base.csv"))
+    assert bundle["ids"].tolist() == ids
+    assert bundle["weights"].tolist() == weights
+    assert bundle["payouts"].tolist() == payouts
+    assert bundle["force_records"] == stringified(FORCE_RECORDS)
+
+
+def test_bundle_rebuilt_when_lookup_changes(tmp_path):
+    "ensure_optimizer_bundle rewrites a bundle older than its lookup table"
+    library_path = write_library(tmp_path)
+    filename = ensure_optimizer_bundle(library_path, "base")
+    lookup_name = os.path.join(library_path, "lookup_tables", "lookUpTable_base.csv")
+    with open(lookup_name, "w", encoding="UTF-8") as f:
+        f.write("1,5,0\n2,6,20\n")
+    bundle_time = os.path.getmtime(filename)
+    os.utime(lookup_name, (bundle_time + 10, bundle_time + 10))
+    assert ensure_optimizer_bundle(library_path, "base") == filename
+    assert read_optimizer_bundle(filename)["weights"].tolist() == [5, 6]
+
+
+def test_bundle_rejects_bad_files(tmp_path):
+    "Files without the magic or cut short raise instead of returning partial arrays"
+    filename = str(tmp_path / "optimizer_bundle_base.bin")
+    write_optimizer_bundle(filename, [1, 2], [1, 1], [0, 10], FORCE_RECORDS)
+    with open(filename, "rb") as f:
+        data = f.read()
+    with open(filename, "wb") as f:
+        f.write(data[:-3])
+    with pytest.raises(RuntimeError, match="truncated"):
+        read_optimizer_bundle(filename)
+    with open(filename, "wb") as f:
+        f.write(b"OPTBNDL1" + data[len(MAGIC) :])
+    with pytest.raises(RuntimeError, match="not an optimizer bundle"):
+        read_optimizer_bundle(filename)
+
+
+def test_simulated_bundle_matches_lookup_csv(tmp_path, monkeypatch):
+    "The bundle create_books writes from the simulation summary matches its lookup table and force records"
+    monkeypatch.setattr(output_filenames, "PATH_TO_GAMES", str(tmp_path))
+    gamestate = load_gamestate("0_0_lines")
+    try:
+        create_books(gamestate, gamestate.config, {"base": 100}, 50, 2, True, False, store_books=False)
+    finally:
+        for name in GAME_MODULES:
+            sys.modules.pop(name, None)
+
+    output_files = gamestate.output_files
+    bundle = read_optimizer_bundle(get_optimizer_bundle_name(output_files.lookup_path, "base"))
+    ids, weights, payouts = read_lookup_csv(os.path.join(output_files.lookup_path, "lookUpTable_base.csv"))
+    assert sorted(ids) == list(range(1, 101))
+    assert bundle["ids"].tolist() == ids
+    assert bundle["weights"].tolist() == weights
+    assert bundle["payouts"].tolist() == payouts
+    with open(os.path.join(output_files.force_path, "force_record_base.json"), "r", encoding="UTF-8") as f:
+        assert bundle["force_records"] == stringified(json.load(f))
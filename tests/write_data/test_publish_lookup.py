@@ -0,0 +1,81 @@
+"""Test publishing optimizer results against the line-by-line swap_tables conversion it replaced."""
+
+import hashlib
+import random
+import numpy as np
+import pytest
+from src.write_data import publish_lookup
+from src.write_data.publish_lookup import publish_optimized_table, summarise_lookup_table
+
+
+def line_by_line_swap(opt_file: str, lut_file: str) -> None:
+    """swap_tables() as it converted an optimizer result before publishing was streamed in blocks."""
+    start_recording = False
+    with open(opt_file, "r", encoding="UTF-8") as infile, open(lut_file, "w", encoding="UTF-8") as outfile:
+        for line in infile:
+            line = line.strip()
+            if not line:
+                continue
+            if start_recording:
+                idx, weight, payout = line.split(",")
+                outfile.write(f"{int(idx)},{int(weight)},{int(round(float(payout) * 100, 0))}\n")
+            elif line == "Distribution":
+                start_recording = True
+
+
+@pytest.fixture
+def opt_file(tmp_path):
+    rand = random.Random(3)
+    payouts = ["0.0", "0.1", "0.5", "1.2", "2.5", "10.0", "12.3", "150.7", "5000.0"]
+    filename = str(tmp_path / "base_0_1.csv")
+    with open(filename, "w", encoding="UTF-8") as f:
+        f.write("Name,base\nScore,0.01\n\nDistribution\n")
+        for book_id in range(1, 3001):
+            f.write(f"{book_id},{rand.randint(0, 2**40)},{rand.choice(payouts)}\n")
+            if book_id % 500 == 0:
+                f.write("\n")
+    return filename
+
+
+@pytest.mark.parametrize("read_size", [64, 4096, 1 << 20])
+def test_publish_matches_line_by_line(tmp_path, monkeypatch, opt_file, read_size):
+    "Published table is byte-identical to the line-by-line conversion for any block size"
+    monkeypatch.setattr(publish_lookup, "READ_SIZE", read_size)
+    expected_file, lut_file = str(tmp_path / "expected.csv"), str(tmp_path / "lookUpTable_base_0.csv")
+    line_by_line_swap(opt_file, expected_file)
+    stats = publish_optimized_table(opt_file, lut_file)
+
+    with open(expected_file, "rb") as f:
+        expected = f.read()
+    with open(lut_file, "rb") as f:
+        assert f.read() == expected
+    assert stats["sha256"] == hashlib.sha256(expected).hexdigest()
+    assert stats["lines"] == 3000
+
+
+def test_publish_moments(tmp_path, opt_file):
+    "Moments match the win distribution of the published table, summarising the table gives the same stats"
+    lut_file = str(tmp_path / "lookUpTable_base_0.csv")
+    stats = publish_optimized_table(opt_file, lut_file)
+
+    columns = np.loadtxt(lut_file, delimiter=",", dtype=np.uint64)
+    weights, wins = columns[:, 1].astype(np.float64), columns[:, 2] / 100
+    mean = np.average(wins, weights=weights)
+    assert stats["total_weight"] == sum(int(w) for w in columns[:, 1])
+    assert stats["mean"] == pytest.approx(mean, rel=1e-12)
+    variance = np.average((wins - mean) ** 2, weights=weights)
+    assert stats["variance"] == pytest.approx(variance, rel=1e-12)
+    assert stats["skewness"] == pytest.approx(np.average((wins - mean) ** 3, weights=weights) / variance**1.5)
+    assert stats["kurtosis"] == pytest.approx(np.average((wins - mean) ** 4, weights=weights) / variance**2 - 3)
+
+    summary = summarise_lookup_table(lut_file)
+    assert summary == stats
+
+
+def test_publish_rejects_malformed_rows(tmp_path):
+    "Rows without three columns raise as swap_tables did"
+    opt_file = str(tmp_path / "base_0_1.csv")
+    with open(opt_file, "w", encoding="UTF-8") as f:
+        f.write("Distribution\n1,5,1.0\n2,5\n")
+    with pytest.raises(SyntaxError):
+        publish_optimized_table(opt_file, str(tmp_path / "lookUpTable_base_0.csv"))
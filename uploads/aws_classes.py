@@ -3,10 +3,9 @@
 import os
 import sys
 import json
-import hashlib
 import warnings
-import threading
-from botocore.exceptions import NoCredentialsError
+
+from src.write_data.file_fingerprint import get_file_sha256, get_line_count
 
 
 class check_files:
@@ -17,26 +16,11 @@ class check_files:
 
     def get_lut_length(self, lut_base_path, file):
         """Verify LUT item count matches book count."""
-        full_file = lut_base_path + file
-        csv = open(full_file, "r")
-        book_count = len(csv.readlines())
-
-        return book_count
+        return get_line_count(lut_base_path + file)
 
     def get_lut_sha(self, lut_base_path, target_file):
         """Compare hash of lookup tables."""
-        file_to_hash = lut_base_path + target_file
-        with open(file_to_hash, "rb") as f:
-            sha256_file = hashlib.sha256()
-            while True:
-                data = f.read(65536)
-                if not data:
-                    break
-                sha256_file.update(data)
-
-        sha256_hexRep = sha256_file.hexdigest()
-
-        return sha256_hexRep
+        return get_file_sha256(lut_base_path + target_file)
 
     def file_checker(self):
         """Return valid game modes from config."""
@@ -247,57 +231,3 @@ class FileDetails:
                     )
 
         return failed
-
-
-class AWSCommands:
-    """Upload through S3 API."""
-
-    def __init__(self, s3_client, bucket_name, bucket_folder):
-        self.bucket_name = bucket_name
-        self.bucket_folder = bucket_folder
-        self.s3_client = s3_client
-        self.s3_bucket = s3_client.Bucket(bucket_name)
-
-    def upload_to_aws(self, localFile):
-        """Verify file exists locally."""
-        bucket_object = self.s3_bucket
-        bucket_folder = self.bucket_folder
-
-        # Attempt file upload
-        try:
-            s3_name = bucket_folder + (localFile.split("/")[-1])
-            bucket_object.upload_file(
-                Filename=localFile,
-                Key=s3_name,
-                ExtraArgs={"ACL": "public-read"},
-                Callback=ProgressPercentage(localFile),
-            )
-
-            print(f"{localFile.split('/')[-1]} Uploaded Successfully")
-            return True
-        except FileNotFoundError:
-            print("The file was not found")
-            return False
-        except NoCredentialsError:
-            print("Credentials not available")
-            return False
-
-
-class ProgressPercentage(object):
-    """Return upload progress as percentage."""
-
-    def __init__(self, filename):
-        self._filename = filename
-        self._size = float(os.path.getsize(filename))
-        self._seen_so_far = 0
-        self._lock = threading.Lock()
-        print("\n")
-
-    def __call__(self, bytes_amount):
-        with self._lock:
-            self._seen_so_far += bytes_amount
-            percentage = (self._seen_so_far / self._size) * 100
-            sys.stdout.write(
-                "\r%s  %s / %s  (%.2f%%)" % (self._filename, self._seen_so_far, self._size, percentage)
-            )
-            sys.stdout.flush()
@@ -4,20 +4,34 @@ import time
 import warnings
 import boto3
 from uploads.aws_constants import ACCESS_KEY, SECRET_KEY, BUCKET_NAME
-from uploads.aws_classes import AWSCommands, check_files, FileDetails
+from uploads.aws_classes import check_files, FileDetails
+from uploads.storage import MAX_WORKERS, S3Backend, upload_files
 
 
-def upload_to_aws(gamestate, game_modes, upload_obj, override_check=False):
-    """Verify file details and upload to S3 bucket."""
+def upload_to_aws(
+    gamestate,
+    game_modes,
+    upload_obj,
+    override_check=False,
+    backend=None,
+    max_workers=MAX_WORKERS,
+    force_upload=False,
+):
+    """
+    Verify file details and upload to S3 bucket, or to any other storage backend (e.g. uploads.storage.LocalBackend).
+    Files unchanged since the last upload are skipped unless force_upload is set.
+    """
     game_to_upload = gamestate.config.game_id
     failed_rtp_check = True
-    s3_client = boto3.resource("s3", aws_access_key_id=ACCESS_KEY, aws_secret_access_key=SECRET_KEY)
+    if backend is None:
+        s3_client = boto3.resource("s3", aws_access_key_id=ACCESS_KEY, aws_secret_access_key=SECRET_KEY)
 
-    print("**************************")
-    print("\n Avaliable S3 Buckets:\n")
-    buckets = [bucket.name for bucket in s3_client.buckets.all()]
-    [print(b) for b in buckets]
-    print("**************************\n")
+        print("**************************")
+        print("\n Avaliable S3 Buckets:\n")
+        buckets = [bucket.name for bucket in s3_client.buckets.all()]
+        [print(b) for b in buckets]
+        print("**************************\n")
+        backend = S3Backend(s3_client, BUCKET_NAME)
 
     # Read config and compare names, file hash and book length
     if not override_check:
@@ -35,7 +49,6 @@ def upload_to_aws(gamestate, game_modes, upload_obj, override_check=False):
 
     bucket_folder = game_to_upload + "/"
     file_details = FileDetails(game_to_upload, game_modes)
-    aws_details = AWSCommands(s3_client, BUCKET_NAME, bucket_folder)
 
     all_files = file_details.get_file_paths(
         books=upload_obj["books"],
@@ -60,4 +73,7 @@ def upload_to_aws(gamestate, game_modes, upload_obj, override_check=False):
 
     for file in all_files:
         file_details.check_file_size(file)
-        aws_details.upload_to_aws(file)
+    results = upload_files(backend, all_files, bucket_folder, max_workers=max_workers, force=force_upload)
+    if results["failed"]:
+        raise RuntimeError(f"{len(results['failed'])} files failed to upload: {results['failed']}")
+    return results
@@ -0,0 +1,212 @@
+"""
+Storage backends for publishing game files, and an upload engine which only sends what has changed.
+
+Each destination folder has a manifest of {key: {sha256, size}} for the files uploaded into it, kept under
+MANIFEST_PREFIX rather than beside the published files. Local files are fingerprinted (cached until they change)
+and compared against the manifest, unchanged files are skipped and the rest are uploaded concurrently, large files
+as multipart transfers.
+"""
+
+import os
+import sys
+import json
+import shutil
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from src.write_data.file_fingerprint import get_fingerprint
+
+MANIFEST_NAME = "upload_manifest.json"
+MANIFEST_PREFIX = "upload_manifests/"  # manifests are private bookkeeping, stored outside the public game folders
+MAX_WORKERS = 4
+MULTIPART_THRESHOLD = 64 * 1024 * 1024
+MULTIPART_CHUNKSIZE = 64 * 1024 * 1024
+PART_CONCURRENCY = 8
+COPY_SIZE = 1 << 20
+
+
+class StorageBackend(ABC):
+    """Destination for uploaded files, objects are addressed by key (folder/filename)."""
+
+    @abstractmethod
+    def upload(self, local_path: str, key: str, callback=None) -> None:
+        """Store local_path under key, calling callback(bytes) as data is sent."""
+
+    @abstractmethod
+    def read_json(self, key: str):
+        """Stored JSON object, or None if the key does not exist."""
+
+    @abstractmethod
+    def write_json(self, key: str, data: dict) -> None:
+        """Store data as a JSON object under key, not publicly readable."""
+
+    def describe(self) -> str:
+        return type(self).__name__
+
+
+class LocalBackend(StorageBackend):
+    """Mirror uploads into a local directory, for testing uploads without AWS credentials."""
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, *key.split("/"))
+
+    def upload(self, local_path, key, callback=None):
+        target = self._path(key)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp_name = target + ".tmp"
+        with open(local_path, "rb") as src, open(temp_name, "wb") as dst:
+            while True:
+                data = src.read(COPY_SIZE)
+                if not data:
+                    break
+                dst.write(data)
+                if callback is not None:
+                    callback(len(data))
+        shutil.copymode(local_path, temp_name)
+        os.replace(temp_name, target)
+
+    def read_json(self, key):
+        path = self._path(key)
+        if not os.path.isfile(path):
+            return None
+        with open(path, "r", encoding="UTF-8") as f:
+            return json.load(f)
+
+    def write_json(self, key, data):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path + ".tmp", "w", encoding="UTF-8") as f:
+            json.dump(data, f, indent=2)
+        os.replace(path + ".tmp", path)
+
+    def describe(self):
+        return f"local directory {self.root}"
+
+
+class S3Backend(StorageBackend):
+    """S3 bucket through a boto3 resource, files above MULTIPART_THRESHOLD are sent as concurrent parts."""
+
+    def __init__(
+        self,
+        s3_resource,
+        bucket_name: str,
+        extra_args: dict = None,
+        part_concurrency: int = PART_CONCURRENCY,
+        multipart_threshold: int = MULTIPART_THRESHOLD,
+        multipart_chunksize: int = MULTIPART_CHUNKSIZE,
+    ):
+        from boto3.s3.transfer import TransferConfig
+
+        self.bucket_name = bucket_name
+        self.bucket = s3_resource.Bucket(bucket_name)
+        self.extra_args = {"ACL": "public-read"} if extra_args is None else extra_args
+        self.transfer_config = TransferConfig(
+            multipart_threshold=multipart_threshold,
+            multipart_chunksize=multipart_chunksize,
+            max_concurrency=part_concurrency,
+            use_threads=True,
+        )
+
+    def upload(self, local_path, key, callback=None):
+        self.bucket.upload_file(
+            Filename=local_path,
+            Key=key,
+            ExtraArgs=self.extra_args,
+            Callback=callback,
+            Config=self.transfer_config,
+        )
+
+    def read_json(self, key):
+        from botocore.exceptions import ClientError
+
+        try:
+            body = self.bucket.Object(key).get()["Body"].read()
+        except ClientError as err:
+            if err.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                return None
+            raise
+        return json.loads(body)
+
+    def write_json(self, key, data):
+        self.bucket.put_object(Key=key, Body=json.dumps(data, indent=2).encode("UTF-8"))
+
+    def describe(self):
+        return f"s3 bucket {self.bucket_name}"
+
+
+class TransferProgress:
+    """Combined progress of concurrent uploads, safe to call from transfer threads."""
+
+    def __init__(self, total_bytes: int):
+        self._total = max(total_bytes, 1)
+        self._seen_so_far = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, bytes_amount):
+        with self._lock:
+            self._seen_so_far += bytes_amount
+            percentage = (self._seen_so_far / self._total) * 100
+            sys.stdout.write(
+                "\rUploaded %.1f / %.1f MB  (%.2f%%)" % (self._seen_so_far / 1e6, self._total / 1e6, percentage)
+            )
+            sys.stdout.flush()
+
+
+def upload_files(
+    backend: StorageBackend, local_files, prefix: str = "", max_workers: int = MAX_WORKERS, force: bool = False
+) -> dict:
+    """
+    Upload local_files to prefix + filename, skipping files whose sha256 and size match the destination manifest
+    (MANIFEST_PREFIX + prefix + MANIFEST_NAME). The manifest is rewritten after every completed upload, so an
+    interrupted publish resumes where it stopped. Returns {"uploaded": [...], "skipped": [...], "failed": [...]}
+    of local paths.
+    """
+    local_files = list(local_files)
+    manifest_key = MANIFEST_PREFIX + prefix + MANIFEST_NAME
+    manifest = backend.read_json(manifest_key) or {}
+    manifest_lock = threading.Lock()
+    print(f"\nUploading {len(local_files)} files to {backend.describe()} ({prefix or '/'})")
+
+    # fingerprints come from the local cache unless a file changed since it was last hashed
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        fingerprints = list(executor.map(get_fingerprint, local_files))
+
+    pending, skipped = [], []
+    for local_file, fingerprint in zip(local_files, fingerprints):
+        key = prefix + os.path.basename(local_file)
+        entry = {"sha256": fingerprint["sha256"], "size": fingerprint["size"]}
+        if not force and manifest.get(key) == entry:
+            skipped.append(local_file)
+            print(f"{os.path.basename(local_file)} unchanged, skipping")
+        else:
+            pending.append((local_file, key, entry))
+
+    progress = TransferProgress(sum(entry["size"] for _, _, entry in pending))
+
+    def upload_one(job):
+        local_file, key, entry = job
+        try:
+            backend.upload(local_file, key, callback=progress)
+        except Exception as err:
+            print(f"\n{os.path.basename(local_file)} Upload Failed: {err}")
+            return False
+        with manifest_lock:
+            manifest[key] = entry
+            backend.write_json(manifest_key, manifest)
+        return True
+
+    uploaded, failed = [], []
+    if pending:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for (local_file, _, _), success in zip(pending, executor.map(upload_one, pending)):
+                (uploaded if success else failed).append(local_file)
+        print()
+
+    for local_file in uploaded:
+        print(f"{os.path.basename(local_file)} Uploaded Successfully")
+    print(f"{len(uploaded)} uploaded, {len(skipped)} unchanged, {len(failed)} failed")
+    return {"uploaded": uploaded, "skipped": skipped, "failed": failed}
@@ -2,10 +2,12 @@ from collections import defaultdict
 from math import sqrt
 import numpy as np
 
+from src.write_data.file_fingerprint import get_line_count
+
 
 def get_lookup_length(filepath: str) -> int:
     """Get length of lookup table."""
-    return sum(1 for _ in open(filepath, "rb"))
+    return get_line_count(filepath)
 
 
 def make_win_distribution(filepath: str, normalize: bool = True) -> dict:
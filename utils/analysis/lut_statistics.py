@@ -0,0 +1,169 @@
+"""Lookup table statistics computed from NumPy arrays in a single pass."""
+
+import warnings
+from math import sqrt
+import numpy as np
+
+from src.write_data.sim_summary import load_summary
+
+UINT64_MAX = int(np.iinfo(np.uint64).max)
+
+
+def exact_sum(values: np.ndarray) -> int:
+    """Sum of uint64 values as a Python int, split into 32-bit halves so it cannot overflow."""
+    values = np.asarray(values, dtype=np.uint64)
+    high = int(np.sum(values >> np.uint64(32), dtype=np.uint64))
+    low = int(np.sum(values & np.uint64(0xFFFFFFFF), dtype=np.uint64))
+    return (high << 32) + low
+
+
+def read_lookup_columns(filename: str) -> np.ndarray:
+    """
+    Parse an id,weight,payout csv into a (n, 3) uint64 array.
+    Non-integer or negative entries are parsed as float64 so verify() can report the offending column.
+    """
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", DeprecationWarning)  # numpy parses '1.5' or '-1' via float with a warning
+            return np.loadtxt(filename, delimiter=",", dtype=np.uint64, ndmin=2)
+    except (ValueError, DeprecationWarning, OverflowError):
+        return np.loadtxt(filename, delimiter=",", dtype=np.float64, ndmin=2)
+
+
+def weight_distribution(values: np.ndarray, weights: np.ndarray) -> tuple:
+    """Unique values (ascending) and the exact summed weight of each."""
+    if len(values) == 0:
+        return values[:0], weights[:0]
+    order = np.argsort(values, kind="stable")
+    sorted_values = values[order]
+    starts = np.flatnonzero(np.r_[True, sorted_values[1:] != sorted_values[:-1]])
+    return sorted_values[starts], np.add.reduceat(weights[order], starts)
+
+
+class LookupTable:
+    """Lookup table columns (book id, weight, payout in cents) held as arrays."""
+
+    def __init__(self, ids: np.ndarray, weights: np.ndarray, payouts: np.ndarray):
+        self.ids = ids
+        self.weights = weights
+        self.payouts = payouts
+        self._total_weight = None
+
+    @classmethod
+    def from_csv(cls, filename: str) -> "LookupTable":
+        columns = read_lookup_columns(filename)
+        return cls(columns[:, 0], columns[:, 1], columns[:, 2])
+
+    @classmethod
+    def from_summary(cls, summary_dir: str) -> "LookupTable":
+        """Memory-mapped simulation summary, weights are the unoptimized simulation weights."""
+        summary = load_summary(summary_dir, columns=["id", "weight", "payout"])
+        return cls(summary["id"], summary["weight"], summary["payout"])
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def total_weight(self) -> int:
+        if self._total_weight is None:
+            self._total_weight = exact_sum(self.weights)
+        return self._total_weight
+
+    def verify(self) -> None:
+        """Duplicate RGS lookup table format checks."""
+        if self.payouts.dtype != np.uint64:
+            assert np.all((self.payouts >= 0) & (np.mod(self.payouts, 1) == 0)), "Payout mult be uint64 format:"
+            self.payouts = self.payouts.astype(np.uint64)
+        assert np.all(
+            (self.payouts == 0) | (self.payouts >= 10)
+        ), "Minimum non-zero payout is 10 (RGS accepts 'cents' increments)."
+        assert np.all(self.payouts % np.uint64(10) == 0), "Payout values must be in increments of 10."
+
+        if self.weights.dtype != np.uint64:
+            assert np.all((self.weights >= 0) & (np.mod(self.weights, 1) == 0)), "Weight must be uint64 format."
+            self.weights = self.weights.astype(np.uint64)
+        self.ids = self.ids.astype(np.uint64, copy=False)
+        assert self.total_weight <= UINT64_MAX, "Sum of weights must be <= MAX(uint64)"
+
+    def distribution(self) -> tuple:
+        """Unique payouts (ascending) and their exact summed weights."""
+        return weight_distribution(self.payouts, self.weights)
+
+    def win_distribution(self) -> dict:
+        """{payout multiplier: probability}, ordered by payout."""
+        unique_payouts, unique_weights = self.distribution()
+        probs = unique_weights.astype(np.float64) / float(self.total_weight)
+        return dict(zip((unique_payouts / 100).tolist(), probs.tolist()))
+
+    def range_weights(self, win_ranges: list, weighted: bool = True) -> list:
+        """Summed weight (or simulation count) of payouts falling within each [low, high) multiplier range."""
+        wins = self.payouts / 100
+        totals = []
+        for low, high in win_ranges:
+            mask = (wins >= low) & (wins < high)
+            totals.append(exact_sum(self.weights[mask]) if weighted else int(np.count_nonzero(mask)))
+        return totals
+
+    def book_rows(self, book_ids: np.ndarray) -> np.ndarray:
+        """Row positions of book ids (book id n is row n - 1), ids outside the table are dropped."""
+        book_ids = np.asarray(book_ids, dtype=np.int64)
+        return book_ids[(book_ids > 0) & (book_ids <= len(self))] - 1
+
+    def hit_rate(self, book_ids: np.ndarray) -> float:
+        """Inverse of the weighted probability of any of the given books, 0 if none carry weight."""
+        subset_weight = exact_sum(self.weights[self.book_rows(book_ids)])
+        return self.total_weight / subset_weight if subset_weight > 0 else 0
+
+    def average_win(self, book_ids: np.ndarray) -> float:
+        """Weighted average payout (lookup table units) over the given books."""
+        rows = self.book_rows(book_ids)
+        subset_weights = self.weights[rows].astype(np.float64)
+        if subset_weights.sum() == 0:
+            return 0
+        return float(np.dot(self.payouts[rows].astype(np.float64), subset_weights) / subset_weights.sum())
+
+    def statistics(self, bet_cost: float) -> dict:
+        """
+        All RGS statistics from one sort of the payout column.
+        Weight totals, medians and min/max are exact, moments are float64 over the unique payouts.
+        Value types match the stats_summary.json written by the per-row implementation.
+        """
+        total_weight = self.total_weight
+        unique_payouts, unique_weights = self.distribution()
+        wins = unique_payouts / 100
+        probs = unique_weights.astype(np.float64) / float(total_weight)
+
+        average_win = float(np.dot(wins, probs))
+        deviation = wins - average_win
+        variance = float(np.dot(deviation**2, probs))
+        std = sqrt(variance)
+        normalized_std = std / bet_cost
+        skew, excess_kurtosis = 0.0, -3.0
+        if normalized_std > 0:
+            skew = float(np.dot(deviation**3, probs)) / normalized_std**3
+            excess_kurtosis = float(np.dot(deviation**4, probs)) / normalized_std**4 - 3
+
+        cumulative_weight = np.cumsum(unique_weights)
+        median = float(wins[np.searchsorted(cumulative_weight, np.uint64((total_weight + 1) // 2))])
+        prob_nil = float(probs[0]) if unique_payouts[0] == 0 else 0
+
+        return {
+            "win_distribution": dict(zip(wins.tolist(), probs.tolist())),
+            "weight_range": float(total_weight),
+            "min_win": float(unique_payouts[0]),
+            "max_win": float(unique_payouts[-1]),
+            "min_diff": int(np.diff(unique_payouts).min()) if len(unique_payouts) > 1 else 0,
+            "unique_wins": unique_payouts.tolist(),
+            "average_wins": average_win,
+            "rtp": average_win / bet_cost,
+            "std": std,
+            "var": variance,
+            "m2m": average_win / median if median > 0 else 0,
+            "hr_max": 1.0 / float(probs[-1]),
+            "non_zero_hr": 1 / (1 - prob_nil) if prob_nil > 0 else 1,
+            "prob_nil": prob_nil,
+            "prob_less_bet": float(probs[wins < bet_cost].sum()),
+            "num_non_zero_payouts": int(np.count_nonzero(self.payouts)),
+            "skew": skew,
+            "excess_kurtosis": excess_kurtosis,
+        }
@@ -0,0 +1,109 @@
+"""
+Random access to compressed books using the books_<mode>_index.csv sidecar.
+Only the zstd frames containing requested ids are read and decompressed, one frame at a time.
+
+Example:
+    python utils/books_archive.py -g 0_0_lines -m base -i 1 250 9001
+"""
+
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import zstandard as zstd
+
+ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(ROOT_PATH))
+
+from src.config.paths import PATH_TO_GAMES
+
+INDEX_COLUMNS = ["id", "block", "frame_offset", "frame_size", "offset", "length"]
+
+
+def get_archive_paths(game_id: str, betmode: str) -> tuple:
+    """Default compressed books and index locations for a game mode."""
+    library_path = os.path.join(PATH_TO_GAMES, game_id, "library")
+    books_path = os.path.join(library_path, "publish_files", f"books_{betmode}.jsonl.zst")
+    index_path = os.path.join(library_path, "books", f"books_{betmode}_index.csv")
+    return books_path, index_path
+
+
+class BooksArchive:
+    """Reader for block-compressed books files."""
+
+    def __init__(self, books_path: str, index_path: str):
+        if not os.path.isfile(index_path):
+            raise FileNotFoundError(f"Books index not found: {index_path}\nRe-run create_books to write the index.")
+        self.books_path = books_path
+        self.index_path = index_path
+        index = np.loadtxt(index_path, delimiter=",", dtype=np.int64, ndmin=2)
+        order = np.argsort(index[:, 0], kind="stable")
+        self.index = index[order]
+        self.ids = self.index[:, 0]
+        self._decompressor = zstd.ZstdDecompressor()
+
+    @classmethod
+    def from_game(cls, game_id: str, betmode: str) -> "BooksArchive":
+        return cls(*get_archive_paths(game_id, betmode))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, book_id: int) -> bool:
+        pos = np.searchsorted(self.ids, book_id)
+        return pos < len(self.ids) and self.ids[pos] == book_id
+
+    def locate(self, book_id: int) -> dict:
+        """Return the index entry for a book id."""
+        pos = np.searchsorted(self.ids, book_id)
+        if pos >= len(self.ids) or self.ids[pos] != book_id:
+            raise KeyError(f"Book id {book_id} is not in {self.index_path}")
+        return dict(zip(INDEX_COLUMNS, (int(v) for v in self.index[pos])))
+
+    def read_block(self, file, frame_offset: int, frame_size: int) -> bytes:
+        """Read and decompress a single frame."""
+        file.seek(frame_offset)
+        return self._decompressor.decompress(file.read(frame_size))
+
+    def iter_books(self, book_ids: list, raw: bool = False):
+        """
+        Yield (book_id, book) for the requested ids, grouped by block so each frame is decompressed once.
+        Memory is bounded by a single decompressed frame. Books are yielded in file order.
+        """
+        entries = sorted((self.locate(int(book_id)) for book_id in set(book_ids)), key=lambda e: e["block"])
+        with open(self.books_path, "rb") as f:
+            current_block, block_data = None, None
+            for entry in entries:
+                if entry["block"] != current_block:
+                    block_data = self.read_block(f, entry["frame_offset"], entry["frame_size"])
+                    current_block = entry["block"]
+                line = block_data[entry["offset"] : entry["offset"] + entry["length"]]
+                yield entry["id"], (line.decode("UTF-8").strip() if raw else json.loads(line))
+
+    def get_books(self, book_ids: list) -> dict:
+        """Return {book_id: book} for the requested ids."""
+        return dict(self.iter_books(book_ids))
+
+    def get_book(self, book_id: int) -> dict:
+        """Return a single book."""
+        return self.get_books([book_id])[int(book_id)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fetch books by id from a block-compressed books file.")
+    parser.add_argument("-g", dest="game_id", type=str, required=True, help="Enter str format for game_id: '0_0_0'")
+    parser.add_argument("-m", dest="game_mode", type=str, required=True, help="Enter str format: 'base', 'bonus'...")
+    parser.add_argument("-i", dest="book_ids", type=int, nargs="+", required=True, help="Book ids to fetch")
+    args = parser.parse_args()
+
+    archive = BooksArchive.from_game(args.game_id, args.game_mode)
+    for _, book in archive.iter_books(args.book_ids, raw=True):
+        print(book)
+
+
+if __name__ == "__main__":
+    main()
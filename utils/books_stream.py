@@ -0,0 +1,188 @@
+"""
+Bounded-memory access to books files (plain or zstd compressed).
+Books are cut into batches of whole top-level objects which are handed to a process pool and written back in order,
+so neither validation nor formatting ever holds more than a few batches in memory.
+"""
+
+import io
+import os
+import json
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+BATCH_CHARS = 8 << 20
+READ_CHARS = 1 << 20
+MAX_OBJECT_CHARS = 256 << 20
+PROGRESS_SECONDS = 2.0
+
+
+def open_books(path, encoding: str = "utf-8"):
+    """Text stream over a books file, decompressing .zst files on the fly."""
+    path = str(path)
+    if path.endswith(".zst"):
+        import zstandard as zstd
+
+        raw = open(path, "rb")
+        reader = zstd.ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True)
+        return io.TextIOWrapper(reader, encoding=encoding)
+    return open(path, "r", encoding=encoding)
+
+
+def first_character(path) -> str:
+    """First non-whitespace character of a books file, '' when empty."""
+    with open_books(path) as f:
+        while True:
+            chunk = f.read(READ_CHARS)
+            if not chunk:
+                return ""
+            stripped = chunk.lstrip()
+            if stripped:
+                return stripped[0]
+
+
+def iter_batches(stream, batch_chars: int = BATCH_CHARS):
+    """
+    Yield blocks of roughly batch_chars characters, only ever cut before a line opening a top-level object.
+    This holds for one-object-per-line JSONL and for books which have already been pretty-printed.
+    """
+    lines, size = [], 0
+    for line in stream:
+        if size >= batch_chars and line.startswith("{"):
+            yield "".join(lines)
+            lines, size = [], 0
+        lines.append(line)
+        size += len(line)
+    if lines:
+        yield "".join(lines)
+
+
+def iter_chunks(stream, read_chars: int = READ_CHARS):
+    """Fixed size reads, for content which is not split over lines (single-line JSON arrays)."""
+    while True:
+        chunk = stream.read(read_chars)
+        if not chunk:
+            return
+        yield chunk
+
+
+def iter_json_objects(chunks, separators: str = ""):
+    """
+    Yield (object, None) for every top-level JSON value in a sequence of text chunks, objects may span chunks.
+    Corrupt stretches yield (None, error) once and are skipped up to the next line opening an object.
+    """
+    decoder = json.JSONDecoder()
+    chunks = iter(chunks)
+    buffer, pos, exhausted = "", 0, False
+    while True:
+        while pos < len(buffer) and (buffer[pos].isspace() or buffer[pos] in separators):
+            pos += 1
+        if pos >= len(buffer) and exhausted:
+            return
+        if pos < len(buffer):
+            try:
+                obj, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as err:
+                # an incomplete object cannot be followed by a buffered line opening the next one
+                resync = buffer.find("\n{", pos + 1)
+                if exhausted or resync >= 0 or len(buffer) - pos > MAX_OBJECT_CHARS:
+                    yield None, f"{err.msg}, content: {buffer[pos:pos + 100].splitlines()[0]}..."
+                    if resync < 0:
+                        buffer, pos = "", 0
+                    else:
+                        pos = resync + 1
+                    continue
+            else:
+                yield obj, None
+                pos = end
+                continue
+        # need more text, either nothing is buffered or the buffered object is incomplete
+        try:
+            buffer, pos = buffer[pos:] + next(chunks), 0
+        except StopIteration:
+            exhausted = True
+
+
+def validate_batch(text: str) -> tuple:
+    """(number of valid objects, errors) of a batch of books."""
+    count, errors = 0, []
+    for obj, error in iter_json_objects((text,)):
+        if error is None:
+            count += 1
+        else:
+            errors.append(error)
+    return count, errors
+
+
+def map_ordered(function, items, max_workers: int = None):
+    """
+    function(item) for every item in order, computed across a process pool.
+    At most two batches per worker are in flight so memory stays bounded however long items is.
+    """
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers <= 1:
+        for item in items:
+            yield function(item)
+        return
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for item in items:
+            pending.append(executor.submit(function, item))
+            if len(pending) >= 2 * max_workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class Progress:
+    """Periodic progress line for a books file, characters are those of the (decompressed) text."""
+
+    def __init__(self, path, label: str):
+        self.label = label
+        path = str(path)
+        self.total = None if path.endswith(".zst") else os.path.getsize(path)
+        self.chars, self.objects = 0, 0
+        self.start = self.last = time.perf_counter()
+
+    def update(self, chars: int, objects: int) -> None:
+        self.chars += chars
+        self.objects += objects
+        now = time.perf_counter()
+        if now - self.last >= PROGRESS_SECONDS:
+            self.last = now
+            self.report(now)
+
+    def report(self, now: float = None) -> None:
+        now = time.perf_counter() if now is None else now
+        rate = self.chars / max(now - self.start, 1e-9) / 1e6
+        done = f" ({100 * min(self.chars / self.total, 1.0):.0f}%)" if self.total else ""
+        print(f"  {self.label}: {self.chars / 1e6:.0f} MB{done}, {self.objects} books, {rate:.1f} MB/s", flush=True)
+
+
+def validate_books(path, max_workers: int = None, output_path=None, batch_chars: int = BATCH_CHARS) -> tuple:
+    """
+    Validate every book of a plain or zstd file, optionally writing the decompressed text as it is read.
+    Returns (number of valid books, errors).
+    """
+    progress = Progress(path, "validated")
+    count, errors = 0, []
+    with open_books(path) as stream:
+        out = open(output_path, "w", encoding="utf-8") if output_path is not None else None
+        try:
+
+            def batches():
+                for batch in iter_batches(stream, batch_chars):
+                    if out is not None:
+                        out.write(batch)
+                    progress.update(len(batch), 0)
+                    yield batch
+
+            for batch_count, batch_errors in map_ordered(validate_batch, batches(), max_workers):
+                count += batch_count
+                errors.extend(batch_errors)
+                progress.update(0, batch_count)
+        finally:
+            if out is not None:
+                out.close()
+    return count, errors
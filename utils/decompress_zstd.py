@@ -1,33 +1,29 @@
 """Test file decompression and validate data structure is valid JSON."""
 
-import json
-import zstandard as zstd
-
-
-def decompress(input_path: str, save_output: bool = False):
-    """Decompress zst files assuming newline char to indicate different sims."""
-
-    def json_validate(json_blob):
-        """Validate each uncompressed result to ensure valid json format."""
-        try:
-            _ = json.loads(json_blob)
-        except json.decoder.JSONDecodeError:
-            print("Invalid JSON!")
-            raise RuntimeError("Invalid JSON")
-
-    decompressor = zstd.ZstdDecompressor()
-    with open(input_path, "rb") as f:
-        with decompressor.stream_reader(f) as reader:
-            decompressed_data = reader.read().decode("utf-8")
-
-    all_sims = decompressed_data.split("\n")
-    for sim in all_sims:
-        if sim.strip():
-            json_validate(sim)
-
-    if save_output:
-        with open("decompressed.jsonl", "w", encoding="UTF-8") as f:
-            f.write(json.dumps(decompressed_data, indent=4))
+import sys
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(ROOT_PATH))
+
+from utils.books_stream import validate_books
+
+
+def decompress(input_path: str, save_output: bool = False, output_path: str = "decompressed.jsonl", max_workers=None):
+    """
+    Decompress zst files assuming newline char to indicate different sims.
+    The stream is read and validated in bounded batches across a process pool, with the decompressed books
+    written to output_path as they are read when save_output is set. Returns the number of books.
+    """
+    num_books, errors = validate_books(input_path, max_workers, output_path if save_output else None)
+    if errors:
+        print("Invalid JSON!")
+        for error in errors[:10]:
+            print(f"  {error}")
+        raise RuntimeError("Invalid JSON")
+    print(f"{num_books} valid books in {input_path}")
+    return num_books
 
 
 if __name__ == "__main__":
@@ -1,102 +1,113 @@
+from collections import Counter
 from src.config.paths import PATH_TO_GAMES
-from collections import defaultdict
+from src.write_data.sim_histograms import WinHistograms
+from utils.analysis.lut_statistics import LookupTable, weight_distribution
+import numpy as np
 import os
 
 
-def get_unoptimized_hits(lut_path, all_modes, win_ranges):
-    """Calculate hit-rates of simulation output lookup table."""
-    all_modes_base_dist = defaultdict(lambda: defaultdict(int))
-    total_mode_count = {}
-    for mode in all_modes:
-        base_lut_file = os.path.join(lut_path, "lookUpTable_" + str(mode) + ".csv")
-        lut = open(base_lut_file, "r", encoding="UTF-8")
-        counter = 0
-        for line in lut:
-            _, _, payout = line.strip().split(",")
-            all_modes_base_dist[mode][float(round(int(payout) / 100, 2))] += 1
-            counter += 1
+def load_histograms(lut_path, mode):
+    """Win histograms written during simulation, None for libraries created before they existed."""
+    histogram_file = os.path.join(lut_path, f"histograms_{mode}.json")
+    if not os.path.isfile(histogram_file):
+        return None
+    return WinHistograms.load(histogram_file)
 
-        total_mode_count[mode] = counter
 
-    # Segregate to win-ranges
-    all_modes_range_hits = {}
-    for mode in all_modes:
-        all_modes_range_hits[mode] = {}
-        for wr in win_ranges:
-            all_modes_range_hits[mode][wr] = 0
+def histogram_range_counts(counts, win_ranges):
+    """Simulation counts of payouts (lookup table units) within each [low, high) multiplier range."""
+    totals = []
+    for low, high in win_ranges:
+        totals.append(sum(n for payout, n in counts.items() if low <= payout / 100 < high))
+    return totals
 
-        for payout in list(all_modes_base_dist[mode].keys()):
-            for wr in win_ranges:
-                if payout >= wr[0] and payout < wr[1]:
-                    all_modes_range_hits[mode][wr] += all_modes_base_dist[mode][payout]
-                    break
 
+def get_unoptimized_hits(lut_path, all_modes, win_ranges):
+    """Calculate hit-rates of simulation output lookup table, from the simulation histograms when up to date."""
+    all_modes_range_hits = {}
     all_modes_hit_rates = {}
     for mode in all_modes:
+        base_lut_file = os.path.join(lut_path, "lookUpTable_" + str(mode) + ".csv")
+        histograms = load_histograms(lut_path, mode)
+        if histograms is not None and histograms.describes(base_lut_file):
+            range_counts = histogram_range_counts(histograms.payout, win_ranges)
+            num_sims = histograms.num_sims
+        else:
+            lookup_table = LookupTable.from_csv(base_lut_file)
+            range_counts = lookup_table.range_weights(win_ranges, weighted=False)
+            num_sims = len(lookup_table)
+        all_modes_range_hits[mode] = dict(zip(win_ranges, range_counts))
+
         all_modes_hit_rates[mode] = {}
-        for wr in win_ranges:
-            try:
-                all_modes_hit_rates[mode][wr] = round(
-                    1 / (all_modes_range_hits[mode][wr] / total_mode_count[mode]), 3
-                )
-            except ZeroDivisionError:
-                all_modes_hit_rates[mode][wr] = 0
+        for wr, count in zip(win_ranges, range_counts):
+            all_modes_hit_rates[mode][wr] = round(1 / (count / num_sims), 3) if count > 0 else 0
     return all_modes_hit_rates, all_modes_range_hits
 
 
-def make_split_win_distribution(lut_file, split_file, all_modes, base_mode_name="basegame"):
+def read_split_columns(split_file):
+    """Return criteria, basegame and freegame win columns of a segmented lookup table."""
+    columns = np.loadtxt(split_file, delimiter=",", dtype=str, ndmin=2)
+    return columns[:, 1], columns[:, 2].astype(np.float64), columns[:, 3].astype(np.float64)
+
+
+def make_split_win_distribution(lut_file, split_file, all_modes, base_mode_name="basegame", lookup_table=None):
     """Separate probability information for different game-types."""
-    combined_distributions = defaultdict(lambda: defaultdict(float))
     all_modes.append("cumulative")
-    split = open(split_file, "r", encoding="UTF-8")
-    lut = open(lut_file, "r", encoding="UTF-8")
-
-    all_base, all_free, all_fences = [], [], []
-    for line in split:
-        idx, idv_fence, base_win, free_win = line.strip().split(",")
-        all_base.append(float(base_win))
-        all_free.append(float(free_win))
-        if str(idv_fence) == "0":
-            idv_fence = base_mode_name
-        all_fences.append(str(idv_fence))
-
-    all_weights = []
-    for line in lut:
-        _, weight, _ = line.strip().split(",")
-        all_weights.append(int(weight))
-    total_lut_weight = int(sum(all_weights))
-
-    for idx, _ in enumerate(all_weights):
-        if base_mode_name in all_modes:
-            combined_distributions[base_mode_name][all_base[idx]] += all_weights[idx]
-
-        if all_fences[idx] != base_mode_name and all_fences[idx] != "wincap":
-            combined_distributions[all_fences[idx]][all_free[idx]] += all_weights[idx]
-        else:
-            for mode in all_modes:
-                if mode != base_mode_name and mode != "cumulative":
-                    combined_distributions[mode][all_free[idx]] += all_weights[idx]
-            if (all_free[idx] != 0) and (all_fences[idx] == base_mode_name):
-                raise ValueError("Non-Zero FreeGame win in baseGame Fence.")
+    all_fences, all_base, all_free = read_split_columns(split_file)
+    all_fences = np.where(all_fences == "0", base_mode_name, all_fences)
+    if lookup_table is None:
+        lookup_table = LookupTable.from_csv(lut_file)
+    all_weights = lookup_table.weights
+    total_lut_weight = lookup_table.total_weight
 
-        # Construct cumulative hit-rate data
-        combined_distributions["cumulative"][all_base[idx] + all_free[idx]] += all_weights[idx]
+    base_fences = (all_fences == base_mode_name) | (all_fences == "wincap")
+    if np.any((all_free != 0) & (all_fences == base_mode_name)):
+        raise ValueError("Non-Zero FreeGame win in baseGame Fence.")
 
-    # Sort all dictionaries by payout
-    all_sorted_payouts = {}
     all_sorted_distributions = {}
     for mode in all_modes:
-        all_sorted_payouts[mode] = sorted(list(combined_distributions[mode].keys()))
-        all_sorted_distributions[mode] = {}
-
-    for mode in all_modes:
-        mode_pays = list(all_sorted_payouts[mode])
-        for pay in mode_pays:
-            all_sorted_distributions[mode][pay] = combined_distributions[mode][pay]
+        if mode == base_mode_name:
+            wins, weights = all_base, all_weights
+        elif mode == "cumulative":
+            wins, weights = all_base + all_free, all_weights
+        else:
+            # freegame wins of this fence, plus every basegame/wincap simulation
+            mask = (all_fences == mode) | base_fences
+            wins, weights = all_free[mask], all_weights[mask]
+        unique_wins, unique_weights = weight_distribution(wins, weights)
+        all_sorted_distributions[mode] = dict(zip(unique_wins.tolist(), unique_weights.astype(np.float64).tolist()))
 
     return all_sorted_distributions, total_lut_weight
 
 
+def make_split_win_distribution_from_histograms(histograms, all_modes, base_mode_name="basegame"):
+    """make_split_win_distribution() for an unoptimized (unit weight) lookup table, using simulation histograms."""
+    all_modes.append("cumulative")
+    fences = {}
+    for criteria, hists in histograms.criteria.items():
+        fence = base_mode_name if criteria == "0" else criteria
+        merged = fences.setdefault(fence, {kind: Counter() for kind in hists})
+        for kind, counts in hists.items():
+            merged[kind].update(counts)
+
+    if any(win != 0 for win in fences.get(base_mode_name, {}).get("free", {})):
+        raise ValueError("Non-Zero FreeGame win in baseGame Fence.")
+
+    all_sorted_distributions = {}
+    for mode in all_modes:
+        counts = Counter()
+        for fence, hists in fences.items():
+            if mode == base_mode_name:
+                counts.update(hists["base"])
+            elif mode == "cumulative":
+                counts.update(hists["total"])
+            elif fence in (mode, base_mode_name, "wincap"):
+                counts.update(hists["free"])
+        all_sorted_distributions[mode] = {win / 100: float(counts[win]) for win in sorted(counts)}
+
+    return all_sorted_distributions, histograms.num_sims
+
+
 def return_hit_rates(all_mode_distributions, total_weight, win_ranges, mode_cost):
     """Calculate hit-rates for game-type specific types."""
     all_modes = list(all_mode_distributions.keys())
@@ -0,0 +1,137 @@
+"""Per-mode PAR sheet analysis, run in parallel and cached by input file fingerprints."""
+
+import os
+import json
+import pickle
+import hashlib
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config.paths import PATH_TO_GAMES, PROJECT_PATH
+from src.write_data.file_fingerprint import get_file_sha256
+from src.write_data.force_index import load_force_index
+from utils.analysis.lut_statistics import LookupTable
+from .get_pay_splits import (
+    return_all_filepaths,
+    make_split_win_distribution,
+    make_split_win_distribution_from_histograms,
+    load_histograms,
+    return_hit_rates,
+    get_unoptimized_hits,
+)
+from .get_symbol_hits import HitRateCalculations, analyse_mode_search_keys
+
+CACHE_PATH = os.path.join(PROJECT_PATH, ".cache", "stat_sheet")
+CACHE_VERSION = 1
+
+
+def get_input_files(game_id: str, mode: str) -> list:
+    """Every file a mode's analysis reads."""
+    library_path = os.path.join(PATH_TO_GAMES, game_id, "library")
+    lookup_path = os.path.join(library_path, "lookup_tables")
+    lut_path, split_path = return_all_filepaths(game_id, mode)
+    return [
+        lut_path,
+        split_path,
+        os.path.join(lookup_path, f"lookUpTable_{mode}.csv"),
+        os.path.join(lookup_path, f"histograms_{mode}.json"),
+        os.path.join(library_path, "forces", f"force_record_{mode}.json"),
+    ]
+
+
+def get_cache_key(task: dict) -> str:
+    """Hash of the analysis parameters and the contents of every input file (missing files included as None)."""
+    fingerprints = [
+        get_file_sha256(f) if os.path.isfile(f) else None for f in get_input_files(task["game_id"], task["mode"])
+    ]
+    return hashlib.sha256(
+        json.dumps([CACHE_VERSION, fingerprints, task], sort_keys=True, default=str).encode("UTF-8")
+    ).hexdigest()
+
+
+def get_cache_name(game_id: str, mode: str) -> str:
+    return os.path.join(CACHE_PATH, f"{game_id}_{mode}.pkl")
+
+
+def load_cached_result(task: dict, cache_key: str):
+    cache_file = get_cache_name(task["game_id"], task["mode"])
+    if not os.path.isfile(cache_file):
+        return None
+    try:
+        with open(cache_file, "rb") as f:
+            cached = pickle.load(f)
+    except (pickle.UnpicklingError, EOFError, OSError):
+        return None
+    return cached["result"] if cached.get("key") == cache_key else None
+
+
+def save_cached_result(task: dict, cache_key: str, result: dict) -> None:
+    os.makedirs(CACHE_PATH, exist_ok=True)
+    with open(get_cache_name(task["game_id"], task["mode"]), "wb") as f:
+        pickle.dump({"key": cache_key, "result": result}, f)
+
+
+def analyse_mode(task: dict) -> dict:
+    """
+    All PAR sheet statistics of one mode. The published lookup table and force index are loaded once and
+    shared by the pay-split, symbol and custom key calculations.
+    """
+    game_id, mode, cost = task["game_id"], task["mode"], task["cost"]
+    win_ranges = [tuple(wr) for wr in task["win_ranges"]]
+    lookup_path = os.path.join(PATH_TO_GAMES, game_id, "library", "lookup_tables")
+    lut_path, split_path = return_all_filepaths(game_id, mode)
+
+    lookup_table = LookupTable.from_csv(lut_path)
+    force_index = load_force_index(os.path.join(PATH_TO_GAMES, game_id, "library", "forces"), mode)
+
+    sub_modes = list(task["sub_modes"])
+    histograms = load_histograms(lookup_path, mode)
+    if histograms is not None and histograms.describes(lut_path):
+        # published table is still the unoptimized simulation output
+        distributions, total_weight = make_split_win_distribution_from_histograms(histograms, sub_modes, "basegame")
+    else:
+        distributions, total_weight = make_split_win_distribution(
+            lut_path, split_path, sub_modes, "basegame", lookup_table=lookup_table
+        )
+    hits, probs, rtps = return_hit_rates(distributions, total_weight, win_ranges, cost)
+    mode_hit_rates, mode_hit_counts = get_unoptimized_hits(lookup_path, [mode], win_ranges)
+
+    GameObject = HitRateCalculations(game_id, mode, cost, lookup_table=lookup_table, force_index=force_index)
+    return {
+        "split_hit_rates": {
+            "all_gameType_hits": hits,
+            "all_gameType_probs": probs,
+            "all_gameType_rtp": rtps,
+        },
+        "range_hit_rates": mode_hit_rates[mode],
+        "range_hit_counts": mode_hit_counts[mode],
+        "symbol": analyse_mode_search_keys(GameObject, task["symbol_keys"]),
+        "custom": analyse_mode_search_keys(GameObject, task["custom_keys"]),
+    }
+
+
+def analyse_all_modes(tasks: list, max_workers: int = None, use_cache: bool = True) -> dict:
+    """Run analyse_mode for each task across a process pool, skipping modes whose inputs are unchanged."""
+    results, pending = {}, []
+    for task in tasks:
+        cache_key = get_cache_key(task) if use_cache else None
+        cached = load_cached_result(task, cache_key) if use_cache else None
+        if cached is not None:
+            print(f"Using cached statistics for mode '{task['mode']}'")
+            results[task["mode"]] = cached
+        else:
+            pending.append((task, cache_key))
+
+    if max_workers is None:
+        max_workers = min(len(pending), os.cpu_count() or 1)
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(analyse_mode, task) for task, _ in pending]
+            computed = [future.result() for future in futures]
+    else:
+        computed = [analyse_mode(task) for task, _ in pending]
+
+    for (task, cache_key), result in zip(pending, computed):
+        if use_cache:
+            save_cached_result(task, cache_key, result)
+        results[task["mode"]] = result
+    return results
@@ -3,13 +3,8 @@ import importlib
 import sys
 import os
 
-from .get_pay_splits import (
-    return_all_filepaths,
-    make_split_win_distribution,
-    return_hit_rates,
-    get_unoptimized_hits,
-)
-from .get_symbol_hits import construct_symbol_probabilities, construct_custom_key_probabilities
+from .get_symbol_hits import construct_symbol_keys, check_force_files
+from .mode_analysis import analyse_all_modes
 
 
 def get_config_class(game_id):
@@ -25,7 +20,15 @@ def get_config_class(game_id):
 class GameInformation:
     """Import game configuration details."""
 
-    def __init__(self, gamestate: object, analysis_ranges=None, modes_to_analyse=None, custom_keys=None):
+    def __init__(
+        self,
+        gamestate: object,
+        analysis_ranges=None,
+        modes_to_analyse=None,
+        custom_keys=None,
+        max_workers: int = None,
+        use_cache: bool = True,
+    ):
         self.game_id = gamestate.config.game_id
         self.modes_to_analyse = modes_to_analyse
         self.config_path = gamestate.output_files.configs["paths"]["be_config"]
@@ -85,12 +88,45 @@ class GameInformation:
 
         self.get_criteria_info()
 
-        self.get_mode_split_hit_rates()
-        self.get_symbol_hit_rates(self.modes_to_analyse)
-        self.get_custom_hit_rates(modes_to_analyse=self.modes_to_analyse, custom_search_keys=self.custom_keys)
-        self.get_range_hit_counts()
+        self.analyse_modes(max_workers=max_workers, use_cache=use_cache)
         print("Successfully loaded PAR-sheet information.")
 
+    def analyse_modes(self, max_workers: int = None, use_cache: bool = True) -> None:
+        """
+        Pay-split, range, symbol and custom key statistics of every mode, computed in parallel with each
+        mode's files loaded once. Modes whose input files are unchanged since the last run are read from cache.
+        """
+        check_force_files(self.config.library_path, self.modes_to_analyse)
+        symbol_keys = construct_symbol_keys(self.config)
+        tasks = []
+        for mode in self.all_modes:
+            analysed = mode in self.modes_to_analyse
+            tasks.append(
+                {
+                    "game_id": self.game_id,
+                    "mode": mode,
+                    "cost": self.cost_mapping[mode],
+                    "win_ranges": [list(wr) for wr in self.win_ranges],
+                    "sub_modes": list(self.mode_fence_info[mode].keys()),
+                    "symbol_keys": symbol_keys if analysed else [],
+                    "custom_keys": self.custom_keys if analysed else [],
+                }
+            )
+        results = analyse_all_modes(tasks, max_workers=max_workers, use_cache=use_cache)
+
+        self.mode_hit_rate_info = {mode: results[mode]["split_hit_rates"] for mode in self.all_modes}
+        self.mode_hit_rates = {mode: results[mode]["range_hit_rates"] for mode in self.all_modes}
+        self.mode_hit_counts = {mode: results[mode]["range_hit_counts"] for mode in self.all_modes}
+        self.hr_summary, self.av_win_summary, self.sim_count_summary = {}, {}, {}
+        self.custom_hr_summary, self.custom_av_win_summary, self.custom_sim_count_summary = {}, {}, {}
+        for mode in self.modes_to_analyse:
+            self.hr_summary[mode], self.av_win_summary[mode], self.sim_count_summary[mode] = results[mode]["symbol"]
+            (
+                self.custom_hr_summary[mode],
+                self.custom_av_win_summary[mode],
+                self.custom_sim_count_summary[mode],
+            ) = results[mode]["custom"]
+
     def load_config(self):
         "Load game config details."
         config_class = get_config_class(self.game_id)
@@ -136,47 +172,3 @@ class GameInformation:
                                 mode_fence_info[mode][fences["name"]] = {}
         self.game_type_fences = game_type_mapping
         self.mode_fence_info = mode_fence_info
-
-    def get_mode_split_hit_rates(self, modes_to_analyse=None) -> None:
-        """Separate win information depending on gametype."""
-        if modes_to_analyse is None:
-            modes_to_analyse = self.all_modes
-        mode_hit_rate_info = {}
-        for mode in modes_to_analyse:
-            mode_hit_rate_info[mode] = {}
-            lut_path, split_path = return_all_filepaths(self.game_id, mode)
-            sub_modes = list(self.mode_fence_info[mode].keys())
-            mode_sorted_distributions, total_mode_weight = make_split_win_distribution(
-                lut_path, split_path, sub_modes, "basegame"
-            )
-            sub_mode_hits, sub_mode_probs, sub_mode_rtp_allocation = return_hit_rates(
-                mode_sorted_distributions, total_mode_weight, self.win_ranges, self.cost_mapping[mode]
-            )
-
-            mode_hit_rate_info[mode]["all_gameType_hits"] = sub_mode_hits
-            mode_hit_rate_info[mode]["all_gameType_probs"] = sub_mode_probs
-            mode_hit_rate_info[mode]["all_gameType_rtp"] = sub_mode_rtp_allocation
-
-        self.mode_hit_rate_info = mode_hit_rate_info
-
-    def get_range_hit_counts(self, modes_to_analyse=None) -> None:
-        """Count raw instances of win ranges using initial lookup table."""
-        if modes_to_analyse is None:
-            modes_to_analyse = self.all_modes
-        self.mode_hit_rates, self.mode_hit_counts = get_unoptimized_hits(
-            self.lutPath, self.all_modes, self.win_ranges
-        )
-
-    def get_symbol_hit_rates(self, modes_to_analyse: list) -> None:
-        """Extract symbols from config file and get statistics using optimized lookup tables."""
-        self.hr_summary, self.av_win_summary, self.sim_count_summary = construct_symbol_probabilities(
-            self.config, modes_to_analyse
-        )
-
-    def get_custom_hit_rates(self, modes_to_analyse: list, custom_search_keys: list[dict]) -> None:
-        """Compute hit rates of user defined search conditions."""
-        assert modes_to_analyse is not None, "specify which mode/s to assess"
-        assert custom_search_keys is not None
-        self.custom_hr_summary, self.custom_av_win_summary, self.custom_sim_count_summary = (
-            construct_custom_key_probabilities(self.config, modes_to_analyse, custom_search=custom_search_keys)
-        )
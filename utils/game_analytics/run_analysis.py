@@ -10,8 +10,8 @@ from utils.game_analytics.retrieve_game_information import GameInformation
 from utils.game_analytics.print_all_results import PrintJSON, PrintXLSX
 
 
-def create_stat_sheet(game: str, custom_keys: List[Dict] = None):
-    """Function executed from run file."""
-    game_obj = GameInformation(game, custom_keys=custom_keys)
+def create_stat_sheet(game: str, custom_keys: List[Dict] = None, max_workers: int = None, use_cache: bool = True):
+    """Function executed from run file. Modes are analysed in parallel, unchanged modes are read from cache."""
+    game_obj = GameInformation(game, custom_keys=custom_keys, max_workers=max_workers, use_cache=use_cache)
     PrintJSON(game_obj)
     PrintXLSX(game_obj)
@@ -12,21 +12,20 @@ Obtain and compare file hash using SHA256
 """
 
 import os
-import hashlib
+import sys
 import argparse
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(ROOT_PATH))
+
+from src.write_data.file_fingerprint import get_file_sha256
 
 
 def get_hash(filepath: str) -> str:
-    """Get hexadecimal representation of data file."""
-    sha_file = hashlib.sha256()
-    with open(filepath, "rb") as f:
-        while True:
-            data = f.read(65536)
-            if not data:
-                break
-            sha_file.update(data)
-    hexrep = sha_file.hexdigest()
-    return hexrep
+    """Get hexadecimal representation of data file, cached until the file changes."""
+    return get_file_sha256(filepath)
 
 
 def get_file_hash(*args: str) -> None:
@@ -1,98 +1,134 @@
 """Lookup table properties and helpful functions"""
 
 import os
-from collections import defaultdict
 import numpy as np
 
+from src.write_data.sim_summary import load_summary
+from utils.analysis.lut_statistics import LookupTable
+
+WRITE_BLOCK = 1 << 16
+
 
 class LookupProperties:
-    """Extract lookup table characteristics"""
+    """Extract lookup table characteristics, columns are held as arrays with a criteria code per row."""
 
     def __init__(self, game_id, mode):
         self.game_id = game_id
-        self.lookup_path = os.path.join("games", game_id, "library", "publish_files", f"LookUpTable_{mode}_0.csv")
-        self.segment_path = os.path.join(
-            "games", game_id, "library", "lookup_tables", f"LookupTableSegmented_{mode}.csv"
-        )
-        self.payouts = []
-        self.payouts_ints = []
-        self.weights_ints = []
-        self.weights_norm = []
-        self.segmented_array = []
-        self.total_weight = 0
-        self.segmented_mapping = defaultdict(str)
-        self.unique_critera = list(set(self.segmented_array))
-        self.criteria_mapping = defaultdict(list)
-        self.win_mapping = defaultdict(list)
-        self.weight_mapping = defaultdict(list)
-        self.read_lookup_table()
-        self.read_segmented_table()
-        self.extract_criteria_indicies()
-
-    def read_lookup_table(self):
-        "read csv lookup table"
-        with open(self.lookup_path, "r", encoding="utf-8") as f:
-            for line in f:
-                _, w, p = line.strip().split(",")
-                self.payouts.append(round(int(p) / 100, 3))
-                self.payouts_ints.append(int(p))
-                self.weights_ints.append(int(w))
-                self.total_weight += int(w)
-
-        self.weights_norm = [w / self.total_weight for w in self.weights_ints]
-
-    def read_segmented_table(self):
-        "find criteria mapping"
-        with open(self.segment_path, "r", encoding="utf-8") as f:
-            for line in f:
-                idx, criteria, _, _ = line.strip().split(",")
-                self.segmented_mapping[int(idx)] = criteria
-                self.segmented_array.append(criteria)
-
-    def extract_criteria_indicies(self):
-        "find loookup index for all unique criteria"
-        for idx, entry in enumerate(self.segmented_array):
-            self.criteria_mapping[entry].append(idx)
-            self.win_mapping[entry].append(self.payouts[idx])
-            self.weight_mapping[entry].append(self.weights_ints[idx])
+        library_path = os.path.join("games", game_id, "library")
+        self.lookup_path = os.path.join(library_path, "publish_files", f"lookUpTable_{mode}_0.csv")
+        self.segment_path = os.path.join(library_path, "lookup_tables", f"lookUpTableSegmented_{mode}.csv")
+        self.summary_path = os.path.join(library_path, "lookup_tables", f"summary_{mode}")
+
+        table = LookupTable.from_csv(self.lookup_path)
+        self.ids = table.ids
+        self.weights_ints = table.weights
+        self.payouts_ints = table.payouts
+        self.payouts = np.round(self.payouts_ints / 100, 3)
+        self.total_weight = table.total_weight
+        self.criteria_codes, self.criteria_names = self.read_criteria()
+
+    def read_criteria(self) -> tuple:
+        "criteria code of every row, from the memory-mapped simulation summary or the segmented table"
+        if os.path.isdir(self.summary_path):
+            summary = load_summary(self.summary_path, columns=["id", "criteria"])
+            if np.array_equal(summary["id"], self.ids):
+                return np.asarray(summary["criteria"], dtype=np.int64), list(summary["criteria_names"])
+
+        segmented = np.loadtxt(self.segment_path, delimiter=",", dtype=str, usecols=(0, 1), ndmin=2)
+        assert np.array_equal(segmented[:, 0].astype(np.uint64), self.ids), "segmented table does not match lookup"
+        names, codes = np.unique(segmented[:, 1], return_inverse=True)
+        return codes.astype(np.int64), names.tolist()
+
+    def criteria_mask(self, target_criteria) -> np.ndarray:
+        "rows belonging to the given criteria"
+        if target_criteria not in self.criteria_names:
+            return np.zeros(len(self.ids), dtype=bool)
+        return self.criteria_codes == self.criteria_names.index(target_criteria)
 
     def calculate_criteria_av_win(self, target_criteria):
         "find average win conditional on the given criteria"
-        subset_weights = np.array(self.weight_mapping[target_criteria])
-        subset_payouts = np.array(self.win_mapping[target_criteria])
-        return float(subset_payouts @ subset_weights) / self.total_weight
+        mask = self.criteria_mask(target_criteria)
+        return float(self.payouts[mask] @ self.weights_ints[mask].astype(np.float64)) / self.total_weight
+
+
+def align_swap_rows(base_table: LookupProperties, bonus_table: LookupProperties, swap_keys: list) -> tuple:
+    """
+    Row indexes of every swap key in both tables, paired in table order, and the swap key index of each pair.
+    The base and bonus subsets of each key must have identical payouts.
+    """
+    base_rows, bonus_rows = [], []
+    for key in swap_keys:
+        base_key_rows = np.flatnonzero(base_table.criteria_mask(key))
+        bonus_key_rows = np.flatnonzero(bonus_table.criteria_mask(key))
+        assert len(base_key_rows) == len(bonus_key_rows), f"{key} payout arrays do not match in length"
+        assert np.array_equal(
+            base_table.payouts_ints[base_key_rows], bonus_table.payouts_ints[bonus_key_rows]
+        ), f"{key} payout arrays must be identical"
+        base_rows.append(base_key_rows)
+        bonus_rows.append(bonus_key_rows)
+
+    key_index = np.repeat(np.arange(len(swap_keys)), [len(rows) for rows in base_rows])
+    return np.concatenate(base_rows), np.concatenate(bonus_rows), key_index
+
+
+def solve_target_hit_rates(
+    base_table: LookupProperties, bonus_table: LookupProperties, swap_rows: tuple, num_keys: int, mode_cost: float
+) -> tuple:
+    """
+    Trigger probability of every swap key which keeps its base-game RTP contribution when its outcomes take the
+    bonus table's distribution. Returns (hit-rates, base RTP contributions, bonus average wins) per key.
+    """
+    base_rows, bonus_rows, key_index = swap_rows
+    base_contribution = np.bincount(
+        key_index,
+        weights=base_table.payouts[base_rows] * base_table.weights_ints[base_rows].astype(np.float64),
+        minlength=num_keys,
+    )
+    base_contribution = base_contribution / base_table.total_weight / mode_cost
+    bonus_av_win = np.bincount(
+        key_index,
+        weights=bonus_table.payouts[bonus_rows] * bonus_table.weights_ints[bonus_rows].astype(np.float64),
+        minlength=num_keys,
+    )
+    bonus_av_win = bonus_av_win / bonus_table.total_weight
+    return base_contribution / bonus_av_win, base_contribution, bonus_av_win
 
 
 def calculate_new_freegame_probabilities(
     base_table: LookupProperties,
     bonus_table: LookupProperties,
-    target_hr: float,
-    freegame_key: str,
+    target_hrs: np.ndarray,
+    swap_rows: tuple,
 ):
-    """merge optimized bonus lookup into base"""
-    fg_rtp_contribution, fg_act_hr = 0.0, 0.0
-    new_base_weights = []
-    fg_weight_contribution = []
-    counter = 0
-
-    total_base_weight = base_table.total_weight
-    for idx, bp in enumerate(base_table.payouts):
-        if idx in base_table.criteria_mapping[freegame_key]:
-            assert bp == bonus_table.win_mapping[freegame_key][counter]
-            w = target_hr * (bonus_table.weight_mapping[freegame_key][counter] / bonus_table.total_weight)
-            fg_rtp_contribution += bp * w
-            fg_act_hr += w
-            new_base_weights.append(int(total_base_weight * w))
-            fg_weight_contribution.append(int(total_base_weight * w))
-            counter += 1
-        else:
-            new_base_weights.append(base_table.weights_ints[idx])
+    """merge optimized bonus lookup into base, for all swap keys at once"""
+    base_rows, bonus_rows, key_index = swap_rows
+    num_keys = len(target_hrs)
+    probabilities = target_hrs[key_index] * (
+        bonus_table.weights_ints[bonus_rows].astype(np.float64) / bonus_table.total_weight
+    )
+    fg_weight_contribution = (base_table.total_weight * probabilities).astype(np.uint64)
+    new_base_weights = base_table.weights_ints.copy()
+    new_base_weights[base_rows] = fg_weight_contribution
 
+    fg_rtp_contribution = np.bincount(
+        key_index, weights=base_table.payouts[base_rows] * probabilities, minlength=num_keys
+    )
+    fg_act_hr = np.bincount(key_index, weights=probabilities, minlength=num_keys)
     return new_base_weights, fg_rtp_contribution, fg_act_hr, fg_weight_contribution
 
 
-def override_optimized_lookup(filename, base_payout, new_weights, sim_start=1):
-    """write new lookup table weights"""
-    with open(filename, "w", encoding="utf-8") as f:
-        for weight, payout in zip(new_weights, base_payout):
-            f.write(f"{sim_start},{weight},{payout}" + "\n")
+def override_optimized_lookup(filename, ids, base_payout, new_weights):
+    """write new lookup table weights in one streaming pass, swapped in once complete"""
+    temp_name = filename + ".tmp"
+    with open(temp_name, "w", encoding="utf-8") as f:
+        for start in range(0, len(ids), WRITE_BLOCK):
+            stop = start + WRITE_BLOCK
+            f.write(
+                "".join(
+                    f"{idx},{weight},{payout}\n"
+                    for idx, weight, payout in zip(
+                        ids[start:stop].tolist(), new_weights[start:stop].tolist(), base_payout[start:stop].tolist()
+                    )
+                )
+            )
+    os.replace(temp_name, filename)
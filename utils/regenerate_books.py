@@ -0,0 +1,198 @@
+"""
+Regenerate simulation books on demand from the (book id, criteria, seed) table written alongside the lookup tables.
+Books are deterministic given the bet mode, criteria and seed, so re-running run_spin reproduces the stored book.
+
+Example:
+    python utils/regenerate_books.py -g 0_0_lines -m base -i 1 2 3 -o samples.jsonl
+    python utils/regenerate_books.py -g 0_0_lines -m base --all
+"""
+
+import argparse
+import importlib
+import json
+import os
+import sys
+import warnings
+from pathlib import Path
+
+ROOT_PATH = Path(__file__).resolve().parents[1]
+if str(ROOT_PATH) not in sys.path:
+    sys.path.insert(0, str(ROOT_PATH))
+
+from src.config.paths import PATH_TO_GAMES
+from src.state.repeat_stats import RepeatStats
+from src.wins.win_manager import WinManager
+from src.write_data.write_data import write_book_frames, write_book_index_rows
+
+GAME_MODULES = ["gamestate", "game_override", "game_executables", "game_calculations", "game_events", "game_config"]
+
+
+def load_gamestate(game_id: str) -> object:
+    """Import a game's GameConfig/GameState from games/<game_id> and return a fresh gamestate."""
+    game_path = os.path.join(PATH_TO_GAMES, game_id)
+    if not os.path.isdir(game_path):
+        raise FileNotFoundError(f"Game folder not found: {game_path}")
+    # Game modules use flat imports (from game_override import ...), clear any previously loaded game
+    for name in GAME_MODULES:
+        sys.modules.pop(name, None)
+    sys.path.insert(0, game_path)
+    try:
+        config = importlib.import_module("game_config").GameConfig()
+        gamestate = importlib.import_module("gamestate").GameState(config)
+    finally:
+        sys.path.remove(game_path)
+    return gamestate
+
+
+def read_seed_table(gamestate: object, betmode: str) -> dict:
+    """Return {book_id: (criteria, seed)} from lookUpTableSeeds_<mode>.csv."""
+    seed_file = gamestate.output_files.get_final_seed_name(betmode)
+    if not os.path.isfile(seed_file):
+        raise FileNotFoundError(f"Seed table not found: {seed_file}\nRe-run create_books to write the seed table.")
+    seed_table = {}
+    with open(seed_file, "r", encoding="UTF-8") as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            book_id, criteria, seed = line.strip().split(",")
+            seed_table[int(book_id)] = (criteria, int(seed))
+    return seed_table
+
+
+def read_seed_settings(gamestate: object, betmode: str) -> dict:
+    """Return the rng settings recorded in the seed table header, None for tables written without one."""
+    with open(gamestate.output_files.get_final_seed_name(betmode), "r", encoding="UTF-8") as f:
+        first_line = f.readline()
+    if not first_line.startswith("#"):
+        return None
+    return json.loads(first_line[1:])
+
+
+def check_seed_settings(gamestate: object, betmode: str) -> None:
+    """Raise if the current config would not redraw the books recorded in the seed table."""
+    settings = read_seed_settings(gamestate, betmode)
+    if settings is None:
+        warnings.warn(f"Seed table for {betmode} does not record rng settings, regenerated books are unchecked.")
+        return
+    current = {name: getattr(gamestate.config, name, None) for name in gamestate.config.rng_settings}
+    if settings != current:
+        raise RuntimeError(
+            f"Seed table for {betmode} was written with {settings}, current config has {current}. "
+            "Restore those settings or re-run create_books."
+        )
+
+
+def read_lookup_payouts(gamestate: object, betmode: str) -> dict:
+    """Return {book_id: payout} from the simulated lookUpTable_<mode>.csv."""
+    payouts = {}
+    with open(gamestate.output_files.get_final_lookup_name(betmode), "r", encoding="UTF-8") as f:
+        for line in f:
+            book_id, _, payout = line.strip().split(",")
+            payouts[int(book_id)] = int(payout)
+    return payouts
+
+
+def iter_regenerated_books(gamestate: object, betmode: str, book_ids: list, seed_table: dict = None):
+    """
+    Re-run run_spin for each book id and yield the book JSON objects, in the order requested.
+    Each book's payoutMultiplier is checked against its lookup table row.
+    """
+    if seed_table is None:
+        seed_table = read_seed_table(gamestate, betmode)
+    betmode_obj = gamestate.get_betmode(betmode)
+    if betmode_obj is None:
+        raise RuntimeError(f"Bet mode '{betmode}' is not defined in {gamestate.config.game_id}")
+    check_seed_settings(gamestate, betmode)
+    lookup_payouts = read_lookup_payouts(gamestate, betmode)
+
+    gamestate.betmode = betmode
+    gamestate.win_manager = WinManager(
+        gamestate.config.basegame_type, gamestate.config.freegame_type, betmode_obj.get_wincap()
+    )
+    gamestate.repeat_stats = RepeatStats()
+
+    for book_id in map(int, book_ids):
+        if book_id not in seed_table:
+            raise KeyError(f"Book id {book_id} is not in the {betmode} seed table")
+        criteria, seed = seed_table[book_id]
+        gamestate.library = {}
+        gamestate.criteria = criteria
+        gamestate.run_spin(book_id - 1, seed)
+        book = gamestate.library[book_id]
+        if book["payoutMultiplier"] != lookup_payouts.get(book_id):
+            raise RuntimeError(
+                f"Regenerated book {book_id} pays {book['payoutMultiplier']}, "
+                f"lookup table has {lookup_payouts.get(book_id)}."
+            )
+        yield book
+
+
+def regenerate_books(gamestate: object, betmode: str, book_ids: list, seed_table: dict = None) -> list:
+    """Re-run run_spin for each book id and return the book JSON objects, in the order requested."""
+    return list(iter_regenerated_books(gamestate, betmode, book_ids, seed_table))
+
+
+def write_mode_books(gamestate: object, betmode: str) -> str:
+    """
+    Regenerate every book of a mode into the compressed books file and index create_books would have written.
+    Returns the books filename.
+    """
+    filename = gamestate.output_files.get_final_book_name(betmode, True)
+    seed_table = read_seed_table(gamestate, betmode)
+    block_size = max(int(getattr(gamestate.config, "books_per_block", 1000)), 1)
+    books = iter_regenerated_books(gamestate, betmode, sorted(seed_table), seed_table)
+    with open(filename, "wb") as f:
+        frames = write_book_frames(f, books, block_size)
+    with open(gamestate.output_files.get_book_index_name(betmode), "w", encoding="UTF-8") as index_out:
+        write_book_index_rows(index_out, frames)
+    return filename
+
+
+def write_books(books: list, filename: str) -> None:
+    """Write regenerated books as JSONL (optionally .zst compressed)."""
+    data = "".join(json.dumps(book) + "\n" for book in books)
+    if filename.endswith(".zst"):
+        import zstandard as zstd
+
+        with open(filename, "wb") as f:
+            f.write(zstd.ZstdCompressor().compress(data.encode("UTF-8")))
+    else:
+        with open(filename, "w", encoding="UTF-8") as f:
+            f.write(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Regenerate books from the seed table.")
+    parser.add_argument("-g", dest="game_id", type=str, required=True, help="Enter str format for game_id: '0_0_0'")
+    parser.add_argument("-m", dest="game_mode", type=str, required=True, help="Enter str format: 'base', 'bonus'...")
+    parser.add_argument("-i", dest="book_ids", type=int, nargs="*", help="Book ids to regenerate")
+    parser.add_argument("-c", dest="criteria", type=str, help="Regenerate all books of a criteria instead of -i")
+    parser.add_argument("-n", dest="limit", type=int, default=None, help="Max books to regenerate with -c")
+    parser.add_argument("-o", dest="output", type=str, default=None, help="Output .jsonl/.jsonl.zst, default stdout")
+    parser.add_argument("--all", dest="all_books", action="store_true", help="Write every book to the publish folder")
+    args = parser.parse_args()
+
+    gamestate = load_gamestate(args.game_id)
+    if args.all_books:
+        filename = write_mode_books(gamestate, args.game_mode)
+        print(f"Wrote {args.game_mode} books to {filename}")
+        return
+    seed_table = read_seed_table(gamestate, args.game_mode)
+    if args.criteria is not None:
+        book_ids = sorted(k for k, v in seed_table.items() if v[0] == args.criteria)[: args.limit]
+    elif args.book_ids:
+        book_ids = args.book_ids
+    else:
+        parser.error("pass book ids with -i or a criteria with -c")
+
+    books = regenerate_books(gamestate, args.game_mode, book_ids, seed_table)
+    if args.output is None:
+        for book in books:
+            print(json.dumps(book))
+    else:
+        write_books(books, args.output)
+        print(f"Wrote {len(books)} books to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
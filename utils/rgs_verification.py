@@ -8,24 +8,14 @@ import os
 import warnings
 import argparse
 import importlib
+from concurrent.futures import ProcessPoolExecutor
 from itertools import combinations
 from io import TextIOWrapper
-import numpy as np
 import zstandard as zst
 import hashlib
-import pickle
-from utils.analysis.distribution_functions import (
-    make_win_distribution,
-    get_distribution_moments,
-    get_distribution_average,
-    non_zero_hitrate,
-    prob_less_than_bet,
-    get_prob_no_win,
-    get_maxwin_hitrate,
-    get_distribution_median,
-    min_dist_difference,
-    calculate_rtp,
-)
+from utils.analysis.lut_statistics import LookupTable
+from utils.get_file_hash import get_hash
+from utils.regenerate_books import iter_regenerated_books, load_gamestate
 
 
 class WinStatistics:
@@ -84,152 +74,171 @@ class WinStatistics:
         return map_object
 
 
-def verify_lookup_format(filename: str) -> list:
+def verify_lookup_format(filename: str) -> LookupTable:
     "Duplicate RGS verification before upload."
-    integer_payouts = []
-    running_weight_total = 0
-    min_win, max_win = None, None
-    win_distribution = make_win_distribution(filename)
+    lookup_table = LookupTable.from_csv(filename)
+    lookup_table.verify()
+    return lookup_table
 
-    with open(filename, "r", encoding="UTF-8") as f:
-        for line in f:
-            _, weight, payout = line.strip().split(",")
-            weight = float(weight)
-            payout = float(payout)
 
-            # Payout checks
-            assert payout.is_integer() and payout >= 0, "Payout mult be uint64 format:"
-            if payout > 0:
-                assert payout >= 10, "Minimum non-zero payout is 10 (RGS accepts 'cents' increments)."
-            assert payout % 10 == 0, "Payout values must be in increments of 10."
-            integer_payouts.append(int(payout))
+class HashingReader:
+    """File wrapper updating a SHA256 digest with every chunk read, so books are hashed while decoding."""
 
-            if (min_win is None) or (payout < min_win):
-                min_win = payout
-            if (max_win is None) or (payout > max_win):
-                max_win = payout
-            # Weight checks
-            assert weight.is_integer() and weight >= 0, "Weight must be uint64 format."
-            running_weight_total += weight
+    def __init__(self, file):
+        self.file = file
+        self.sha256 = hashlib.sha256()
 
-    assert running_weight_total <= np.iinfo(np.uint64).max, "Sum of weights must be <= MAX(uint64)"
-
-    return win_distribution, integer_payouts, running_weight_total, min_win, max_win
+    def read(self, size: int = -1) -> bytes:
+        data = self.file.read(size)
+        self.sha256.update(data)
+        return data
 
 
 # payout mult value match to lut + length match
-def verify_books_and_payout_mults(books_filename: str) -> list:
-    """Ensure the values written to the books match those in the lookup table exactly."""
+def verify_book_objects(books, lookup_table: LookupTable) -> int:
+    """
+    Check each book against the lookup table row at the same position (id, ordering, payout).
+    Books may be any iterable, memory use does not depend on the number of books. Returns the event count.
+    """
+    lut_ids, lut_payouts = lookup_table.ids, lookup_table.payouts
+    num_books, total_num_events = 0, 0
+    previous_id = None
+    for blob in books:
+        for key in ["payoutMultiplier", "id", "events"]:
+            if key not in blob:
+                raise RuntimeError(f"Missing required key: {key}")
+
+        if num_books >= len(lut_ids):
+            raise RuntimeError(f"Books contain more entries than the lookup table ({len(lut_ids)}).")
+        if previous_id is not None and blob["id"] <= previous_id:
+            raise RuntimeError(f"Book ids must be ascending: {blob['id']} follows {previous_id}.")
+        if blob["id"] != lut_ids[num_books]:
+            raise RuntimeError(f"Book id {blob['id']} does not match lookup table id {lut_ids[num_books]}.")
+        if blob["payoutMultiplier"] != lut_payouts[num_books]:
+            raise RuntimeError(
+                f"Mismatch in payout for book {blob['id']}: "
+                f"{blob['payoutMultiplier']} (books) != {lut_payouts[num_books]} (lookup table)."
+            )
+
+        previous_id = blob["id"]
+        num_books += 1
+        total_num_events += len(blob["events"])
+
+    if num_books != len(lut_ids):
+        raise RuntimeError(f"Books contain {num_books} entries, the lookup table has {len(lut_ids)}.")
+    return total_num_events
+
+
+def iter_book_lines(txt_stream):
+    """Yield parsed books from a JSONL text stream, skipping blank lines."""
+    for line in txt_stream:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            raise RuntimeError("Invalid JSON format.")
+
+
+def verify_books_and_payout_mults(books_filename: str, lookup_table: LookupTable) -> tuple:
+    """
+    Stream books and check each against the lookup table row at the same position (id, ordering, payout).
+    Memory use does not depend on the number of books. Returns the event count and the books SHA256.
+    """
     assert str(books_filename).endswith(".jsonl.zstd") or str(books_filename).endswith(
         "jsonl.zst"
     ), "Verification is only run for compressed book files of format .jsonl.zst."
 
-    book_payout_ints = []
-    total_num_events = 0
     with open(books_filename, "rb") as f:
+        hashing_file = HashingReader(f)
         decompressor = zst.ZstdDecompressor()
-        with decompressor.stream_reader(f) as reader:
+        with decompressor.stream_reader(hashing_file, read_across_frames=True) as reader:
             txt_stream = TextIOWrapper(reader, encoding="UTF-8")
-            for line in txt_stream:
-                line = line.strip()
-                if not line:
-                    continue
-
-                try:
-                    blob = json.loads(line)
-                except json.JSONDecodeError:
-                    raise RuntimeError("Invalid JSON format.")
-
-                for key in ["payoutMultiplier", "id", "events"]:
-                    if key not in blob:
-                        raise RuntimeError(f"Missing required key: {key}")
-
-                total_num_events += len(blob["events"])
-                book_payout_ints.append(blob["payoutMultiplier"])
+            total_num_events = verify_book_objects(iter_book_lines(txt_stream), lookup_table)
+            # drain any trailing bytes so the digest covers the whole file
+            while hashing_file.read(1 << 20):
+                pass
 
-    return book_payout_ints, total_num_events
+    return total_num_events, hashing_file.sha256.hexdigest()
 
 
-def compare_payout_values(book_int_payouts, lut_int_payouts) -> None:
-    """Ensure payout multiplier values match between books and lookup tables."""
-    book_ints = pickle.dumps(book_int_payouts)
-    lut_ints = pickle.dumps(lut_int_payouts)
-    assert hashlib.md5(book_ints).hexdigest() == hashlib.md5(lut_ints).hexdigest(), "Mismatch in payout array."
+def verify_regenerated_books(game_id: str, name: str, lookup_table: LookupTable) -> int:
+    """Regenerate a mode's books from its seed table and stream them through the same checks."""
+    gamestate = load_gamestate(game_id)
+    books = iter_regenerated_books(gamestate, name, lookup_table.ids)
+    return verify_book_objects(books, lookup_table)
 
 
-def get_num_non_zero_payouts(book_int_payouts) -> None:
-    """Count non-zero payouts"""
-    return len([p for p in book_int_payouts if p > 0])
-
-
-def get_lut_statistics(
-    win_distribution, bet_cost, unique_payouts, weight_range, min_win, max_win, num_events
-) -> object:
+def get_lut_statistics(lookup_table: LookupTable, bet_cost: float, num_events: int) -> object:
     """Run RGS statistic tests for upload verification."""
-
-    var, std, skew, kurtosis = get_distribution_moments(win_distribution, bet_cost)
-    MathStats = WinStatistics(
-        win_distribution=win_distribution,
-        num_events=num_events,
-        weight_range=weight_range,
-        min_win=min_win,
-        max_win=max_win,
-        min_diff=min_dist_difference(win_distribution),
-        unique_wins=unique_payouts,
-        average_wins=float(get_distribution_average(win_distribution)),
-        rtp=calculate_rtp(win_distribution, bet_cost, weight_range),
-        std=std,
-        var=var,
-        hr_max=get_maxwin_hitrate(win_distribution, weight_range),
-        non_zero_hr=non_zero_hitrate(win_distribution, weight_range),
-        prob_nil=get_prob_no_win(win_distribution, weight_range),
-        prob_less_bet=prob_less_than_bet(win_distribution, bet_cost, weight_range),
-        num_non_zero_payouts=get_num_non_zero_payouts(unique_payouts),
-        skew=skew,
-        excess_kurtosis=kurtosis,
-    )
-    median = get_distribution_median(win_distribution, weight_range)
-    if median > 0:
-        m2m = MathStats.average_win / median
-        MathStats.m2m = m2m
+    return WinStatistics(num_events=num_events, **lookup_table.statistics(bet_cost))
+
+
+def verify_mode(publish_path: str, name: str, cost: float, game_id: str = None) -> object:
+    """
+    Verify a single bet mode's lookup table and books, return its statistics.
+    Without a books file (create_books(store_books=False)) the books of game_id are regenerated from the seed table.
+    """
+    book_file = os.path.join(publish_path, f"books_{name}.jsonl.zst")
+    lut_file = os.path.join(publish_path, f"lookUpTable_{name}_0.csv")
+    if not os.path.exists(lut_file):
+        raise RuntimeError("Lookup file does not exist.")
+    if not os.path.exists(book_file) and game_id is None:
+        raise RuntimeError("Books file does not exist.")
+
+    lookup_table = verify_lookup_format(lut_file)
+    if os.path.exists(book_file):
+        num_events, books_sha = verify_books_and_payout_mults(book_file, lookup_table)
     else:
-        MathStats.m2m = 0
-    return MathStats
-
-
-def execute_all_tests(config, excluded_modes=[]):
-    """Run all tests for a given game"""
-    mode_stats = []
-    mode_rtps = []
-    for bet_mode in config.bet_modes:
-        name = bet_mode.get_name()
-        cost = bet_mode.get_cost()
-        if name not in excluded_modes:
-            book_name = f"books_{name}.jsonl.zst"
-            lookup_name = f"lookUpTable_{name}_0.csv"
-            book_file = os.path.join(config.publish_path, book_name)
-            lut_file = os.path.join(config.publish_path, lookup_name)
-
-            if not (os.path.exists(book_file)) or not (os.path.exists(lut_file)):
-                raise RuntimeError("Books/Lookup file does not exist.")
-
-            win_dist, lut_payouts, weights_range, min_win, max_win = verify_lookup_format(lut_file)
-            book_payouts, num_events = verify_books_and_payout_mults(book_file)
-
-            compare_payout_values(book_payouts, lut_payouts)
-
-            StatsObject = get_lut_statistics(
-                win_dist, cost, lut_payouts, weights_range, min_win, max_win, num_events
-            )
-            mode_rtps.append(StatsObject.rtp)
-            setattr(StatsObject, "name", name)
-            mode_stats.append(StatsObject)
+        print(f"Books file for {name} not found, verifying books regenerated from the seed table.")
+        num_events, books_sha = verify_regenerated_books(game_id, name, lookup_table), ""
+
+    StatsObject = get_lut_statistics(lookup_table, cost, num_events)
+    setattr(StatsObject, "name", name)
+    setattr(StatsObject, "books_sha256", books_sha)
+    setattr(StatsObject, "lut_sha256", get_hash(lut_file))
+    return StatsObject
+
+
+def compare_config_hashes(config_file: str, mode_stats: list) -> None:
+    """Warn if published books/lookup tables differ from the hashes recorded in config.json."""
+    if not os.path.isfile(config_file):
+        return
+    with open(config_file, "r", encoding="UTF-8") as f:
+        book_shelf = {bm["name"]: bm for bm in json.load(f).get("bookShelfConfig", [])}
+    for Stats in mode_stats:
+        mode_config = book_shelf.get(Stats.name)
+        if mode_config is None:
+            continue
+        if mode_config["booksFile"]["sha256"] not in ("", Stats.books_sha256):
+            warnings.warn(f"\n\nBooks hash for mode '{Stats.name}' does not match {config_file}\n")
+        if mode_config["tables"][0]["sha256"] != Stats.lut_sha256:
+            warnings.warn(f"\n\nLookup table hash for mode '{Stats.name}' does not match {config_file}\n")
+
+
+def execute_all_tests(config, excluded_modes=[], max_workers: int = None):
+    """Run all tests for a given game, bet modes are verified in parallel processes."""
+    modes = [(bm.get_name(), bm.get_cost()) for bm in config.bet_modes if bm.get_name() not in excluded_modes]
+    if max_workers is None:
+        max_workers = min(len(modes), os.cpu_count() or 1)
+
+    if max_workers > 1:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                executor.submit(verify_mode, config.publish_path, name, cost, config.game_id) for name, cost in modes
+            ]
+            mode_stats = [future.result() for future in futures]
+    else:
+        mode_stats = [verify_mode(config.publish_path, name, cost, config.game_id) for name, cost in modes]
+    mode_rtps = [Stats.rtp for Stats in mode_stats]
 
     if len(mode_rtps) > 1:
         max_rtp_diff = max(abs(a - b) for a, b in combinations(mode_rtps, 2))
         if max_rtp_diff > 0.05:
             warnings.warn(f"\n\nMode RTP difference exceedes allowed difference for approvals: {max_rtp_diff}\n")
 
+    compare_config_hashes(os.path.join(config.library_path, "configs", "config.json"), mode_stats)
     fname = f"games/{config.game_id}/library/stats_summary.json"
     write_all_stats(mode_stats, fname)
 
@@ -5,6 +5,8 @@ import importlib
 import json
 from typing import List, Dict
 
+from src.write_data.force_index import load_force_index
+
 
 def load_game_config(game_id: str):
     """Load game config class"""
@@ -35,6 +37,7 @@ class ForceTool:
         self.config = load_game_config(game_id)
         self.target_mode = game_mode
         self.current_force_file = None
+        self.force_index = None
         self.search_keys = None
         self.method = None  # For payout range search only
 
@@ -48,6 +51,10 @@ class ForceTool:
         with open(force_name, "r", encoding="UTF-8") as f:
             self.current_force_file = json.loads(f.read())
 
+    def load_force_index(self):
+        "Load (or build) the inverted index over the force file."
+        self.force_index = load_force_index(os.path.dirname(self.get_force_file_name()), self.target_mode)
+
     def print_search_results(self, search_criteria, simulation_ids: List, filename: str, game_mode: str):
         """Record"""
         base_path = os.path.join(self.config.library_path, "forces")
@@ -73,20 +80,15 @@ class ForceTool:
 
         return tranform_dict
 
-    def find_partial_key_match(self, search_keys: dict = None, reload_force_json: bool = True) -> list:
+    def find_partial_key_match(self, search_keys: dict = None, reload_force_json: bool = True) -> set:
         """
         Returns all ids with partial match in the 'search' field. i.e. search_keys = [{'kind':'3'}] returns all recorded 3-kind entries
         """
         assert search_keys is not None, "must specify serach keys and game_mode"
 
-        if reload_force_json:
-            self.load_force_file()
-        matched_book_ids = set()
-        for entry in self.current_force_file:
-            tranform_serach = self.transform_serch_dict(entry)
-            if all(tranform_serach.get(k) == v for k, v in search_keys.items()):
-                for idx in entry["bookIds"]:
-                    matched_book_ids.add(int(idx))
+        if reload_force_json or self.force_index is None:
+            self.load_force_index()
+        matched_book_ids = set(self.force_index.find(search_keys).tolist())
 
         if len(matched_book_ids) == 0:
             raise Warning("No book-ids found.")
@@ -97,14 +99,15 @@ class ForceTool:
         Returns all id's appearing in multiplie search criteria
         """
         assert target_mode is not None, "Must specify game mode"
-        self.load_force_file()
-
-        book_id_sets = []
-        for _, search_key in enumerate(search_array):
-            book_id_sets.append(self.find_partial_key_match(search_key, False))
+        self.load_force_index()
+        return set(self.force_index.find_all(search_array).tolist())
 
-        intersection_ids = set.intersection(*book_id_sets)
-        return intersection_ids
+    def find_any_key_match(self, search_array: List[Dict]) -> set:
+        """
+        Returns all id's appearing in at least one of the search criteria
+        """
+        self.load_force_index()
+        return set(self.force_index.find_any(search_array).tolist())
 
     def find_payout_range_ids(
         self,
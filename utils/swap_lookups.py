@@ -7,46 +7,32 @@ import os
 import json
 
 ABS_PATH = Path(__file__).parent.parent
-sys.path.append(ABS_PATH)
+sys.path.append(str(ABS_PATH))
 os.chdir(ABS_PATH)
 
+from src.write_data.publish_lookup import publish_lookup_tables
 
-def swap_tables(game_name: str, game_mode: str, target_file_number: int):
-    """Replace default optimization table."""
 
+def get_swap_job(game_name: str, game_mode: str, target_file_number: int) -> tuple:
+    """Optimizer result and published lookup table paths of a mode."""
     target_file = f"{game_mode}_0_{target_file_number}.csv"
     lut_name = f"lookUpTable_{game_mode}_0.csv"
     new_lut_file = os.path.join("games", game_name, "library", "publish_files", lut_name)
     new_opt_file = os.path.join("games", game_name, "library", "optimization_files", target_file)
+    return new_opt_file, new_lut_file
 
-    start_recording = False
-
-    with open(new_opt_file, "r", encoding="UTF-8") as infile, open(new_lut_file, "w", encoding="UTF-8") as outfile:
-        for line in infile:
-            line = line.strip()
-            if not line:
-                continue
-            if start_recording:
-                parts = line.split(",")
-                if len(parts) != 3:
-                    raise SyntaxError(f"Malformed line, expecting [id,weight,payout]. Have: {parts}")
-                try:
-                    idx = int(parts[0])
-                    weight = int(parts[1])
-                    payout = int(round(float(parts[2]) * 100, 0))
-                    outfile.write(f"{idx},{weight},{payout}\n")
-                except:
-                    raise ValueError("Could not write transformed line.")
-            elif line == "Distribution":
-                start_recording = True
-
-
-def process_many_files(game_id, file_dict: dict) -> None:
-    """Swap out multiple optimization files."""
+
+def swap_tables(game_name: str, game_mode: str, target_file_number: int) -> dict:
+    """Replace default optimization table, returning the published table's sha256, length and moments."""
+    return publish_lookup_tables({game_mode: get_swap_job(game_name, game_mode, target_file_number)})[game_mode]
+
+
+def process_many_files(game_id, file_dict: dict, max_workers: int = None) -> dict:
+    """Swap out multiple optimization files, modes are published in parallel."""
     assert isinstance(file_dict, dict), "Multiple inputs must be of the form {'mode1': number1,  'mode2': number2}"
 
-    for mode, val in file_dict.items():
-        swap_tables(game_id, mode, val)
+    jobs = {mode: get_swap_job(game_id, mode, val) for mode, val in file_dict.items()}
+    return publish_lookup_tables(jobs, max_workers)
 
 
 if __name__ == "__main__":
@@ -29,7 +29,7 @@ for mode in bet_modes:
     total_end = 0
     samples = []
     with open(book_path, 'rb') as f:
-        dec = zst.ZstdDecompressor().stream_reader(f)
+        dec = zst.ZstdDecompressor().stream_reader(f, read_across_frames=True)
         txt = TextIOWrapper(dec, encoding='utf-8')
         for line in txt:
             line = line.strip()